@@ -0,0 +1,171 @@
+"""
+Priority-Aware Admission Scheduler
+Weighted-fair admission of graph invocations by ticket priority and customer tier
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+from langchain_core.messages import HumanMessage
+from customer_service_agent import detect_sentiment, categorize_issue, adjust_priority
+from deployment_config import DEPLOYMENT_CONFIG
+from prometheus_metrics import QUEUE_WAIT
+
+PRIORITY_CLASSES = ["high", "medium", "low"]
+
+# Relative share of dispatch slots each class receives while all are backlogged
+DEFAULT_WEIGHTS = {"high": 8, "medium": 3, "low": 1}
+
+# Fraction of the global concurrency limit each class may occupy at once
+DEFAULT_CLASS_SHARES = {"high": 1.0, "medium": 0.6, "low": 0.3}
+
+def _last_human_text(messages) -> str:
+    for msg in reversed(messages or []):
+        if isinstance(msg, HumanMessage):
+            return msg.content
+        if isinstance(msg, dict) and msg.get("role") in ("user", "human"):
+            return msg.get("content", "")
+        if isinstance(msg, tuple) and msg[0] in ("user", "human"):
+            return msg[1]
+    return ""
+
+def estimate_priority(payload: Dict[str, Any], config: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Cheap pre-admission estimate of a request's ticket priority.
+    Applies the same keyword rules as issue_categorization_node to the newest
+    human message, using the tier from customer_info/user_profile or the
+    configurable "customer_tier" when the payload does not carry one.
+    """
+    configurable = (config or {}).get("configurable", {})
+    if configurable.get("priority") in PRIORITY_CLASSES:
+        return configurable["priority"]
+
+    text = _last_human_text(payload.get("messages"))
+    profile = payload.get("customer_info") or payload.get("user_profile") or {}
+    tier = profile.get("tier") or configurable.get("customer_tier")
+
+    _, priority = categorize_issue(text)
+    return adjust_priority(priority, tier, detect_sentiment(text))
+
+class AdmissionScheduler:
+    """
+    Admits graph invocations through per-priority queues.
+
+    Dispatch order between backlogged classes follows stride scheduling, so each
+    class receives slots in proportion to its weight, while a per-class limit
+    keeps low priority traffic from occupying the whole concurrency budget.
+    """
+
+    def __init__(self, max_concurrent: int = None, weights: Dict[str, int] = None,
+                 class_limits: Dict[str, int] = None):
+        if max_concurrent is None:
+            max_concurrent = DEPLOYMENT_CONFIG["performance"]["concurrent_executions"]
+        self.max_concurrent = max_concurrent
+        self.weights = weights or dict(DEFAULT_WEIGHTS)
+        self.class_limits = class_limits or {
+            cls: max(1, int(max_concurrent * share)) for cls, share in DEFAULT_CLASS_SHARES.items()
+        }
+
+        self._queues = {cls: deque() for cls in PRIORITY_CLASSES}
+        self._pass = {cls: 0.0 for cls in PRIORITY_CLASSES}
+        self._running = {cls: 0 for cls in PRIORITY_CLASSES}
+        self._admitted = {cls: 0 for cls in PRIORITY_CLASSES}
+        self._total_running = 0
+        self._vtime = 0.0
+
+    async def submit(self, graph, payload: Dict[str, Any], config: Dict[str, Any] = None,
+                     priority: str = None):
+        """
+        Waits for admission in the request's priority class, then runs the graph.
+        """
+        priority = priority or estimate_priority(payload, config)
+        await self.acquire(priority)
+        try:
+            return await graph.ainvoke(payload, config)
+        finally:
+            self.release(priority)
+
+    async def acquire(self, priority: str):
+        """Blocks until a slot in the given priority class is granted."""
+        if self.can_admit(priority):
+            self._grant(priority)
+            QUEUE_WAIT.observe(0.0, f"admission_{priority}")
+            return
+
+        queued_at = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        if not self._queues[priority]:
+            # A class that was idle must not bank credit from the time it had no work
+            self._pass[priority] = max(self._pass[priority], self._vtime)
+        self._queues[priority].append(waiter)
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release(priority)
+            elif waiter in self._queues[priority]:
+                self._queues[priority].remove(waiter)
+            raise
+        QUEUE_WAIT.observe(time.perf_counter() - queued_at, f"admission_{priority}")
+
+    def can_admit(self, priority: str) -> bool:
+        """Whether acquire(priority) would be granted at once."""
+        return not any(self._queues.values()) and self._has_capacity(priority)
+
+    def queued_ahead(self, priority: str) -> int:
+        """Requests waiting in priority's class and the classes above it."""
+        return sum(len(self._queues[cls]) for cls in PRIORITY_CLASSES[:PRIORITY_CLASSES.index(priority) + 1])
+
+    def release(self, priority: str):
+        """Returns a slot and admits the next waiting request, if any."""
+        self._running[priority] -= 1
+        self._total_running -= 1
+        self._dispatch()
+
+    def _has_capacity(self, priority: str) -> bool:
+        return (self._total_running < self.max_concurrent and
+                self._running[priority] < self.class_limits[priority])
+
+    def _grant(self, priority: str):
+        self._running[priority] += 1
+        self._total_running += 1
+        self._admitted[priority] += 1
+        self._vtime = self._pass[priority]
+        self._pass[priority] += 1.0 / self.weights[priority]
+
+    def _dispatch(self):
+        while self._total_running < self.max_concurrent:
+            eligible = [cls for cls in PRIORITY_CLASSES
+                        if self._queues[cls] and self._running[cls] < self.class_limits[cls]]
+            if not eligible:
+                return
+            cls = min(eligible, key=lambda c: self._pass[c])
+
+            waiter = self._queues[cls].popleft()
+            if waiter.cancelled():
+                continue
+            self._grant(cls)
+            waiter.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue depth, running and admitted counts per class."""
+        return {
+            "max_concurrent": self.max_concurrent,
+            "running": self._total_running,
+            "classes": {
+                cls: {
+                    "queued": len(self._queues[cls]),
+                    "running": self._running[cls],
+                    "admitted": self._admitted[cls],
+                    "limit": self.class_limits[cls],
+                    "weight": self.weights[cls]
+                }
+                for cls in PRIORITY_CLASSES
+            }
+        }
+
+# Export scheduler API
+__all__ = ["AdmissionScheduler", "estimate_priority", "PRIORITY_CLASSES"]
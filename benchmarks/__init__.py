@@ -0,0 +1,4 @@
+"""
+AI LAB LangGraph - Performance Benchmarks
+Run individual benchmarks with `python -m benchmarks.<name>` from the repository root.
+"""
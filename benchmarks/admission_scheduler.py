@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Admission Scheduler Benchmark
+Drives customer_service_graph with an overloaded mixed-priority workload and
+compares per-class latency of FIFO admission against the priority scheduler.
+"""
+
+import asyncio
+import random
+import time
+
+from langchain_core.messages import HumanMessage
+from admission_scheduler import AdmissionScheduler, estimate_priority, PRIORITY_CLASSES
+from customer_service_agent import create_customer_service_graph
+
+MAX_CONCURRENT = 4
+REQUESTS = 600
+OVERLOAD_FACTOR = 1.5
+
+WORKLOAD = [
+    # (share of traffic, message, tier)
+    (0.10, "This is urgent, our payment failed and the invoice is wrong", "Premium"),
+    (0.05, "I'm frustrated, the app is broken again", "Standard"),
+    (0.25, "I can't login to my account", "Standard"),
+    (0.60, "Hi, what are your opening hours?", "Standard"),
+]
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def make_request(i, rng):
+    roll = rng.random()
+    for share, text, tier in WORKLOAD:
+        roll -= share
+        if roll <= 0:
+            break
+    payload = {
+        'messages': [HumanMessage(content=text)],
+        'customer_info': {'tier': tier},
+        'agent_notes': []
+    }
+    return payload, {'configurable': {'thread_id': f'sched-bench-{i}'}}
+
+async def measure_capacity(graph, n=200):
+    """Closed-loop throughput with MAX_CONCURRENT workers, in requests per second."""
+    rng = random.Random(1)
+    requests = [make_request(i, rng) for i in range(n)]
+    queue = list(requests)
+    
+    async def worker():
+        while queue:
+            payload, config = queue.pop()
+            await graph.ainvoke(payload, config)
+    
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(MAX_CONCURRENT)])
+    return n / (time.perf_counter() - start)
+
+async def run_open_loop(graph, scheduler, rate, fifo):
+    rng = random.Random(42)
+    latencies = {cls: [] for cls in PRIORITY_CLASSES}
+    
+    async def one(i, scheduled_at):
+        payload, config = make_request(i, rng)
+        cls = estimate_priority(payload, config)
+        # FIFO admission puts every request in the same class
+        await scheduler.submit(graph, payload, config, priority="high" if fifo else cls)
+        latencies[cls].append((time.perf_counter() - scheduled_at) * 1000)
+    
+    tasks = []
+    start = time.perf_counter()
+    for i in range(REQUESTS):
+        # Open-loop arrivals: latency is measured from the intended send time
+        scheduled_at = start + i / rate
+        delay = scheduled_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(i, scheduled_at)))
+    await asyncio.gather(*tasks)
+    return latencies
+
+def report(label, latencies):
+    print(f"\n{label}")
+    print("-" * 60)
+    for cls in PRIORITY_CLASSES:
+        values = latencies[cls]
+        if values:
+            print(f"   • {cls:<6} n={len(values):<4} p50={percentile(values, 50):8.1f} ms   "
+                  f"p99={percentile(values, 99):8.1f} ms")
+
+async def main():
+    graph = create_customer_service_graph()
+    capacity = await measure_capacity(graph)
+    rate = capacity * OVERLOAD_FACTOR
+    
+    print("📈 Admission scheduler benchmark")
+    print("=" * 60)
+    print(f"   • Capacity: {capacity:.0f} req/s with {MAX_CONCURRENT} concurrent executions")
+    print(f"   • Offered load: {rate:.0f} req/s ({OVERLOAD_FACTOR}x overload), {REQUESTS} requests")
+    
+    fifo = AdmissionScheduler(MAX_CONCURRENT, class_limits={cls: MAX_CONCURRENT for cls in PRIORITY_CLASSES})
+    report("🚶 FIFO admission", await run_open_loop(graph, fifo, rate, fifo=True))
+    
+    weighted = AdmissionScheduler(MAX_CONCURRENT)
+    report("🎯 Weighted-fair priority admission", await run_open_loop(graph, weighted, rate, fifo=False))
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Synthetic Ticket Corpus
+Seeded generator of customer tickets built from the keyword vocabularies the
+graphs route on (SENTIMENT_KEYWORDS, ISSUE_CATEGORIES, ROUTING_RULES), with
+controllable message lengths, multi-turn threads and customer tier mixes.
+
+    python -m benchmarks.corpus --threads 5 --seed 7
+"""
+
+import argparse
+import json
+import math
+import random
+from typing import Any, Dict, Iterator, List
+
+from customer_service_agent import SENTIMENT_KEYWORDS, ISSUE_CATEGORIES, categorize_issue, detect_sentiment
+from langgraph_cloud_config import ROUTING_RULES, detect_intent
+
+DEFAULT_TIER_MIX = {"Premium": 0.2, "Standard": 0.6, "Basic": 0.2}
+DEFAULT_SENTIMENT_MIX = {"neutral": 0.55, "negative": 0.2, "urgent": 0.1, "positive": 0.15}
+
+# Category keywords from the customer service graph plus the coordinator's
+# routing intents; "general" tickets carry none of them
+TOPICS: Dict[str, List[str]] = {
+    **{category: keywords for category, keywords, _ in ISSUE_CATEGORIES},
+    **{agent: keywords for agent, keywords, _ in ROUTING_RULES},
+    "general": []
+}
+SENTIMENTS: Dict[str, List[str]] = {sentiment: keywords for sentiment, keywords in SENTIMENT_KEYWORDS}
+
+OPENERS = ["Hi,", "Hello,", "Hey there,", "Good morning,", "", ""]
+SUBJECTS = ["my account", "the dashboard", "our team workspace", "the mobile app", "my subscription",
+            "the export feature", "the API", "my last order", "the invoice page", "the settings screen"]
+# Natural phrasing per keyword; keywords added to the vocabularies later fall
+# back to GENERIC_TOPIC / GENERIC_SENTIMENT
+TOPIC_PHRASES = {
+    "billing": "I have a billing question about {subject}.",
+    "payment": "My payment for {subject} did not go through.",
+    "charge": "There is a charge on my card for {subject} I don't recognise.",
+    "invoice": "The invoice for {subject} shows the wrong amount.",
+    "refund": "I would like a refund for {subject}.",
+    "technical": "I'm running into a technical problem with {subject}.",
+    "error": "I get an error every time I open {subject}.",
+    "bug": "I think I found a bug in {subject}.",
+    "not working": "{Subject} is not working since yesterday.",
+    "broken": "{Subject} looks broken after the update.",
+    "troubleshoot": "Can you help me troubleshoot {subject}?",
+    "account": "I need to update the account details for {subject}.",
+    "login": "The login for {subject} keeps failing.",
+    "password": "I can't reset the password for {subject}.",
+    "access": "I lost access to {subject}.",
+    "complaint": "I want to file a complaint about {subject}.",
+    "dissatisfied": "I'm dissatisfied with how {subject} has been handled.",
+    "problem": "There is a problem with {subject}.",
+    "buy": "I'd like to buy more seats for {subject}.",
+    "purchase": "How do I purchase an add-on for {subject}?",
+    "upgrade": "What would an upgrade of {subject} include?",
+    "pricing": "Can you send me the pricing for {subject}?",
+    "features": "Which features come with {subject}?",
+    "demo": "Could we schedule a demo of {subject}?",
+    "support": "I need support with {subject}.",
+    "help": "Can you help me with {subject}?",
+    "issue": "I have an issue with {subject}.",
+    "analytics": "Where can I see analytics for {subject}?",
+    "data": "Can I export the data from {subject}?",
+    "report": "I need a usage report for {subject}.",
+    "metrics": "Which metrics do you track for {subject}?",
+    "analysis": "Could you run an analysis of {subject}?",
+}
+GENERIC_TOPIC = "I have a question about {kw} for {subject}."
+SENTIMENT_PHRASES = {
+    "angry": "I am angry that this keeps happening.",
+    "frustrated": "I'm really frustrated at this point.",
+    "terrible": "This has been a terrible experience.",
+    "awful": "The last week has been awful.",
+    "hate": "I hate having to write in again.",
+    "happy": "I'm happy with the product otherwise.",
+    "great": "The new release looks great.",
+    "excellent": "Your team has been excellent so far.",
+    "love": "We love the app in general.",
+    "amazing": "Support has been amazing before.",
+    "urgent": "This is urgent.",
+    "emergency": "It is an emergency for our team.",
+    "critical": "This is critical for our launch.",
+    "asap": "Please get back to me asap.",
+}
+GENERIC_SENTIMENT = "Honestly, {kw}."
+FILLER = [
+    "I tried logging out and back in.", "It happened on both Chrome and Safari.",
+    "My colleague sees the same thing.", "I cleared the cache already.",
+    "The page just keeps loading.", "I checked the help center first.",
+    "We are on the annual plan.", "This started after the last update.",
+    "I attached a screenshot to my previous email.", "Let me know if you need more details.",
+]
+FOLLOW_UPS = [
+    "Any news on this?", "I tried that but it did not change anything.",
+    "Thanks, what should I do next?", "It is still happening.", "Could you check again?",
+]
+
+def _pick(rng: random.Random, weights: Dict[str, float]) -> str:
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+class TicketCorpus:
+    """
+    Deterministic stream of synthetic support threads.
+
+    Thread i depends only on the seed and i, so any slice of the corpus can be
+    regenerated on its own. Message length in words is log-normal around
+    median_words; turns per thread are geometric with mean mean_turns. Each
+    thread records the labels the real classifiers assign to its first
+    message, so routing and escalation results can be checked against them.
+    """
+
+    def __init__(self, seed: int = 0, median_words: int = 18, length_sigma: float = 0.6,
+                 max_words: int = 400, mean_turns: float = 1.0, topic_mix: Dict[str, float] = None,
+                 tier_mix: Dict[str, float] = None, sentiment_mix: Dict[str, float] = None):
+        self.seed = seed
+        self.median_words = median_words
+        self.length_sigma = length_sigma
+        self.max_words = max_words
+        self.mean_turns = mean_turns
+        self.topic_mix = topic_mix or dict.fromkeys(TOPICS, 1.0)
+        self.tier_mix = tier_mix or DEFAULT_TIER_MIX
+        self.sentiment_mix = sentiment_mix or DEFAULT_SENTIMENT_MIX
+
+    def _words(self, rng: random.Random) -> int:
+        words = rng.lognormvariate(math.log(self.median_words), self.length_sigma)
+        return max(4, min(self.max_words, int(words)))
+
+    def message(self, rng: random.Random, topic: str, sentiment: str) -> str:
+        target = self._words(rng)
+        subject = rng.choice(SUBJECTS)
+        parts = [rng.choice(OPENERS)]
+        if TOPICS[topic]:
+            keyword = rng.choice(TOPICS[topic])
+            parts.append(TOPIC_PHRASES.get(keyword, GENERIC_TOPIC).format(
+                kw=keyword, subject=subject, Subject=subject[0].upper() + subject[1:]))
+        else:
+            parts.append(f"I have a quick question about {subject}.")
+        if sentiment != "neutral":
+            keyword = rng.choice(SENTIMENTS[sentiment])
+            parts.append(SENTIMENT_PHRASES.get(keyword, GENERIC_SENTIMENT).format(kw=keyword))
+        filler = rng.sample(FILLER, len(FILLER))
+        while filler and sum(len(part.split()) for part in parts) < target:
+            parts.append(filler.pop())
+        return " ".join(part for part in parts if part)
+
+    def thread(self, index: int) -> Dict[str, Any]:
+        rng = random.Random(self.seed * 1_000_003 + index)
+        topic = _pick(rng, self.topic_mix)
+        sentiment = _pick(rng, self.sentiment_mix)
+        turns = 1
+        if self.mean_turns > 1:
+            while rng.random() > 1 / self.mean_turns:
+                turns += 1
+        messages = [self.message(rng, topic, sentiment)]
+        messages += [rng.choice(FOLLOW_UPS) for _ in range(turns - 1)]
+        category, priority = categorize_issue(messages[0])
+        intent = detect_intent(messages[0].lower())
+        return {
+            "thread_id": f"synthetic-{self.seed}-{index}",
+            "tier": _pick(rng, self.tier_mix),
+            "topic": topic,
+            "messages": messages,
+            "labels": {
+                "issue_category": category,
+                "base_priority": priority,
+                "sentiment": detect_sentiment(messages[0]),
+                "intent": intent[0] if intent else "customer_service"
+            }
+        }
+
+    def threads(self, count: int, start: int = 0) -> Iterator[Dict[str, Any]]:
+        for index in range(start, start + count):
+            yield self.thread(index)
+
+def main():
+    parser = argparse.ArgumentParser(description="Print synthetic support threads as JSON lines")
+    parser.add_argument("--threads", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--median-words", type=int, default=18)
+    parser.add_argument("--mean-turns", type=float, default=1.0)
+    args = parser.parse_args()
+
+    corpus = TicketCorpus(seed=args.seed, median_words=args.median_words, mean_turns=args.mean_turns)
+    for thread in corpus.threads(args.threads):
+        print(json.dumps(thread))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Event Store Benchmark
+Records real graph runs into a columnar event store, then bulk-loads tens of
+millions of synthetic events and compares memory-mapped vectorized scans
+with the same aggregation over agent_notes-style dicts.
+
+    python -m benchmarks.event_store --rows 20000000
+"""
+
+import argparse
+import resource
+import shutil
+import tempfile
+import time
+
+import numpy as np
+from langchain_core.messages import HumanMessage
+
+from benchmarks.corpus import TicketCorpus
+from customer_service_agent import create_customer_service_graph
+from event_store import EventRecorder, EventStore
+from langgraph_cloud_config import create_enhanced_multi_agent_graph
+
+ENHANCED_START = {
+    'current_agent': 'coordinator', 'agent_handoffs': [], 'conversation_context': {}, 'user_profile': {},
+    'task_queue': [], 'agent_outputs': {}, 'coordination_notes': [], 'performance_metrics': {}
+}
+
+EVENT_TYPES = ["node_run", "route:entry_router", "handoff", "escalation", "resolution"]
+EVENT_WEIGHTS = [0.80, 0.10, 0.04, 0.02, 0.04]
+CATEGORIES = ["billing", "technical", "account", "shipping", "general"]
+PRIORITIES = ["low", "medium", "high", "urgent"]
+AGENTS = ["coordinator", "technical_specialist", "billing_specialist", "data_analyst", "customer_success"]
+NODES = ["sentiment_analysis", "categorize_issue", "set_priority", "coordinator", "technical_specialist"]
+
+def timed_ms(fn, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+def rss_mib():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def capture_graph_events(directory, tickets):
+    store = EventStore(directory)
+    recorder = EventRecorder(store)
+    recorder.install()
+    customer_graph = create_customer_service_graph()
+    enhanced_graph = create_enhanced_multi_agent_graph()
+    start = time.perf_counter()
+    for thread in TicketCorpus(seed=7).threads(tickets):
+        text = thread["messages"][0]
+        config = {'configurable': {'thread_id': thread["thread_id"]}}
+        customer_graph.invoke({'messages': [HumanMessage(content=text)], 'agent_notes': []}, config)
+        enhanced_graph.invoke({'messages': [HumanMessage(content=text)], **ENHANCED_START}, config)
+    elapsed = time.perf_counter() - start
+    recorder.uninstall()
+    store.flush()
+    return store, elapsed
+
+def synthetic_columns(store, rows, rng, thread_codes):
+    """Random event columns encoded against the store's pool."""
+    def codes(values, weights=None):
+        pool = np.array([store.pool.encode(value) for value in values], dtype=np.uint32)
+        return pool[rng.choice(len(values), size=rows, p=weights)]
+    return {
+        "ts": time.time() - rng.random(rows) * 86400 * 7,
+        "thread": rng.choice(thread_codes, size=rows),
+        "graph": codes(["customer_service", "enhanced_multi_agent"]),
+        "node": codes(NODES),
+        "event_type": codes(EVENT_TYPES, EVENT_WEIGHTS),
+        "category": codes(CATEGORIES),
+        "priority": codes(PRIORITIES, [0.4, 0.3, 0.2, 0.1]),
+        "agent": codes(AGENTS),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20_000_000, help="synthetic events to bulk-load")
+    parser.add_argument("--segment-rows", type=int, default=1_000_000)
+    parser.add_argument("--threads", type=int, default=1_000_000, help="distinct thread ids in synthetic events")
+    parser.add_argument("--tickets", type=int, default=300)
+    parser.add_argument("--dict-rows", type=int, default=1_000_000, help="rows in the dict-scan comparison")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="events-")
+    try:
+        print("🗄️  Columnar event store benchmark")
+        print("=" * 60)
+
+        store, elapsed = capture_graph_events(f"{directory}/graphs", args.tickets)
+        print(f"📥 {args.tickets} tickets through both graphs: {store.rows()} events in {elapsed:.2f}s")
+        print(f"   event types {store.count_by('event_type')}")
+        print(f"   escalations by category {store.count_by('category', event_type='escalation')}")
+
+        append_store = EventStore(f"{directory}/append", segment_rows=65536)
+        n = 200_000
+        start = time.perf_counter()
+        for i in range(n):
+            append_store.append("node_run", "customer_service", thread=f"thread-{i % 5000}",
+                                node="categorize_issue", category="billing", priority="high", agent="coordinator")
+        append_store.flush()
+        print(f"✍️  append: {(time.perf_counter() - start) / n * 1e6:.2f} µs per event (incl. segment writes)")
+
+        store = EventStore(f"{directory}/bulk", segment_rows=args.segment_rows)
+        rng = np.random.default_rng(0)
+        start = time.perf_counter()
+        thread_codes = np.array([store.pool.encode(f"thread-{i}") for i in range(args.threads)], dtype=np.uint32)
+        for offset in range(0, args.rows, args.segment_rows):
+            store.append_columns(synthetic_columns(store, min(args.segment_rows, args.rows - offset), rng,
+                                                   thread_codes))
+        print(f"📦 bulk load of {args.rows:,} events: {time.perf_counter() - start:.1f}s, "
+              f"{len(store.pool.strings):,} pooled strings")
+
+        # Reopen so scans read from the memory-mapped files
+        store = EventStore(store.directory)
+        rss_before = rss_mib()
+        day_ago = time.time() - 86400
+        queries = [
+            ("events per agent", lambda: store.count_by("agent")),
+            ("escalations by category", lambda: store.count_by("category", event_type="escalation")),
+            ("urgent handoffs by agent, last 24h",
+             lambda: store.count_by("agent", since=day_ago, event_type="handoff", priority="urgent")),
+        ]
+        for name, query in queries:
+            ms, result = timed_ms(query)
+            print(f"   • {name:<36} {ms:8.1f} ms  ({args.rows / ms / 1000:,.0f} M rows/s)")
+        print(f"   peak RSS {rss_mib():.0f} MiB (was {rss_before:.0f} MiB before scanning)")
+        print(f"   result: {queries[1][1]()}")
+
+        rows = [{"event_type": EVENT_TYPES[i % 5], "category": CATEGORIES[i % 4], "agent": AGENTS[i % 5]}
+                for i in range(args.dict_rows)]
+
+        def dict_scan():
+            counts = {}
+            for row in rows:
+                if row["event_type"] == "escalation":
+                    counts[row["category"]] = counts.get(row["category"], 0) + 1
+            return counts
+
+        ms, _ = timed_ms(dict_scan)
+        print(f"🐢 same query over {args.dict_rows:,} dicts: {ms:.1f} ms "
+              f"(~{ms * args.rows / args.dict_rows / 1000:.1f}s at {args.rows:,} rows)")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
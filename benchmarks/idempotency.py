@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Idempotency Benchmark
+Replays a client retry storm against customer_service_graph and reports the
+graph executions, CPU time and checkpoint writes saved by request coalescing.
+"""
+
+import asyncio
+import random
+import time
+
+from langchain_core.messages import HumanMessage
+from customer_service_agent import create_customer_service_graph
+from idempotency import IdempotencyLayer
+
+TICKETS = 300
+COPIES = 3
+# Clients retry after a short, jittered delay; some copies overlap the
+# original execution and some arrive after it has finished
+RETRY_DELAYS = (0.0, 0.002, 0.25)
+# Spacing between the first submission of consecutive tickets
+ARRIVAL_INTERVAL = 0.005
+
+class CountingSaver:
+    """Counts checkpoint writes made through a checkpointer."""
+    
+    def __init__(self, saver):
+        self.saver = saver
+        self.writes = 0
+        original = saver.aput
+        
+        async def aput(*args, **kwargs):
+            self.writes += 1
+            return await original(*args, **kwargs)
+        saver.aput = aput
+
+async def storm(invoke):
+    rng = random.Random(7)
+    
+    async def client(i):
+        config = {'configurable': {'thread_id': f'retry-{i}'}}
+        text = f"Ticket {i}: I was charged twice for my invoice, please refund"
+        
+        async def attempt(delay):
+            await asyncio.sleep(i * ARRIVAL_INTERVAL + delay + rng.random() * 0.001)
+            return await invoke({'messages': [HumanMessage(content=text)], 'agent_notes': []}, config)
+        
+        await asyncio.gather(*[attempt(RETRY_DELAYS[c]) for c in range(COPIES)])
+    
+    cpu = time.process_time()
+    await asyncio.gather(*[client(i) for i in range(TICKETS)])
+    return time.process_time() - cpu
+
+async def main():
+    plain_graph = create_customer_service_graph()
+    plain_saver = CountingSaver(plain_graph.checkpointer)
+    plain_cpu = await storm(plain_graph.ainvoke)
+    
+    graph = create_customer_service_graph()
+    saver = CountingSaver(graph.checkpointer)
+    layer = IdempotencyLayer(graph)
+    layer_cpu = await storm(layer.ainvoke)
+    stats = layer.stats()
+    
+    print("📈 Idempotency benchmark")
+    print("=" * 60)
+    print(f"   • {TICKETS} tickets x {COPIES} submissions each")
+    print(f"\n{'':<22}{'executions':>12}{'CPU (s)':>10}{'checkpoint writes':>20}")
+    print(f"{'Without coalescing':<22}{TICKETS * COPIES:>12}{plain_cpu:>10.2f}{plain_saver.writes:>20}")
+    print(f"{'With idempotency layer':<22}{stats['executed']:>12}{layer_cpu:>10.2f}{saver.writes:>20}")
+    print(f"\n   • Coalesced in flight: {stats['coalesced']}, replayed from cache: {stats['replayed']}")
+    print(f"   • CPU saved: {(1 - layer_cpu / plain_cpu) * 100:.0f}%, "
+          f"checkpoint writes saved: {plain_saver.writes - saver.writes}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
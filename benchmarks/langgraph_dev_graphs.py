@@ -0,0 +1,13 @@
+"""
+Graphs for `langgraph dev` in the serving benchmark: the langgraph.json graphs
+compiled again without their MemorySaver, since the LangGraph API server
+refuses custom checkpointers and persists threads itself
+"""
+
+from customer_service_agent import customer_service_graph
+from langgraph_cloud_config import enhanced_multi_agent_graph
+from my_agent.graph import graph as my_agent_graph
+
+my_agent = my_agent_graph.builder.compile()
+customer_service = customer_service_graph.builder.compile()
+enhanced_multi_agent = enhanced_multi_agent_graph.builder.compile()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Open-Loop Load Generator
+Drives a graph with synthetic tickets at a target request rate, either in
+process, against a running `langgraph dev` server or against server.py, and
+reports latency percentiles without coordinated omission.
+
+    python -m benchmarks.load_generator --graph customer_service --rps 50 --duration 30
+    python -m benchmarks.load_generator --graph enhanced_multi_agent --url http://127.0.0.1:8123
+    python -m benchmarks.load_generator --url http://127.0.0.1:8000 --api server
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.corpus import TicketCorpus
+from benchmarks.suite import GRAPHS, environment
+from node_metrics import LatencyHistogram
+
+class InProcessTarget:
+    """Sends turns to a freshly built graph with ainvoke."""
+
+    def __init__(self, graph_name: str):
+        factory, self._first, self._follow_up = GRAPHS[graph_name]
+        self.graph = factory()
+        self.name = f"in-process:{graph_name}"
+
+    async def send(self, thread: Dict[str, Any], turn: int):
+        text = thread["messages"][turn]
+        payload = self._first(text) if turn == 0 else self._follow_up(text)
+        config = {'configurable': {'thread_id': thread["thread_id"], 'customer_tier': thread["tier"]}}
+        await self.graph.ainvoke(payload, config)
+
+class LangGraphServerTarget:
+    """Sends turns to a LangGraph API server (e.g. `langgraph dev`) with the SDK client."""
+
+    def __init__(self, graph_name: str, url: str):
+        from langgraph_sdk import get_client
+        self.client = get_client(url=url)
+        self.graph_name = graph_name
+        self.name = f"{url}:{graph_name}"
+        self._threads: Dict[str, str] = {}
+
+    async def send(self, thread: Dict[str, Any], turn: int):
+        if turn == 0:
+            created = await self.client.threads.create(metadata={"synthetic_thread": thread["thread_id"]})
+            self._threads[thread["thread_id"]] = created["thread_id"]
+        payload = {"messages": [{"type": "human", "content": thread["messages"][turn]}]}
+        if self.graph_name == "customer_service":
+            payload["agent_notes"] = []
+        await self.client.runs.wait(
+            self._threads[thread["thread_id"]], self.graph_name, input=payload,
+            config={"configurable": {"customer_tier": thread["tier"]}}
+        )
+        if turn == len(thread["messages"]) - 1:
+            self._threads.pop(thread["thread_id"], None)
+
+class HttpServerTarget:
+    """Sends turns to server.py's invoke endpoint over pooled keep-alive connections."""
+
+    def __init__(self, graph_name: str, url: str, max_connections: int = 1000):
+        import httpx
+        from server import dumps
+        self._dumps = dumps
+        self._first, self._follow_up = GRAPHS[graph_name][1:]
+        self.client = httpx.AsyncClient(base_url=url, timeout=None,
+                                        limits=httpx.Limits(max_connections=max_connections))
+        self.path = f"/graphs/{graph_name}/invoke"
+        self.name = f"{url}:{graph_name}"
+
+    async def send(self, thread: Dict[str, Any], turn: int):
+        text = thread["messages"][turn]
+        payload = self._first(text) if turn == 0 else self._follow_up(text)
+        response = await self.client.post(self.path, content=self._dumps({
+            "input": payload, "thread_id": thread["thread_id"],
+            "config": {"configurable": {"customer_tier": thread["tier"]}}
+        }), headers={"content-type": "application/json"})
+        response.raise_for_status()
+
+class OpenLoopLoad:
+    """
+    Starts new threads on a fixed arrival schedule, whether or not earlier
+    requests have finished, so a slow server cannot slow the offered load.
+
+    Threads arrive at rps / mean_turns per second (Poisson or evenly spaced),
+    so the request rate averages rps. Follow-up turn k of a thread is due
+    think_time seconds after turn k-1 was due. Latency is measured from the
+    time a request was due, not from when it was actually sent: time a turn
+    spends waiting for its thread's previous turn, or for the event loop,
+    counts against the system under test. Service time (from actual send to
+    completion) is reported alongside for comparison.
+    """
+
+    def __init__(self, target, corpus: TicketCorpus, rps: float, duration: float, think_time: float = 1.0,
+                 arrival: str = "poisson", seed: int = 0):
+        self.target = target
+        self.corpus = corpus
+        self.rps = rps
+        self.duration = duration
+        self.think_time = think_time
+        self.arrival = arrival
+        self._random = random.Random(seed)
+        self.latency = LatencyHistogram()
+        self.service = LatencyHistogram()
+        self.counts = {"threads": 0, "sent": 0, "completed": 0, "errors": 0}
+        self.errors: Dict[str, int] = {}
+
+    def _gaps(self):
+        thread_rate = self.rps / max(1.0, self.corpus.mean_turns)
+        while True:
+            if self.arrival == "poisson":
+                yield self._random.expovariate(thread_rate)
+            else:
+                yield 1.0 / thread_rate
+
+    async def _run_thread(self, thread: Dict[str, Any], due: float):
+        loop = asyncio.get_running_loop()
+        for turn in range(len(thread["messages"])):
+            if turn:
+                due += self.think_time
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            sent = loop.time()
+            self.counts["sent"] += 1
+            try:
+                await self.target.send(thread, turn)
+            except Exception as e:
+                self.counts["errors"] += 1
+                self.errors[type(e).__name__] = self.errors.get(type(e).__name__, 0) + 1
+                return
+            finally:
+                done = loop.time()
+                self.latency.record(int((done - due) * 1e9))
+                self.service.record(int((done - sent) * 1e9))
+            self.counts["completed"] += 1
+
+    async def run(self, drain_timeout: float = 60.0) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        tasks: List[asyncio.Task] = []
+        due = started
+        gaps = self._gaps()
+        index = 0
+        while True:
+            due += next(gaps)
+            if due - started >= self.duration:
+                break
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(self._run_thread(self.corpus.thread(index), due)))
+            self.counts["threads"] += 1
+            index += 1
+        pending = [task for task in tasks if not task.done()]
+        if pending:
+            _, still_running = await asyncio.wait(pending, timeout=drain_timeout)
+            for task in still_running:
+                task.cancel()
+        elapsed = loop.time() - started
+        return self.report(elapsed)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        def summary(histogram: LatencyHistogram) -> Dict[str, float]:
+            return {**histogram.summary_ms(), "p90": round(histogram.percentile(90) / 1e6, 4),
+                    "p999": round(histogram.percentile(99.9) / 1e6, 4)}
+
+        return {
+            "target": self.target.name,
+            "offered_rps": self.rps,
+            "achieved_rps": round(self.counts["completed"] / elapsed, 2) if elapsed else 0.0,
+            "duration_s": round(elapsed, 2),
+            **self.counts,
+            "error_types": self.errors,
+            "latency_ms": summary(self.latency),
+            "service_time_ms": summary(self.service)
+        }
+
+def make_target(graph_name: str, url: Optional[str] = None, api: str = "langgraph"):
+    if not url:
+        return InProcessTarget(graph_name)
+    return HttpServerTarget(graph_name, url) if api == "server" else LangGraphServerTarget(graph_name, url)
+
+def run_load(graph_name: str, rps: float, duration: float, url: Optional[str] = None, seed: int = 0,
+             mean_turns: float = 1.0, think_time: float = 1.0, median_words: int = 18,
+             arrival: str = "poisson", api: str = "langgraph") -> Dict[str, Any]:
+    target = make_target(graph_name, url, api)
+    corpus = TicketCorpus(seed=seed, median_words=median_words, mean_turns=mean_turns)
+    load = OpenLoopLoad(target, corpus, rps, duration, think_time=think_time, arrival=arrival, seed=seed)
+    return asyncio.run(load.run())
+
+def main():
+    parser = argparse.ArgumentParser(description="Open-loop load test for the graphs")
+    parser.add_argument("--graph", choices=list(GRAPHS), default="customer_service")
+    parser.add_argument("--rps", type=float, default=50.0, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of offered load")
+    parser.add_argument("--url", default=None, help="server URL, e.g. http://127.0.0.1:8123")
+    parser.add_argument("--api", choices=["langgraph", "server"], default="langgraph",
+                        help="API at --url: LangGraph API (langgraph dev) or server.py")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mean-turns", type=float, default=1.0)
+    parser.add_argument("--think-time", type=float, default=1.0, help="seconds between turns of a thread")
+    parser.add_argument("--median-words", type=int, default=18)
+    parser.add_argument("--arrival", choices=["poisson", "uniform"], default="poisson")
+    parser.add_argument("--output", default=None, help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    print("📈 Open-loop load test")
+    print("=" * 60)
+    started = time.perf_counter()
+    report = run_load(args.graph, args.rps, args.duration, args.url, args.seed, args.mean_turns,
+                      args.think_time, args.median_words, args.arrival, args.api)
+    latency, service = report["latency_ms"], report["service_time_ms"]
+    print(f"   • Target:        {report['target']}")
+    print(f"   • Offered:       {report['offered_rps']:.1f} rps, achieved {report['achieved_rps']:.1f} rps "
+          f"({report['completed']} ok, {report['errors']} errors, {time.perf_counter() - started:.1f}s)")
+    print(f"   • Latency:       p50 {latency['p50']:.2f}  p90 {latency['p90']:.2f}  p99 {latency['p99']:.2f}  "
+          f"p99.9 {latency['p999']:.2f}  max {latency['max']:.2f} ms")
+    print(f"   • Service time:  p50 {service['p50']:.2f}  p90 {service['p90']:.2f}  p99 {service['p99']:.2f}  "
+          f"p99.9 {service['p999']:.2f}  max {service['max']:.2f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"environment": environment(), "settings": vars(args), "results": report}, f, indent=2)
+        print(f"\n💾 Report written to {args.output}")
+
+if __name__ == "__main__":
+    main()
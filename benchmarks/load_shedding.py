@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Load Shedding Benchmark
+Sweeps offered load past capacity and compares goodput (requests answered within
+their deadline) with plain queueing against deadline-aware load shedding.
+"""
+
+import asyncio
+import time
+
+from langchain_core.messages import HumanMessage
+from customer_service_agent import create_customer_service_graph
+from deadlines import LoadShedder, Overloaded, DeadlineExceeded
+
+MAX_CONCURRENT = 4
+DEADLINE_SECONDS = 0.25
+DURATION_SECONDS = 3.0
+LOAD_FACTORS = [0.5, 1.0, 1.5, 2.0, 3.0]
+
+def payload(i):
+    return {'messages': [HumanMessage(content="I was charged twice, please refund the payment")], 'agent_notes': []}
+
+async def measure_capacity(graph, n=200):
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT)
+    
+    async def one(i):
+        async with semaphore:
+            await graph.ainvoke(payload(i), {'configurable': {'thread_id': f'cap-{i}'}})
+    
+    start = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(n)])
+    return n / (time.perf_counter() - start)
+
+async def drive(rate, handler):
+    """Open-loop arrivals at a fixed rate; returns requests completed within the deadline."""
+    good = 0
+    
+    async def one(i, scheduled_at):
+        nonlocal good
+        try:
+            await handler(i)
+        except (Overloaded, DeadlineExceeded):
+            return
+        if time.perf_counter() - scheduled_at <= DEADLINE_SECONDS:
+            good += 1
+    
+    tasks = []
+    start = time.perf_counter()
+    total = int(rate * DURATION_SECONDS)
+    for i in range(total):
+        scheduled_at = start + i / rate
+        delay = scheduled_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(i, scheduled_at)))
+    await asyncio.gather(*tasks)
+    return good / (time.perf_counter() - start)
+
+async def main():
+    graph = create_customer_service_graph()
+    capacity = await measure_capacity(graph)
+    
+    print("📈 Load shedding benchmark")
+    print("=" * 60)
+    print(f"   • Capacity: {capacity:.0f} req/s, deadline {DEADLINE_SECONDS * 1000:.0f} ms")
+    print(f"\n{'offered':>10} {'queueing goodput':>18} {'shedding goodput':>18}")
+    
+    for factor in LOAD_FACTORS:
+        rate = capacity * factor
+        
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT)
+        async def queued(i):
+            async with semaphore:
+                await graph.ainvoke(payload(i), {'configurable': {'thread_id': f'q-{factor}-{i}'}})
+        
+        shedder = LoadShedder(MAX_CONCURRENT, max_queue_age=DEADLINE_SECONDS / 2, timeout=DEADLINE_SECONDS)
+        async def shed(i):
+            await shedder.submit(graph, payload(i), {'configurable': {'thread_id': f's-{factor}-{i}'}})
+        
+        queued_goodput = await drive(rate, queued)
+        shed_goodput = await drive(rate, shed)
+        print(f"{factor:>9.1f}x {queued_goodput:>14.0f}/s {shed_goodput:>14.0f}/s   "
+              f"(shed {shedder.stats()['shed']}, expired {shedder.stats()['expired']})")
+
+if __name__ == "__main__":
+    asyncio.run(main())
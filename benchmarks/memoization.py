@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Pure-Node Memoization Benchmark
+Replays a corpus with realistic repetition - a Zipf-distributed set of
+common requests ("I forgot my password", "refund please") mixed with unique
+synthetic tickets - through the memoized nodes and through whole graphs,
+with and without the memo.
+
+    python -m benchmarks.memoization --requests 20000 --unique 0.3
+    python -m benchmarks.memoization --node-cost-us 500   # as if each node called a model
+
+--node-cost-us adds that much busy work to every node body, to show where
+memoization pays off once nodes do more than keyword matching.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from benchmarks.corpus import TicketCorpus
+from benchmarks.suite import GRAPHS
+from customer_service_agent import detect_sentiment, issue_categorization_node, sentiment_analysis_node
+from memoization import MEMOS, NODE_MEMO_ENV, NodeMemo, pure_node
+from my_agent.graph import chatbot_node
+
+# Short requests that make up most support traffic, most frequent first
+COMMON = [
+    "I forgot my password", "refund please", "hello", "hi", "I can't login", "cancel my subscription",
+    "I was charged twice", "where is my invoice", "the app is not working", "reset password",
+    "talk to a human", "thanks", "my payment failed", "how do I upgrade my plan", "help",
+    "I need a refund", "the website is broken", "I lost access to my account", "what is AI LAB?",
+    "this is terrible", "update my payment method", "the app keeps crashing with an error",
+    "I want to file a complaint", "bye", "urgent: our team cannot log in", "can I get a discount?",
+    "how much is the premium plan", "export is not working", "change my email address",
+    "my order never arrived", "I love the new features", "is there an outage?",
+]
+
+def repetitive_corpus(requests: int, unique: float, zipf_s: float, seed: int) -> List[str]:
+    """COMMON drawn with Zipf weights, and a unique synthetic ticket with probability unique."""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) ** zipf_s for rank in range(len(COMMON))]
+    tickets = TicketCorpus(seed=seed)
+    texts = []
+    for i in range(requests):
+        if rng.random() < unique:
+            texts.append(tickets.thread(i)["messages"][0])
+        else:
+            texts.append(rng.choices(COMMON, weights=weights)[0])
+    return texts
+
+def node_states(text: str) -> Dict[str, dict]:
+    """The state each memoized node sees for a first turn with this message."""
+    messages = [HumanMessage(content=text), AIMessage(content="Hello! I've identified you in our system.")]
+    sentiment = detect_sentiment(text)
+    return {
+        "chatbot": {"messages": [HumanMessage(content=text)], "user_info": {}},
+        "sentiment_analysis": {"messages": messages},
+        "issue_categorization": {"messages": messages, "customer_info": {"tier": "Premium"},
+                                 "sentiment": sentiment, "agent_notes": [f"Sentiment detected: {sentiment}"]},
+    }
+
+def with_cost(func: Callable, cost_us: float) -> Callable:
+    """func plus cost_us of busy work, declared pure over the same projection."""
+    if cost_us <= 0:
+        return func
+
+    @pure_node(func.memo_projection)
+    def costly(state):
+        until = time.perf_counter() + cost_us / 1e6
+        while time.perf_counter() < until:
+            pass
+        return func(state)
+    return costly
+
+def bench_nodes(texts: List[str], max_entries: int, cost_us: float) -> Dict[str, dict]:
+    states = [node_states(text) for text in texts]
+    results = {}
+    for name, func in (("chatbot", chatbot_node), ("sentiment_analysis", sentiment_analysis_node),
+                       ("issue_categorization", issue_categorization_node)):
+        func = with_cost(func, cost_us)
+        inputs = [state[name] for state in states]
+        started = time.perf_counter()
+        for state in inputs:
+            func(state)
+        raw = time.perf_counter() - started
+        memo = NodeMemo("benchmark", name, func, func.memo_projection, max_entries)
+        started = time.perf_counter()
+        for state in inputs:
+            memo(state)
+        memoized = time.perf_counter() - started
+        results[name] = {"raw_us": raw / len(inputs) * 1e6, "memo_us": memoized / len(inputs) * 1e6,
+                         **memo.stats()}
+    return results
+
+def bench_graphs(texts: List[str], repeats: int) -> Dict[str, dict]:
+    """Mean ms per invoke with the memo off and on, best of repeats alternating passes."""
+    results = {}
+    for graph_name in ("my_agent", "customer_service"):
+        factory, first, _ = GRAPHS[graph_name]
+        graphs = {}
+        for mode in ("off", "on"):
+            os.environ[NODE_MEMO_ENV] = str(mode == "on").lower()
+            graphs[mode] = factory()
+            # Warm each graph's first-call paths before timing
+            graphs[mode].invoke(first("hello"), {"configurable": {"thread_id": f"memo-{mode}-warm"}})
+        latencies = {"off": [], "on": []}
+        for repeat in range(repeats):
+            for mode, graph in graphs.items():
+                started = time.perf_counter()
+                for i, text in enumerate(texts):
+                    graph.invoke(first(text), {"configurable": {"thread_id": f"memo-{mode}-{repeat}-{i}"}})
+                latencies[mode].append((time.perf_counter() - started) * 1000 / len(texts))
+        results[graph_name] = {mode: min(values) for mode, values in latencies.items()}
+    os.environ.pop(NODE_MEMO_ENV, None)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Memoized pure nodes on a corpus with repetition")
+    parser.add_argument("--requests", type=int, default=20000, help="messages replayed through each node")
+    parser.add_argument("--graph-requests", type=int, default=2000, help="messages invoked through each graph")
+    parser.add_argument("--unique", type=float, default=0.3, help="share of unique synthetic tickets")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent over the common requests")
+    parser.add_argument("--repeats", type=int, default=3, help="alternating graph passes per mode")
+    parser.add_argument("--max-entries", type=int, default=4096)
+    parser.add_argument("--node-cost-us", type=float, default=0.0, help="extra work per node body")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    texts = repetitive_corpus(args.requests, args.unique, args.zipf, args.seed)
+    print(f"🧮 Pure-node memoization: {args.requests} messages, {len(set(texts))} distinct "
+          f"({args.unique:.0%} unique tickets), LRU of {args.max_entries}")
+    print("=" * 60)
+    for name, result in bench_nodes(texts, args.max_entries, args.node_cost_us).items():
+        print(f"   • {name:<22} hit rate {result['hit_rate']:.1%}, {result['raw_us']:8.2f} -> "
+              f"{result['memo_us']:8.2f} us per call ({result['raw_us'] / result['memo_us']:.2f}x), "
+              f"{result['evictions']} evictions")
+
+    if args.graph_requests and not args.node_cost_us:
+        print(f"\n📊 Whole graphs, mean ms per invoke over {args.graph_requests} messages, best of {args.repeats}")
+        for name, latency in bench_graphs(texts[:args.graph_requests], args.repeats).items():
+            print(f"   • {name:<22} memo off {latency['off']:.3f} ms, on {latency['on']:.3f} ms "
+                  f"({(latency['on'] / latency['off'] - 1) * 100:+.1f}%)")
+        for key, memo in MEMOS.items():
+            stats = memo.stats()
+            print(f"     {'/'.join(key):<38} hits {stats['hits']}, misses {stats['misses']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Prefork Memory Benchmark
+Starts server.py with uvicorn's spawned workers and with preforked workers
+and compares each worker's unique memory (USS), right after startup and
+after serving traffic on every graph.
+
+    python -m benchmarks.prefork --workers 4
+
+USS is memory only that process maps (private clean + private dirty pages):
+what a pod frees if one worker goes away. PSS splits shared pages between
+their users, so the PSS sum approximates the pod's total.
+"""
+
+import argparse
+import statistics
+
+import httpx
+
+from benchmarks.serving import server_command, start, stop
+from benchmarks.suite import GRAPHS, MESSAGES
+
+def memory_kib(pid: int) -> dict:
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {"uss": fields["Private_Clean"] + fields["Private_Dirty"], "pss": fields["Pss"], "rss": fields["Rss"]}
+
+def worker_pids(url: str, workers: int, attempts: int = 500) -> list:
+    """Collects worker pids from /live over fresh connections, which the kernel spreads across workers."""
+    pids = set()
+    for _ in range(attempts):
+        pids.add(httpx.get(f"{url}/live", headers={"connection": "close"}).json()["pid"])
+        if len(pids) == workers:
+            break
+    return sorted(pids)
+
+def drive(url: str, requests: int):
+    payloads = {
+        "my_agent": {"messages": [{"role": "user", "content": "hello"}], "user_info": {}},
+        "customer_service": {"messages": [{"role": "user", "content": MESSAGES[0]}], "agent_notes": []},
+        "enhanced_multi_agent": {"messages": [{"role": "user", "content": MESSAGES[0]}],
+                                 "current_agent": "coordinator", "agent_handoffs": [], "conversation_context": {},
+                                 "user_profile": {}, "task_queue": [], "agent_outputs": {},
+                                 "coordination_notes": [], "performance_metrics": {}},
+    }
+    with httpx.Client(base_url=url, timeout=60) as client:
+        for i in range(requests):
+            for name in GRAPHS:
+                client.post(f"/graphs/{name}/invoke", json={"input": payloads[name]}).raise_for_status()
+
+def measure(prefork: bool, workers: int, port: int, requests: int) -> dict:
+    command = server_command(port, workers, 100) + ["--prefork" if prefork else "--no-prefork"]
+    process = start(command, "/ready", port)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        pids = worker_pids(url, workers)
+        idle = [memory_kib(pid) for pid in pids]
+        drive(url, requests)
+        loaded = [memory_kib(pid) for pid in pids]
+        master = memory_kib(process.pid)
+    finally:
+        stop(process)
+    return {"pids": pids, "idle": idle, "loaded": loaded, "master": master}
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-worker USS with and without prefork")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=200, help="requests per graph after startup")
+    parser.add_argument("--port", type=int, default=8710)
+    args = parser.parse_args()
+
+    print(f"🧠 Prefork memory benchmark: {args.workers} workers, {args.requests} requests per graph")
+    print("=" * 60)
+    results = {}
+    for prefork in (False, True):
+        mode = "prefork + gc.freeze" if prefork else "uvicorn spawn"
+        result = results[mode] = measure(prefork, args.workers, args.port, args.requests)
+        if len(result["pids"]) < args.workers:
+            print(f"⚠️  {mode}: only reached {len(result['pids'])} of {args.workers} workers")
+        for phase in ("idle", "loaded"):
+            stats = result[phase]
+            uss = [m["uss"] / 1024 for m in stats]
+            pss = sum(m["pss"] for m in stats) / 1024 + result["master"]["pss"] / 1024
+            print(f"   • {mode:<20} {phase:<6}  USS per worker {statistics.mean(uss):7.1f} MiB "
+                  f"(min {min(uss):.1f}, max {max(uss):.1f}), RSS {statistics.mean(m['rss'] for m in stats) / 1024:7.1f} MiB, "
+                  f"PSS workers + master {pss:7.1f} MiB")
+
+    spawn, fork = results["uvicorn spawn"], results["prefork + gc.freeze"]
+    for phase in ("idle", "loaded"):
+        before = statistics.mean(m["uss"] for m in spawn[phase]) / 1024
+        after = statistics.mean(m["uss"] for m in fork[phase]) / 1024
+        print(f"\n📉 {phase}: USS per worker {before:.1f} -> {after:.1f} MiB ({(after / before - 1) * 100:+.0f}%)", end="")
+    print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Node Profiling Benchmark
+Measures customer_service_graph invoke latency with the profiler absent,
+installed but not selected, and profiling every request, then prints the
+hottest stacks of the profiled runs.
+"""
+
+import itertools
+import os
+import statistics
+import tempfile
+import time
+
+from langchain_core.messages import HumanMessage
+from customer_service_agent import create_customer_service_graph
+from profiling import NodeProfiler, merge_collapsed
+
+INVOCATIONS = 300
+ROUNDS = 3
+ROUND_IDS = itertools.count()
+
+def run(graph, profile=False):
+    round_id = next(ROUND_IDS)
+    latencies = []
+    for i in range(INVOCATIONS):
+        config = {'configurable': {'thread_id': f'profile-{round_id}-{i}', 'profile': profile}}
+        start = time.perf_counter()
+        graph.invoke({'messages': [HumanMessage(content="My payment failed twice")], 'agent_notes': []}, config)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies)
+
+def main():
+    graph = create_customer_service_graph()
+    run(graph)
+    
+    print("📈 Node profiling benchmark")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        profiler = NodeProfiler(directory, sample_rate=0.0)
+        # Alternate rounds so machine noise hits both cases alike
+        absent, idle = [], []
+        for _ in range(ROUNDS):
+            absent.append(run(graph))
+            profiler.install()
+            idle.append(run(graph))
+            profiler.uninstall()
+        absent, idle = min(absent), min(idle)
+        profiler.install()
+        profiled = run(graph, profile=True)
+        profiler.uninstall()
+        print(f"   • Profiler not installed:      median {absent:.3f} ms")
+        print(f"   • Installed, not selected:     median {idle:.3f} ms")
+        print(f"   • Every node profiled:         median {profiled:.3f} ms ({profiler.profiled} node profiles)")
+        
+        stacks = merge_collapsed([os.path.join(directory, "customer_service.collapsed")])
+        total = sum(stacks.values())
+        by_node = {}
+        for stack, value in stacks.items():
+            node = stack.split(";")[1]
+            by_node[node] = by_node.get(node, 0) + value
+        print("\n🔥 Profiled time by node")
+        for node, value in sorted(by_node.items(), key=lambda item: -item[1]):
+            print(f"   • {node:<26} {value / total * 100:5.1f}%")
+        print("\n🔥 Hottest leaf frames")
+        leaves = {}
+        for stack, value in stacks.items():
+            leaf = stack.rsplit(";", 1)[-1]
+            leaves[leaf] = leaves.get(leaf, 0) + value
+        for leaf, value in sorted(leaves.items(), key=lambda item: -item[1])[:8]:
+            print(f"   • {leaf[:70]:<70} {value / total * 100:5.1f}%")
+
+if __name__ == "__main__":
+    main()
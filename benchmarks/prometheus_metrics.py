@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Prometheus Metrics Benchmark
+Compares the per-thread sharded counter with a single lock-protected counter
+under concurrent writers, and times a /metrics render after graph traffic.
+"""
+
+import threading
+import time
+
+from langchain_core.messages import HumanMessage
+import prometheus_metrics
+from prometheus_metrics import Counter
+from customer_service_agent import create_customer_service_graph
+
+THREADS = 8
+UPDATES = 100_000
+
+class LockedCounter:
+    """Conventional counter guarded by one lock, for comparison."""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}
+    
+    def inc(self, *labels):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + 1
+
+def hammer(counter):
+    def writer():
+        inc = counter.inc
+        for _ in range(UPDATES):
+            inc("customer_service", "resolution")
+    
+    threads = [threading.Thread(target=writer) for _ in range(THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return (time.perf_counter() - start) * 1e9 / (THREADS * UPDATES)
+
+def main():
+    print("📈 Prometheus metrics benchmark")
+    print("=" * 60)
+    print(f"   • {THREADS} writer threads x {UPDATES} increments")
+    
+    sharded = Counter("bench_total", "Benchmark counter.", ["graph", "node"])
+    print(f"   • Lock-protected counter: {hammer(LockedCounter()):6.0f} ns/update")
+    print(f"   • Sharded counter:        {hammer(sharded):6.0f} ns/update")
+    assert sum(sharded.values().values()) == THREADS * UPDATES
+    
+    prometheus_metrics.install()
+    graph = create_customer_service_graph()
+    for i in range(1000):
+        graph.invoke({'messages': [HumanMessage(content="I'm frustrated, my invoice is wrong")], 'agent_notes': []},
+                     {'configurable': {'thread_id': f'prom-{i}'}})
+    
+    start = time.perf_counter()
+    body = prometheus_metrics.render()
+    print(f"\n📊 /metrics render: {(time.perf_counter() - start) * 1000:.2f} ms, "
+          f"{len(body.splitlines())} lines, {len(body) / 1024:.1f} KiB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Performance Regression Gate
+Compares a benchmark suite result against a committed baseline and exits
+non-zero when latency, throughput or memory regressed past the thresholds.
+
+    python -m benchmarks.suite --quick --output current.json
+    python -m benchmarks.regression_gate current.json
+    python -m benchmarks.regression_gate current.json --baseline benchmarks/baseline.json --latency-threshold 0.15
+
+To accept a new baseline, copy a suite result over benchmarks/baseline.json.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Environment fields that make two runs incomparable when they differ
+ENVIRONMENT_KEYS = ("python", "implementation", "machine", "cpu_count", "packages")
+
+class Metric(NamedTuple):
+    name: str
+    kind: str  # "latency", "throughput" or "memory"
+    higher_is_better: bool
+    baseline: List[float]
+    current: List[float]
+
+class Verdict(NamedTuple):
+    metric: Metric
+    baseline_value: float
+    current_value: float
+    change: float
+    interval: Optional[Tuple[float, float]]
+    status: str
+
+def _samples(entry: Dict[str, Any], key: str) -> List[float]:
+    return entry.get(f"samples_{key}") or []
+
+def collect_metrics(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Metric]:
+    """Pairs up every metric present in both suite results."""
+    base, cur = baseline["results"], current["results"]
+    metrics = []
+
+    for graph, entry in cur.get("single_turn", {}).items():
+        if graph in base.get("single_turn", {}):
+            metrics.append(Metric(f"{graph} single-turn latency (ms)", "latency", False,
+                                  _samples(base["single_turn"][graph], "ms"), _samples(entry, "ms")))
+
+    for graph, turns in cur.get("multi_turn", {}).items():
+        for turn, entry in turns.items():
+            base_entry = base.get("multi_turn", {}).get(graph, {}).get(turn)
+            if base_entry is None:
+                continue
+            metrics.append(Metric(f"{graph} turn {turn} latency (ms)", "latency", False,
+                                  _samples(base_entry, "ms"), _samples(entry, "ms")))
+            metrics.append(Metric(f"{graph} turn {turn} checkpoint (bytes)", "memory", False,
+                                  [base_entry["checkpoint_bytes"]], [entry["checkpoint_bytes"]]))
+
+    for graph, modes in cur.get("throughput", {}).items():
+        for mode, entry in modes.items():
+            base_entry = base.get("throughput", {}).get(graph, {}).get(mode)
+            if base_entry is not None:
+                metrics.append(Metric(f"{graph} {mode} throughput (rps)", "throughput", True,
+                                      _samples(base_entry, "rps"), _samples(entry, "rps")))
+
+    for graph, entry in cur.get("checkpoint_memory", {}).items():
+        base_entry = base.get("checkpoint_memory", {}).get(graph)
+        if base_entry is None:
+            continue
+        for key in ("heap_bytes_per_thread", "serialized_bytes_per_thread"):
+            metrics.append(Metric(f"{graph} {key.replace('_', ' ')}", "memory", False,
+                                  [base_entry[key]], [entry[key]]))
+    return metrics
+
+def bootstrap_ratio(baseline: List[float], current: List[float], confidence: float = 0.95,
+                    resamples: int = 2000, seed: int = 0) -> Tuple[float, float]:
+    """
+    Percentile bootstrap confidence interval of median(current) / median(baseline),
+    resampling both runs independently.
+    """
+    rng = random.Random(seed)
+    median = statistics.median
+    ratios = sorted(
+        median(rng.choices(current, k=len(current))) / median(rng.choices(baseline, k=len(baseline)))
+        for _ in range(resamples)
+    )
+    tail = (1 - confidence) / 2
+    return ratios[int(tail * (resamples - 1))], ratios[int((1 - tail) * (resamples - 1))]
+
+def judge(metric: Metric, thresholds: Dict[str, float], confidence: float, resamples: int) -> Verdict:
+    """
+    A sampled metric regresses only when the whole bootstrap interval of the
+    median ratio lies past the threshold, so run-to-run noise on a shared
+    machine does not fail the gate. Timings with a single sample cannot be
+    tested and are reported without gating; single-valued memory metrics are
+    deterministic and compared directly.
+    """
+    base_value = statistics.median(metric.baseline)
+    cur_value = statistics.median(metric.current)
+    if base_value == 0:
+        return Verdict(metric, base_value, cur_value, 0.0, None, "ok" if cur_value == 0 else "new")
+
+    def worse(ratio: float) -> float:
+        # Relative change where positive is always worse
+        return (1 / ratio - 1) if metric.higher_is_better else (ratio - 1)
+
+    change = worse(cur_value / base_value)
+    threshold = thresholds[metric.kind]
+    interval = None
+    if len(metric.baseline) > 1 and len(metric.current) > 1:
+        interval = bootstrap_ratio(metric.baseline, metric.current, confidence, resamples)
+        best, worst = sorted((worse(interval[0]), worse(interval[1])))
+    elif metric.kind == "memory":
+        best = worst = change
+    else:
+        best, worst = -float("inf"), float("inf")
+
+    if best > threshold:
+        status = "REGRESSED"
+    elif worst < -threshold:
+        status = "improved"
+    elif change > threshold:
+        status = "noisy"
+    else:
+        status = "ok"
+    return Verdict(metric, base_value, cur_value, change, interval, status)
+
+def environment_differences(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    base_env, cur_env = baseline.get("environment", {}), current.get("environment", {})
+    differences = [f"{key}: {base_env.get(key)} -> {cur_env.get(key)}"
+                   for key in ENVIRONMENT_KEYS if base_env.get(key) != cur_env.get(key)]
+    if baseline.get("settings") != current.get("settings"):
+        differences.append("suite settings differ (e.g. --quick vs full run)")
+    return differences
+
+def format_report(verdicts: List[Verdict], differences: List[str]) -> str:
+    icons = {"ok": "✅", "improved": "🚀", "noisy": "⚠️ ", "new": "🆕", "REGRESSED": "❌"}
+    lines = []
+    if differences:
+        lines.append("⚠️  Baseline was recorded in a different environment:")
+        lines.extend(f"   • {difference}" for difference in differences)
+        lines.append("")
+    width = max(len(v.metric.name) for v in verdicts) if verdicts else 0
+    for v in verdicts:
+        interval = f"  CI x{v.interval[0]:.3f}..x{v.interval[1]:.3f}" if v.interval else ""
+        lines.append(f"{icons[v.status]} {v.metric.name:<{width}}  {v.baseline_value:>12.3f} -> "
+                     f"{v.current_value:>12.3f}  {v.change * 100:+7.1f}% worse{interval}  {v.status}")
+    regressions = [v for v in verdicts if v.status == "REGRESSED"]
+    lines.append("")
+    if regressions:
+        lines.append(f"❌ {len(regressions)} of {len(verdicts)} metrics regressed")
+    else:
+        lines.append(f"✅ No regressions across {len(verdicts)} metrics")
+    return "\n".join(lines)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Fail when benchmark results regress against a baseline")
+    parser.add_argument("results", help="JSON written by `python -m benchmarks.suite --output`")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--latency-threshold", type=float, default=0.20, help="allowed relative latency increase")
+    parser.add_argument("--throughput-threshold", type=float, default=0.20, help="allowed relative throughput drop")
+    parser.add_argument("--memory-threshold", type=float, default=0.05, help="allowed relative memory increase")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--resamples", type=int, default=2000)
+    parser.add_argument("--strict-environment", action="store_true",
+                        help="fail when the baseline comes from a different environment")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.results) as f:
+        current = json.load(f)
+
+    thresholds = {"latency": args.latency_threshold, "throughput": args.throughput_threshold,
+                  "memory": args.memory_threshold}
+    metrics = collect_metrics(baseline, current)
+    verdicts = [judge(metric, thresholds, args.confidence, args.resamples) for metric in metrics]
+    differences = environment_differences(baseline, current)
+
+    print("📏 Performance regression gate")
+    print("=" * 60)
+    print(format_report(verdicts, differences))
+
+    if not verdicts:
+        print("❌ No comparable metrics between results and baseline")
+        return 1
+    if args.strict_environment and differences:
+        return 1
+    return 1 if any(v.status == "REGRESSED" for v in verdicts) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Resource Accounting Benchmark
+Runs mixed traffic through customer_service_graph and the enhanced graph with
+the resource accountant installed, prints what each issue category and agent
+costs, and measures the accounting overhead per invocation.
+"""
+
+import random
+import statistics
+import time
+
+from langchain_core.messages import HumanMessage
+from customer_service_agent import create_customer_service_graph
+from langgraph_cloud_config import create_enhanced_multi_agent_graph
+from resource_accounting import ResourceAccountant
+
+THREADS = 300
+TURNS = 3
+
+TICKETS = [
+    "My payment failed and I was charged twice",
+    "The app crashed and shows an error on login",
+    "How do I change my account email?",
+    "I want a refund for my subscription",
+    "Where can I find the API documentation?",
+]
+
+REQUESTS = [
+    "The export feature is broken and throws an error",
+    "What does the premium upgrade cost? I'd like a demo",
+    "I have a billing complaint and need help",
+    "Can you send me a report with usage metrics and analysis?",
+]
+
+ENHANCED_START = {
+    'current_agent': 'coordinator', 'agent_handoffs': [], 'conversation_context': {}, 'user_profile': {},
+    'task_queue': [], 'agent_outputs': {}, 'coordination_notes': [], 'performance_metrics': {}
+}
+
+def drive(customer_graph, enhanced_graph, prefix: str):
+    rng = random.Random(11)
+    latencies = []
+    for i in range(THREADS):
+        for turn in range(TURNS):
+            config = {'configurable': {'thread_id': f'{prefix}-cs-{i}'}}
+            start = time.perf_counter()
+            customer_graph.invoke({'messages': [HumanMessage(content=rng.choice(TICKETS))], 'agent_notes': []}, config)
+            latencies.append((time.perf_counter() - start) * 1000)
+            
+            config = {'configurable': {'thread_id': f'{prefix}-mx-{i}'}}
+            payload = {'messages': [HumanMessage(content=rng.choice(REQUESTS))]}
+            if turn == 0:
+                payload.update(ENHANCED_START)
+            start = time.perf_counter()
+            enhanced_graph.invoke(payload, config)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+def print_groups(title, groups):
+    print(f"\n📊 {title}")
+    for graph, values in groups.items():
+        for value, usage in sorted(values.items(), key=lambda item: -item[1]["cpu_ms"]):
+            peak = f"{usage['peak_alloc_bytes'] / 1024:.0f} KiB" if usage["peak_alloc_bytes"] is not None else "n/a"
+            print(f"   • {graph:<20} {value:<18} cpu {usage['cpu_ms']:8.1f} ms  nodes {usage['nodes']:5}  "
+                  f"checkpoints {usage['checkpoint_bytes'] / 1024:7.0f} KiB  peak alloc {peak}")
+
+def main():
+    customer_graph = create_customer_service_graph()
+    enhanced_graph = create_enhanced_multi_agent_graph()
+    drive(customer_graph, enhanced_graph, "warm")
+    
+    print("📈 Resource accounting benchmark")
+    print("=" * 60)
+    
+    baseline = drive(customer_graph, enhanced_graph, "base")
+    accountant = ResourceAccountant(allocation_sample_rate=0.01, seed=3)
+    accountant.install()
+    accounted = drive(customer_graph, enhanced_graph, "acct")
+    accountant.uninstall()
+    
+    print(f"   • Without accounting: median {statistics.median(baseline):.3f} ms per invoke")
+    print(f"   • With accounting:    median {statistics.median(accounted):.3f} ms per invoke "
+          f"(1% allocation sampling)")
+    
+    print_groups("customer_service by issue_category", accountant.by("issue_category", "customer_service"))
+    print_groups("enhanced_multi_agent by current_agent", accountant.by("current_agent", "enhanced_multi_agent"))
+    
+    print("\n🧵 Most expensive threads")
+    for thread, usage in accountant.threads(top=3).items():
+        print(f"   • {thread:<40} cpu {usage['cpu_ms']:6.2f} ms  nodes {usage['nodes']:3}  "
+              f"checkpoints {usage['checkpoint_bytes']} B")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Sentiment Classifier Benchmark
+Compares the hashed n-gram model with the keyword rules it replaces:
+held-out accuracy on the labeled examples, how many tickets that call for
+escalation each one sends down the escalation path, and per-message latency
+for single and batched inference.
+
+    python -m benchmarks.sentiment --examples data/sentiment_examples.csv --messages 5000
+
+Accuracy and escalations use cross-validated predictions, so the model is
+never scored on messages it was trained on. REGRESSION_CASES are messages the
+model alone once got wrong against a plain keyword hit; the deployed
+detect_sentiment() must get every one of them right.
+"""
+
+import argparse
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.corpus import TicketCorpus
+from benchmarks.memoization import COMMON
+from customer_service_agent import (SENTIMENT_MODEL, TRIAGE_RULES, adjust_priority, categorize_issue,
+                                    detect_sentiment, keyword_sentiment, sentiment_model_path)
+from sentiment_model import accuracy, cross_validate, read_examples
+
+# (message, expected sentiment) pairs where the model overrode a clear keyword case
+REGRESSION_CASES = [
+    ("I am angry about my bill", "negative"),
+    ("This is urgent, the system is down", "urgent"),
+    ("the the the", "neutral"),
+    ("it", "neutral"),
+    ("I hate the system", "negative"),
+    ("critical: the site is down", "urgent"),
+]
+
+def escalates(text: str, sentiment: str, tier: str = "Standard", previous_tickets: int = 2) -> bool:
+    """Whether escalation_router_node would escalate this first message for a typical customer."""
+    _, base_priority = categorize_issue(text)
+    priority = adjust_priority(base_priority, tier, sentiment)
+    return TRIAGE_RULES.rules()["escalation"].evaluate(priority, sentiment, tier, previous_tickets)[0]
+
+def escalation_recall(texts: List[str], labels: List[str], predicted: List[str]) -> Dict[str, int]:
+    """Of the tickets that escalate with their labeled sentiment, how many still do with the predicted one."""
+    wanted = [escalates(text, label) for text, label in zip(texts, labels)]
+    got = [escalates(text, sentiment) for text, sentiment in zip(texts, predicted)]
+    return {"wanted": sum(wanted), "found": sum(w and g for w, g in zip(wanted, got)),
+            "spurious": sum(g and not w for w, g in zip(wanted, got))}
+
+def per_message_us(func: Callable[[str], object], texts: List[str], repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for text in texts:
+            func(text)
+        best = min(best, time.perf_counter() - started)
+    return best / len(texts) * 1e6
+
+def batched_us(texts: List[str], batch_size: int, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for start in range(0, len(texts), batch_size):
+            SENTIMENT_MODEL.predict_batch(texts[start:start + batch_size])
+        best = min(best, time.perf_counter() - started)
+    return best / len(texts) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Hashed n-gram sentiment model against the keyword rules")
+    parser.add_argument("--examples", default="data/sentiment_examples.csv", help="labeled CSV (text,label)")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--messages", type=int, default=5000, help="corpus messages timed")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    if SENTIMENT_MODEL is None:
+        raise SystemExit(f"❌ No sentiment model at {sentiment_model_path()}; train one with sentiment_model.py train")
+
+    texts, labels = read_examples(args.examples)
+    print(f"🧠 Sentiment: {sentiment_model_path()} ({SENTIMENT_MODEL.ngrams}-grams, {SENTIMENT_MODEL.buckets} buckets) "
+          f"against keyword rules")
+    print("=" * 60)
+    predictions = cross_validate(texts, labels, args.folds, args.seed)
+    print(f"   {len(texts)} labeled examples, {args.folds}-fold held-out predictions")
+    for name, predicted in predictions.items():
+        recall = escalation_recall(texts, labels, predicted)
+        print(f"   • {name:<17} accuracy {accuracy(predicted, labels):6.1%}, escalated "
+              f"{recall['found']}/{recall['wanted']} tickets that should be, {recall['spurious']} that should not")
+
+    misses = [(text, expected, detect_sentiment(text)) for text, expected in REGRESSION_CASES
+              if detect_sentiment(text) != expected]
+    print(f"   • regression cases      {len(REGRESSION_CASES) - len(misses)}/{len(REGRESSION_CASES)} right")
+    for text, expected, got in misses:
+        print(f"     ❌ {text!r}: {got}, expected {expected}")
+
+    corpus = [thread["messages"][0] for thread in TicketCorpus(seed=args.seed).threads(args.messages)]
+    for name, messages in (("support tickets", corpus), ("short requests", COMMON)):
+        words = statistics.mean(len(text.split()) for text in messages)
+        print(f"\n⏱️  {name}: {len(messages)} messages, {words:.0f} words on average, best of {args.repeats}")
+        print(f"   • keyword rules          {per_message_us(keyword_sentiment, messages, args.repeats):7.2f} us per message")
+        print(f"   • model, one at a time   {per_message_us(SENTIMENT_MODEL.predict, messages, args.repeats):7.2f} us per message")
+        for batch_size in (16, 256):
+            print(f"   • model, batches of {batch_size:<4} {batched_us(messages, batch_size, args.repeats):7.2f} us per message")
+
+if __name__ == "__main__":
+    main()
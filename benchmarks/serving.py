@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Serving Benchmark
+Starts server.py and `langgraph dev` on local ports and drives each with the
+same open-loop ticket load at increasing rates, comparing achieved
+throughput and tail latency.
+
+    python -m benchmarks.serving --graph customer_service --rates 25 50 100 200 --duration 15
+
+`langgraph dev` cannot load graphs that bring their own checkpointer, so it
+serves benchmarks/langgraph_dev.json: the same graphs compiled without one.
+Its target creates a thread and waits on a run, as a LangGraph SDK client does.
+"""
+
+import argparse
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.load_generator import run_load
+from benchmarks.suite import GRAPHS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def server_command(port: int, workers: int, concurrency: int):
+    return [sys.executable, "server.py", "--port", str(port), "--workers", str(workers),
+            "--concurrency", str(concurrency)]
+
+def langgraph_dev_command(port: int, workers: int, concurrency: int):
+    return [shutil.which("langgraph"), "dev", "--config", "benchmarks/langgraph_dev.json", "--port", str(port),
+            "--no-browser", "--no-reload"]
+
+# name -> (command factory, readiness path, load generator api)
+SERVERS = {
+    "server.py": (server_command, "/ready", "server"),
+    "langgraph dev": (langgraph_dev_command, "/ok", "langgraph"),
+}
+
+def start(command, ready_path: str, port: int, timeout: float = 120.0) -> subprocess.Popen:
+    process = subprocess.Popen(command, cwd=ROOT, env={**os.environ, "PYTHONPATH": ROOT},
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{command[0]} exited with {process.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}{ready_path}", timeout=1.0).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    stop(process)
+    raise RuntimeError(f"{command[0]} not ready after {timeout:.0f}s")
+
+def stop(process: subprocess.Popen):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=15)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare server.py with langgraph dev under open-loop load")
+    parser.add_argument("--graph", choices=list(GRAPHS), default="customer_service")
+    parser.add_argument("--rates", type=float, nargs="+", default=[25, 50, 100, 200], help="offered rps steps")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds of load per step")
+    parser.add_argument("--workers", type=int, default=2, help="server.py worker processes")
+    parser.add_argument("--concurrency", type=int, default=100, help="server.py in-flight runs per worker")
+    parser.add_argument("--servers", nargs="+", choices=list(SERVERS), default=list(SERVERS))
+    parser.add_argument("--port", type=int, default=8700)
+    args = parser.parse_args()
+
+    print(f"🌐 Serving benchmark: {args.graph}, {os.cpu_count()} CPUs, server.py with {args.workers} workers")
+    print("=" * 60)
+    rows = []
+    for offset, name in enumerate(args.servers):
+        command, ready_path, api = SERVERS[name]
+        port = args.port + offset
+        if command(port, args.workers, args.concurrency)[0] is None:
+            print(f"⏭️  {name}: not installed (pip install 'langgraph-cli[inmem]')")
+            continue
+        started = time.perf_counter()
+        process = start(command(port, args.workers, args.concurrency), ready_path, port)
+        print(f"🟢 {name} ready in {time.perf_counter() - started:.1f}s")
+        try:
+            for rps in args.rates:
+                report = run_load(args.graph, rps, args.duration, f"http://127.0.0.1:{port}", api=api)
+                rows.append((name, rps, report))
+                latency = report["latency_ms"]
+                print(f"   • {rps:>6.0f} rps offered: {report['achieved_rps']:>7.1f} achieved, "
+                      f"p50 {latency['p50']:>8.1f}  p99 {latency['p99']:>8.1f}  p99.9 {latency['p999']:>8.1f} ms, "
+                      f"{report['errors']} errors")
+        finally:
+            stop(process)
+
+    print("\n📊 Summary (latency from due time, ms)")
+    print(f"   {'server':<14} {'offered':>8} {'achieved':>9} {'p50':>9} {'p99':>9} {'p99.9':>9} {'errors':>7}")
+    for name, rps, report in rows:
+        latency = report["latency_ms"]
+        print(f"   {name:<14} {rps:>8.0f} {report['achieved_rps']:>9.1f} {latency['p50']:>9.1f} "
+              f"{latency['p99']:>9.1f} {latency['p999']:>9.1f} {report['errors']:>7}")
+
+if __name__ == "__main__":
+    main()
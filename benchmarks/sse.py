@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+SSE Benchmark
+Opens thousands of concurrent /events streams against one server.py worker
+and reports time to first update, time to the end event, how many streams
+were open at once, worker memory, and that every concurrency slot was
+released once the streams were done.
+
+    python -m benchmarks.sse --streams 2000 --slow 0.25 --abandon 0.1
+
+A --slow fraction of clients sleeps --read-delay seconds between reads, and
+an --abandon fraction disconnects after the first update. The client and
+the worker share the host, so on a small machine compare the CPU times
+printed with the wall time before reading latencies as the server's.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+
+import httpx
+import orjson
+
+from benchmarks.serving import server_command, start, stop
+from warmup import START_STATE
+
+TEXTS = ["My invoice shows a double charge", "The app keeps crashing with an error",
+         "I want to cancel my account, this is terrible", "How do I reset my password?"]
+
+def rss_mib(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+def percentile(values, q: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+async def one_stream(host: str, port: int, graph: str, i: int, behaviour: str, read_delay: float) -> dict:
+    """
+    One stream over a raw socket: httpx costs more CPU per stream than the
+    server does, and on a small host the client would set the pace.
+    """
+    body = orjson.dumps({"input": {"messages": [{"role": "user", "content": TEXTS[i % len(TEXTS)]}],
+                                   **START_STATE[graph]}})
+    started = time.perf_counter()
+    result = {"behaviour": behaviour, "first_ms": None, "end_ms": None, "updates": 0, "status": None}
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError as e:
+        result["status"] = type(e).__name__
+        return result
+    try:
+        writer.write(b"POST /graphs/%s/events HTTP/1.1\r\nHost: %s\r\nContent-Type: application/json\r\n"
+                     b"Content-Length: %d\r\nConnection: close\r\n\r\n%s"
+                     % (graph.encode(), host.encode(), len(body), body))
+        status_line = await reader.readline()
+        result["status"] = int(status_line.split()[1]) if status_line else "closed"
+        if result["status"] != 200:
+            return result
+        received = b""
+        while True:
+            chunk = await reader.read(4096)
+            if not chunk:
+                break
+            # Events are small; search the tail where a marker may straddle two reads
+            scan_from = max(0, len(received) - 16)
+            received += chunk
+            updates = received.count(b"event: update", scan_from)
+            if updates and result["first_ms"] is None:
+                result["first_ms"] = (time.perf_counter() - started) * 1000
+                if behaviour == "abandon":
+                    return result
+            result["updates"] += updates
+            if b"event: end" in received[scan_from:]:
+                result["end_ms"] = (time.perf_counter() - started) * 1000
+            if behaviour == "slow":
+                await asyncio.sleep(read_delay)
+    except (OSError, IndexError, ValueError) as e:
+        result["status"] = type(e).__name__
+    finally:
+        writer.close()
+    return result
+
+async def sample_open(client: httpx.AsyncClient, pid: int, samples: list, stop_event: asyncio.Event):
+    while not stop_event.is_set():
+        try:
+            stats = (await client.get("/stats")).json()
+        except httpx.HTTPError:
+            # A saturated worker may not answer in time; skip the sample
+            continue
+        samples.append((stats["sse"]["open"] + stats["admission"]["queued"], stats["admission"]["in_flight"],
+                        rss_mib(pid)))
+        await asyncio.sleep(0.1)
+
+async def run(url: str, graph: str, streams: int, slow: float, abandon: float, read_delay: float) -> dict:
+    rng = random.Random(7)
+    behaviours = ["slow" if r < slow else "abandon" if r < slow + abandon else "normal"
+                  for r in (rng.random() for _ in range(streams))]
+    host, port = url.rsplit("//", 1)[1].split(":")
+    async with httpx.AsyncClient(base_url=url, timeout=30) as monitor:
+        pid = (await monitor.get("/live")).json()["pid"]
+        idle_rss = rss_mib(pid)
+        samples, done = [], asyncio.Event()
+        sampler = asyncio.create_task(sample_open(monitor, pid, samples, done))
+        started, server_cpu, client_cpu = time.perf_counter(), cpu_seconds(pid), time.process_time()
+        results = await asyncio.gather(*(one_stream(host, int(port), graph, i, behaviour, read_delay)
+                                         for i, behaviour in enumerate(behaviours)))
+        elapsed = time.perf_counter() - started
+        server_cpu, client_cpu = cpu_seconds(pid) - server_cpu, time.process_time() - client_cpu
+        await asyncio.sleep(0.5)
+        done.set()
+        await sampler
+        final = (await monitor.get("/stats")).json()
+    return {"results": results, "elapsed": elapsed, "samples": samples, "idle_rss": idle_rss, "final": final,
+            "server_cpu": server_cpu, "client_cpu": client_cpu}
+
+def main():
+    parser = argparse.ArgumentParser(description="Thousands of concurrent SSE streams against one worker")
+    parser.add_argument("--graph", choices=list(START_STATE), default="customer_service")
+    parser.add_argument("--streams", type=int, default=2000)
+    parser.add_argument("--slow", type=float, default=0.25, help="fraction of slow-reading clients")
+    parser.add_argument("--abandon", type=float, default=0.1, help="fraction disconnecting after the first update")
+    parser.add_argument("--read-delay", type=float, default=0.2, help="slow clients' pause between events (s)")
+    parser.add_argument("--concurrency", type=int, default=100,
+                        help="server.py in-flight runs; streams beyond it stay open waiting for a slot")
+    parser.add_argument("--port", type=int, default=8740)
+    args = parser.parse_args()
+
+    process = start(server_command(args.port, 1, args.concurrency), "/ready", args.port)
+    try:
+        report = asyncio.run(run(f"http://127.0.0.1:{args.port}", args.graph, args.streams, args.slow,
+                                 args.abandon, args.read_delay))
+    finally:
+        stop(process)
+
+    results = report["results"]
+    print(f"📡 SSE benchmark: {args.streams} concurrent {args.graph} streams on one worker "
+          f"x {args.concurrency} concurrent runs ({args.slow:.0%} slow, {args.abandon:.0%} abandoning)")
+    print("=" * 60)
+    statuses = {}
+    for r in results:
+        statuses[r["status"]] = statuses.get(r["status"], 0) + 1
+    print(f"   • finished in {report['elapsed']:.1f}s ({os.cpu_count()} CPUs; CPU time worker "
+          f"{report['server_cpu']:.1f}s, this client {report['client_cpu']:.1f}s), responses {statuses}")
+    for behaviour in ("normal", "slow", "abandon"):
+        group = [r for r in results if r["behaviour"] == behaviour and r["first_ms"] is not None]
+        if not group:
+            continue
+        first = [r["first_ms"] for r in group]
+        ends = [r["end_ms"] for r in group if r["end_ms"] is not None]
+        line = f"   • {behaviour:<8} {len(group):>5} streams, first update p50 {statistics.median(first):7.0f} ms " \
+               f"p99 {percentile(first, 0.99):7.0f} ms"
+        if ends:
+            line += f", end p50 {statistics.median(ends):7.0f} ms p99 {percentile(ends, 0.99):7.0f} ms"
+        print(line)
+    peak_open = max((s[0] for s in report["samples"]), default=0)
+    peak_rss = max((s[2] for s in report["samples"]), default=report["idle_rss"])
+    print(f"   • peak open streams {peak_open} (streaming or waiting for a slot), "
+          f"worker RSS {report['idle_rss']:.1f} -> {peak_rss:.1f} MiB "
+          f"({(peak_rss - report['idle_rss']) * 1024 / max(peak_open, 1):.1f} KiB per open stream)")
+    final = report["final"]
+    print(f"   • after: sse {final['sse']}")
+    print(f"   • after: in-flight slots {final['admission']['in_flight']}, queued {final['admission']['queued']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Sticky Routing Benchmark
+Measures per-turn latency and state growth of the enhanced multi-agent graph
+over a long thread, with and without sticky specialist routing.
+"""
+
+import statistics
+import time
+
+from langchain_core.messages import HumanMessage
+from langgraph_cloud_config import create_enhanced_multi_agent_graph
+
+TURNS = 50
+
+FOLLOW_UPS = [
+    "It still shows the same error after the restart",
+    "Okay, I tried that and nothing changed",
+    "Here are the logs you asked for",
+    "Can you check again?",
+    "Thanks, what should I try next?",
+]
+
+def run_thread(sticky: bool, turns: int = TURNS) -> dict:
+    """Run a single multi-turn thread and collect latency and state size per turn."""
+    graph = create_enhanced_multi_agent_graph()
+    config = {'configurable': {'thread_id': f'sticky-bench-{sticky}', 'sticky_routing': sticky}}
+    
+    latencies = []
+    for turn in range(turns):
+        if turn == 0:
+            payload = {
+                'messages': [HumanMessage(content="The export feature is broken and throws an error")],
+                'current_agent': 'coordinator',
+                'agent_handoffs': [],
+                'conversation_context': {},
+                'user_profile': {},
+                'task_queue': [],
+                'agent_outputs': {},
+                'coordination_notes': [],
+                'performance_metrics': {}
+            }
+        else:
+            payload = {'messages': [HumanMessage(content=FOLLOW_UPS[turn % len(FOLLOW_UPS)])]}
+        
+        start = time.perf_counter()
+        result = graph.invoke(payload, config)
+        latencies.append((time.perf_counter() - start) * 1000)
+    
+    checkpoint = graph.checkpointer.get_tuple(config).checkpoint
+    _, blob = graph.checkpointer.serde.dumps_typed(checkpoint)
+    
+    return {
+        "latencies_ms": latencies,
+        "messages": len(result["messages"]),
+        "agent_handoffs": len(result.get("agent_handoffs", [])),
+        "coordination_notes": len(result.get("coordination_notes", [])),
+        "checkpoints": len(list(graph.checkpointer.list(config))),
+        "checkpoint_bytes": len(blob),
+    }
+
+def print_report(label: str, stats: dict):
+    latencies = stats["latencies_ms"]
+    follow_ups = latencies[1:]
+    print(f"\n{label}")
+    print("-" * 50)
+    print(f"   • First turn:            {latencies[0]:.2f} ms")
+    print(f"   • Follow-up median:      {statistics.median(follow_ups):.2f} ms")
+    print(f"   • Follow-up max:         {max(follow_ups):.2f} ms")
+    print(f"   • Messages in state:     {stats['messages']}")
+    print(f"   • Agent handoffs:        {stats['agent_handoffs']}")
+    print(f"   • Coordination notes:    {stats['coordination_notes']}")
+    print(f"   • Checkpoints written:   {stats['checkpoints']}")
+    print(f"   • Latest checkpoint:     {stats['checkpoint_bytes'] / 1024:.1f} KiB")
+
+def main():
+    print(f"📈 Sticky routing benchmark ({TURNS}-turn thread)")
+    print("=" * 50)
+    
+    baseline = run_thread(sticky=False)
+    sticky = run_thread(sticky=True)
+    
+    print_report("🔁 Coordinator on every turn", baseline)
+    print_report("📌 Sticky specialist routing", sticky)
+    
+    speedup = statistics.median(baseline["latencies_ms"][1:]) / statistics.median(sticky["latencies_ms"][1:])
+    print(f"\n⚡ Follow-up turn speedup: {speedup:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Graph Benchmark Suite
+End-to-end benchmarks for graph, customer_service_graph and
+enhanced_multi_agent_graph: single-turn latency, multi-turn thread growth,
+sync and async concurrent throughput, and checkpointer memory per thread.
+Results are written as JSON with environment metadata so runs can be compared.
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --quick --graphs customer_service
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from importlib import metadata
+from typing import Any, Callable, Dict, List
+
+from langchain_core.messages import HumanMessage
+
+SCHEMA_VERSION = 1
+
+def _create_my_agent():
+    from my_agent.graph import create_graph
+    return create_graph()
+
+def _create_customer_service():
+    from customer_service_agent import create_customer_service_graph
+    return create_customer_service_graph()
+
+def _create_enhanced():
+    from langgraph_cloud_config import create_enhanced_multi_agent_graph
+    return create_enhanced_multi_agent_graph()
+
+ENHANCED_START = {
+    'current_agent': 'coordinator', 'agent_handoffs': [], 'conversation_context': {}, 'user_profile': {},
+    'task_queue': [], 'agent_outputs': {}, 'coordination_notes': [], 'performance_metrics': {}
+}
+
+# name -> (factory, first-turn payload builder, follow-up payload builder)
+GRAPHS: Dict[str, tuple] = {
+    "my_agent": (
+        _create_my_agent,
+        lambda text: {'messages': [HumanMessage(content=text)], 'user_info': {}},
+        lambda text: {'messages': [HumanMessage(content=text)]}
+    ),
+    "customer_service": (
+        _create_customer_service,
+        lambda text: {'messages': [HumanMessage(content=text)], 'agent_notes': []},
+        lambda text: {'messages': [HumanMessage(content=text)], 'agent_notes': []}
+    ),
+    "enhanced_multi_agent": (
+        _create_enhanced,
+        lambda text: {'messages': [HumanMessage(content=text)], **ENHANCED_START},
+        lambda text: {'messages': [HumanMessage(content=text)]}
+    ),
+}
+
+MESSAGES = [
+    "Can you help me? My payment failed and the app shows an error",
+    "The export feature is broken, please troubleshoot",
+    "What does the premium upgrade cost?",
+    "I need a report with usage metrics",
+]
+
+FULL = {"single_turn_samples": 300, "turn_checkpoints": [1, 100, 1000], "turn_window": 10,
+        "throughput_requests": 400, "throughput_repeats": 5, "concurrency": 8, "memory_threads": 500}
+QUICK = {"single_turn_samples": 60, "turn_checkpoints": [1, 10, 100], "turn_window": 5,
+         "throughput_requests": 100, "throughput_repeats": 3, "concurrency": 8, "memory_threads": 100}
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.fmean(ordered), 4),
+        "median": round(statistics.median(ordered), 4),
+        "p95": round(pct(95), 4),
+        "p99": round(pct(99), 4),
+        "min": round(ordered[0], 4),
+        "max": round(ordered[-1], 4)
+    }
+
+def thread_storage_bytes(saver, thread_id: str) -> int:
+    """Serialized bytes an in-memory saver holds for one thread, all checkpoints included."""
+    size = 0
+    for checkpoints in saver.storage.get(thread_id, {}).values():
+        for checkpoint, metadata_, _ in checkpoints.values():
+            size += len(checkpoint[1]) + len(metadata_[1])
+    for key, (_, blob) in list(saver.blobs.items()):
+        if key[0] == thread_id:
+            size += len(blob)
+    return size
+
+def rss_kib() -> int:
+    """Current resident set size; falls back to the peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def environment() -> Dict[str, Any]:
+    packages = {}
+    for name in ("langgraph", "langchain-core", "langgraph-checkpoint"):
+        try:
+            packages[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            packages[name] = None
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "hostname": platform.node(),
+        "git_commit": commit,
+        "packages": packages
+    }
+
+def bench_single_turn(factory: Callable, first: Callable, samples: int) -> Dict[str, Any]:
+    graph = factory()
+    for i in range(20):
+        graph.invoke(first(MESSAGES[i % len(MESSAGES)]), {'configurable': {'thread_id': f'warm-{i}'}})
+    latencies = []
+    for i in range(samples):
+        config = {'configurable': {'thread_id': f'single-{i}'}}
+        start = time.perf_counter()
+        graph.invoke(first(MESSAGES[i % len(MESSAGES)]), config)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {"latency_ms": summarize(latencies), "samples_ms": [round(v, 4) for v in latencies]}
+
+def prune_history(saver, config: dict) -> int:
+    """
+    Drops every checkpoint of a thread except the latest from an in-memory
+    saver and returns the serialized bytes released.
+    """
+    thread_id = config["configurable"]["thread_id"]
+    latest = saver.get_tuple(config)
+    keep_id = latest.config["configurable"]["checkpoint_id"]
+    keep_blobs = {(thread_id, ns, channel, version)
+                  for ns in saver.storage.get(thread_id, {})
+                  for channel, version in latest.checkpoint["channel_versions"].items()}
+    released = 0
+    for ns, checkpoints in saver.storage.get(thread_id, {}).items():
+        for checkpoint_id in [c for c in checkpoints if c != keep_id]:
+            checkpoint, metadata_, _ = checkpoints.pop(checkpoint_id)
+            released += len(checkpoint[1]) + len(metadata_[1])
+            saver.writes.pop((thread_id, ns, checkpoint_id), None)
+    for key in [k for k in saver.blobs if k[0] == thread_id and k not in keep_blobs]:
+        released += len(saver.blobs.pop(key)[1])
+    return released
+
+def bench_multi_turn(factory: Callable, first: Callable, follow_up: Callable,
+                     checkpoints: List[int], window: int) -> Dict[str, Any]:
+    """
+    Latency and memory of one thread as it grows. The saver keeps every
+    checkpoint, so retained history grows quadratically with turns; to keep
+    1000-turn runs in memory the superseded checkpoints are pruned after each
+    turn and their size is added to history_bytes instead.
+    """
+    graph = factory()
+    config = {'configurable': {'thread_id': 'multi-turn'}}
+    results = {}
+    latencies = []
+    released = 0
+    for turn in range(1, max(checkpoints) + 1):
+        text = MESSAGES[turn % len(MESSAGES)]
+        payload = first(text) if turn == 1 else follow_up(text)
+        start = time.perf_counter()
+        state = graph.invoke(payload, config)
+        latencies.append((time.perf_counter() - start) * 1000)
+        released += prune_history(graph.checkpointer, config)
+        if turn in checkpoints:
+            recent = latencies[-window:] if turn > 1 else latencies
+            latest_bytes = thread_storage_bytes(graph.checkpointer, "multi-turn")
+            results[str(turn)] = {
+                "latency_ms": summarize(recent),
+                "samples_ms": [round(v, 4) for v in recent],
+                "messages": len(state["messages"]),
+                "checkpoint_bytes": latest_bytes,
+                "history_bytes": latest_bytes + released,
+                "rss_kib": rss_kib()
+            }
+    return results
+
+def bench_sync_throughput(factory: Callable, first: Callable, requests: int, repeats: int,
+                          concurrency: int) -> Dict[str, Any]:
+    graph = factory()
+
+    def invoke(i, run):
+        graph.invoke(first(MESSAGES[i % len(MESSAGES)]), {'configurable': {'thread_id': f'sync-{run}-{i}'}})
+
+    rates = []
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda i: invoke(i, "warm"), range(concurrency * 4)))
+        for run in range(repeats):
+            start = time.perf_counter()
+            list(pool.map(lambda i: invoke(i, run), range(requests)))
+            rates.append(requests / (time.perf_counter() - start))
+    return {"rps": summarize(rates), "samples_rps": [round(v, 2) for v in rates],
+            "concurrency": concurrency, "requests": requests}
+
+def bench_async_throughput(factory: Callable, first: Callable, requests: int, repeats: int,
+                           concurrency: int) -> Dict[str, Any]:
+    graph = factory()
+
+    async def drive(run):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def invoke(i):
+            async with semaphore:
+                await graph.ainvoke(first(MESSAGES[i % len(MESSAGES)]),
+                                    {'configurable': {'thread_id': f'async-{run}-{i}'}})
+
+        await asyncio.gather(*(invoke(i) for i in range(requests)))
+
+    async def main():
+        await drive("warm")
+        rates = []
+        for run in range(repeats):
+            start = time.perf_counter()
+            await drive(run)
+            rates.append(requests / (time.perf_counter() - start))
+        return rates
+
+    rates = asyncio.run(main())
+    return {"rps": summarize(rates), "samples_rps": [round(v, 2) for v in rates],
+            "concurrency": concurrency, "requests": requests}
+
+def bench_checkpoint_memory(factory: Callable, first: Callable, threads: int) -> Dict[str, Any]:
+    graph = factory()
+    graph.invoke(first(MESSAGES[0]), {'configurable': {'thread_id': 'warm'}})
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(threads):
+        graph.invoke(first(MESSAGES[i % len(MESSAGES)]), {'configurable': {'thread_id': f'mem-{i}'}})
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    stored = sum(thread_storage_bytes(graph.checkpointer, f'mem-{i}') for i in range(threads))
+    return {
+        "threads": threads,
+        "heap_bytes_per_thread": round((after - before) / threads),
+        "serialized_bytes_per_thread": round(stored / threads)
+    }
+
+def run_suite(graph_names: List[str], settings: Dict[str, Any], log=print) -> Dict[str, Any]:
+    results: Dict[str, Dict[str, Any]] = {"single_turn": {}, "multi_turn": {}, "throughput": {},
+                                          "checkpoint_memory": {}}
+    for name in graph_names:
+        factory, first, follow_up = GRAPHS[name]
+        log(f"   • {name}: single turn")
+        results["single_turn"][name] = bench_single_turn(factory, first, settings["single_turn_samples"])
+        log(f"   • {name}: multi turn")
+        results["multi_turn"][name] = bench_multi_turn(factory, first, follow_up, settings["turn_checkpoints"],
+                                                       settings["turn_window"])
+        log(f"   • {name}: throughput")
+        results["throughput"][name] = {
+            "sync": bench_sync_throughput(factory, first, settings["throughput_requests"],
+                                          settings["throughput_repeats"], settings["concurrency"]),
+            "async": bench_async_throughput(factory, first, settings["throughput_requests"],
+                                            settings["throughput_repeats"], settings["concurrency"])
+        }
+        log(f"   • {name}: checkpoint memory")
+        results["checkpoint_memory"][name] = bench_checkpoint_memory(factory, first, settings["memory_threads"])
+    return {"schema_version": SCHEMA_VERSION, "environment": environment(), "settings": settings,
+            "results": results}
+
+def print_report(report: Dict[str, Any]):
+    results = report["results"]
+    print("\n📊 Results")
+    for name, single in results["single_turn"].items():
+        latency = single["latency_ms"]
+        print(f"\n   {name}")
+        print(f"   • single turn:  median {latency['median']:.3f} ms, p99 {latency['p99']:.3f} ms")
+        for turn, growth in results["multi_turn"][name].items():
+            print(f"   • turn {turn:>5}:   median {growth['latency_ms']['median']:.3f} ms, "
+                  f"{growth['checkpoint_bytes'] / 1024:.0f} KiB state, "
+                  f"{growth['history_bytes'] / 1048576:.1f} MiB history, RSS {growth['rss_kib'] / 1024:.0f} MiB")
+        throughput = results["throughput"][name]
+        print(f"   • throughput:   sync {throughput['sync']['rps']['median']:.0f} rps, "
+              f"async {throughput['async']['rps']['median']:.0f} rps")
+        memory = results["checkpoint_memory"][name]
+        print(f"   • per thread:   {memory['heap_bytes_per_thread']} B heap, "
+              f"{memory['serialized_bytes_per_thread']} B serialized")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the graph benchmark suite")
+    parser.add_argument("--graphs", nargs="+", choices=list(GRAPHS), default=list(GRAPHS))
+    parser.add_argument("--quick", action="store_true", help="smaller sample sizes for a fast check")
+    parser.add_argument("--output", default=None, help="write JSON results to this path")
+    args = parser.parse_args()
+
+    settings = dict(QUICK if args.quick else FULL)
+    print("📈 Graph benchmark suite")
+    print("=" * 60)
+    report = run_suite(args.graphs, settings)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
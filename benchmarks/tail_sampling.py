@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tail Sampling Benchmark
+Compares invoke latency and trace volume of customer_service_graph with full
+local tracing and with tail-based sampling, on traffic where a minority of
+tickets escalate, and checks that buffered traces stay bounded.
+"""
+
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from langchain_core.messages import HumanMessage
+from customer_service_agent import create_customer_service_graph
+from trace_sink import LocalTraceSink, LocalTracer
+from tail_sampling import TailSampler, TailSamplingTracer
+
+INVOCATIONS = 1000
+
+MESSAGES = [
+    "How do I change my profile picture?",
+    "Where can I find the documentation?",
+    "My payment failed twice",
+    "Can you explain the pricing plans?",
+    "I am angry, the app crashed and I lost my data. This is terrible!",
+]
+
+def run(graph, callbacks=None):
+    rng = random.Random(7)
+    latencies = []
+    for i in range(INVOCATIONS):
+        config = {'configurable': {'thread_id': f'tail-{i}'}}
+        if callbacks:
+            config['callbacks'] = callbacks
+        message = rng.choice(MESSAGES)
+        start = time.perf_counter()
+        graph.invoke({'messages': [HumanMessage(content=message)], 'agent_notes': []}, config)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+def traced(graph, make_tracer):
+    with tempfile.TemporaryDirectory() as directory:
+        sink = LocalTraceSink(directory)
+        tracer = make_tracer(sink)
+        latencies = run(graph, [tracer])
+        sink.close()
+        size = sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory))
+        return latencies, sink.stats()["written"], size, tracer
+
+def main():
+    graph = create_customer_service_graph()
+    run(graph)
+    
+    print("📈 Tail sampling benchmark")
+    print("=" * 60)
+    
+    baseline = run(graph)
+    print(f"   • No tracing:        median {statistics.median(baseline):.2f} ms")
+    
+    full, records, size, _ = traced(graph, lambda sink: LocalTracer(sink))
+    print(f"   • Full local trace:  median {statistics.median(full):.2f} ms, "
+          f"{records} records, {size / 1024:.0f} KiB")
+    
+    sampled, records, size, tracer = traced(
+        graph, lambda sink: TailSamplingTracer(TailSampler(sink, sample_rate=0.05, seed=1)))
+    stats = tracer.sampler.stats()
+    kept = sum(v for k, v in stats.items() if k.startswith("kept_"))
+    print(f"   • Tail sampled:      median {statistics.median(sampled):.2f} ms, "
+          f"{records} records, {size / 1024:.0f} KiB")
+    print(f"     kept {kept}/{INVOCATIONS} runs (escalated {stats['kept_escalated']}, error {stats['kept_error']}, "
+          f"slow {stats['kept_slow']}, random {stats['kept_random']}), buffered now {stats['buffered_traces']}")
+    
+    bounded = TailSampler(LocalTraceSink(tempfile.mkdtemp()), max_buffered_traces=100, max_spans_per_trace=8)
+    for i in range(10_000):
+        bounded.record(f"abandoned-{i}", {"event": "start", "id": str(i)})
+    print(f"   • 10,000 unfinished traces with a 100-trace bound: buffered {bounded.stats()['buffered_traces']}, "
+          f"evicted {bounded.stats()['evicted']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Deferred Task Queue Benchmark
+Compares user-facing turn latency when specialist follow-up work runs inline
+versus on the background worker pool, and reports queue depth and latency.
+"""
+
+import asyncio
+import statistics
+import time
+
+from langchain_core.messages import HumanMessage
+from langgraph_cloud_config import create_enhanced_multi_agent_graph
+from task_queue import TaskWorkerPool, TASK_HANDLERS
+
+THREADS = 200
+# Simulated cost of a real diagnostic run or report build
+TASK_COST_SECONDS = 0.02
+
+MESSAGES = [
+    "Our API returns 500 errors and database timeouts",
+    "I need a report with analytics on our conversations",
+]
+
+def simulate_cost(handler):
+    def slow_handler(task):
+        time.sleep(TASK_COST_SECONDS)
+        return handler(task)
+    return slow_handler
+
+def initial_payload(text):
+    return {
+        'messages': [HumanMessage(content=text)],
+        'current_agent': 'coordinator',
+        'agent_handoffs': [],
+        'conversation_context': {},
+        'user_profile': {},
+        'task_queue': [],
+        'agent_outputs': {},
+        'coordination_notes': [],
+        'performance_metrics': {}
+    }
+
+async def run_inline(graph):
+    latencies = []
+    for i in range(THREADS):
+        config = {'configurable': {'thread_id': f'inline-{i}'}}
+        start = time.perf_counter()
+        result = await graph.ainvoke(initial_payload(MESSAGES[i % 2]), config)
+        for task in result["task_queue"]:
+            await asyncio.to_thread(TASK_HANDLERS[task["kind"]], task)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+async def run_deferred(graph):
+    pool = TaskWorkerPool(graph, max_workers=8)
+    latencies = []
+    peak_depth = 0
+    for i in range(THREADS):
+        config = {'configurable': {'thread_id': f'deferred-{i}'}}
+        start = time.perf_counter()
+        await pool.invoke(initial_payload(MESSAGES[i % 2]), config)
+        latencies.append((time.perf_counter() - start) * 1000)
+        peak_depth = max(peak_depth, pool.stats()["queue_depth"])
+    
+    drain_start = time.perf_counter()
+    await pool.stop(drain=True)
+    drain_ms = (time.perf_counter() - drain_start) * 1000
+    
+    merged = await graph.aget_state({'configurable': {'thread_id': 'deferred-0'}})
+    return latencies, pool.stats(), peak_depth, drain_ms, merged.values
+
+async def main():
+    for kind in list(TASK_HANDLERS):
+        TASK_HANDLERS[kind] = simulate_cost(TASK_HANDLERS[kind])
+    
+    print("📈 Deferred task queue benchmark")
+    print("=" * 60)
+    print(f"   • {THREADS} threads, {TASK_COST_SECONDS * 1000:.0f} ms simulated task cost")
+    
+    inline = await run_inline(create_enhanced_multi_agent_graph())
+    deferred, stats, peak_depth, drain_ms, values = await run_deferred(create_enhanced_multi_agent_graph())
+    
+    print(f"\n🐢 Inline follow-up work:   median turn {statistics.median(inline):.2f} ms")
+    print(f"⚡ Deferred to worker pool: median turn {statistics.median(deferred):.2f} ms")
+    print(f"\n📊 Pool: peak depth {peak_depth}, completed {stats['completed']}, failed {stats['failed']}, "
+          f"drained in {drain_ms:.0f} ms")
+    print(f"   • Queue wait p50/p99: {stats['wait_ms']['p50']:.1f} / {stats['wait_ms']['p99']:.1f} ms")
+    print(f"   • Task run   p50/p99: {stats['run_ms']['p50']:.1f} / {stats['run_ms']['p99']:.1f} ms")
+    print(f"   • Merged into agent_outputs: {sorted(values['agent_outputs']['technical_expert'])}")
+    print(f"   • Pending task_queue after merge: {len(values['task_queue'])}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
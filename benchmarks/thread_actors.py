@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Thread Actor Benchmark
+Sends bursts of concurrent turns to many threads of the basic agent graph and
+compares unsynchronized execution, a global lock and per-thread actors for
+throughput and lost updates.
+"""
+
+import asyncio
+import time
+
+from langchain_core.messages import HumanMessage
+from my_agent.graph import create_graph
+from thread_actors import ThreadActorExecutor
+
+THREADS = 200
+BURST = 5
+# Round-trip added to each checkpoint read and write to model a networked checkpointer
+CHECKPOINT_IO_SECONDS = 0.002
+
+def turn(thread, n):
+    payload = {'messages': [HumanMessage(content=f"Can you help with question {n}?")], 'user_info': {}}
+    return payload, {'configurable': {'thread_id': f'actor-bench-{thread}'}}
+
+def make_graph(io_seconds):
+    graph = create_graph()
+    if io_seconds:
+        saver = graph.checkpointer
+        aput, aget_tuple = saver.aput, saver.aget_tuple
+        
+        async def slow_aput(*args, **kwargs):
+            await asyncio.sleep(io_seconds)
+            return await aput(*args, **kwargs)
+        
+        async def slow_aget_tuple(*args, **kwargs):
+            await asyncio.sleep(io_seconds)
+            return await aget_tuple(*args, **kwargs)
+        
+        saver.aput, saver.aget_tuple = slow_aput, slow_aget_tuple
+    return graph
+
+async def run(invoke):
+    graph_calls = [invoke(*turn(t, n)) for n in range(BURST) for t in range(THREADS)]
+    start = time.perf_counter()
+    await asyncio.gather(*graph_calls)
+    return THREADS * BURST / (time.perf_counter() - start)
+
+async def lost_updates(graph):
+    """Turns whose messages are missing from the final thread state."""
+    lost = 0
+    for t in range(THREADS):
+        state = await graph.aget_state({'configurable': {'thread_id': f'actor-bench-{t}'}})
+        lost += BURST - len(state.values["messages"]) // 2
+    return lost
+
+async def compare(io_seconds):
+    label = f"{io_seconds * 1000:.0f} ms checkpoint I/O" if io_seconds else "in-memory checkpoints"
+    print(f"\n🧪 {label}")
+    print(f"{'':<20}{'turns/s':>10}{'lost turns':>12}")
+    
+    graph = make_graph(io_seconds)
+    throughput = await run(graph.ainvoke)
+    print(f"{'Unsynchronized':<20}{throughput:>10.0f}{await lost_updates(graph):>12}")
+    
+    graph = make_graph(io_seconds)
+    lock = asyncio.Lock()
+    async def locked(payload, config):
+        async with lock:
+            return await graph.ainvoke(payload, config)
+    throughput = await run(locked)
+    print(f"{'Global lock':<20}{throughput:>10.0f}{await lost_updates(graph):>12}")
+    
+    graph = make_graph(io_seconds)
+    executor = ThreadActorExecutor(graph, idle_timeout=0.05)
+    throughput = await run(executor.submit)
+    print(f"{'Per-thread actors':<20}{throughput:>10.0f}{await lost_updates(graph):>12}")
+    
+    await asyncio.sleep(0.1)
+    stats = executor.stats()
+    print(f"   • Actors spawned {stats['spawned']}, reclaimed when idle {stats['reclaimed']}, "
+          f"still active {stats['active_actors']}")
+
+async def main():
+    print("📈 Thread actor benchmark")
+    print("=" * 60)
+    print(f"   • {THREADS} threads x burst of {BURST} concurrent turns")
+    
+    await compare(0)
+    await compare(CHECKPOINT_IO_SECONDS)
+
+if __name__ == "__main__":
+    asyncio.run(main())
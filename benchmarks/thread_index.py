@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Thread Index Benchmark
+Measures what maintaining the thread state index adds to graph turns and
+index updates, then loads 1M synthetic threads and times dashboard queries
+against the index and against a scan over every thread.
+
+    python -m benchmarks.thread_index --threads 1000000
+"""
+
+import argparse
+import random
+import resource
+import statistics
+import time
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks.corpus import TicketCorpus
+from customer_service_agent import create_customer_service_graph
+from thread_index import INDEXED_FIELDS, ThreadIndex
+
+STATUSES = ["in_progress", "resolved", "escalated", "escalated_handling"]
+PRIORITIES = ["low", "medium", "high", "urgent"]
+CATEGORIES = ["billing", "technical", "account", "shipping", "general"]
+AGENTS = ["coordinator", "technical_specialist", "billing_specialist", "customer_success"]
+TIERS = ["Standard", "Premium", "Enterprise"]
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def turn_latency_ms(tickets, index=None):
+    graph = create_customer_service_graph()
+    if index is not None:
+        index.install()
+    samples = []
+    for thread in TicketCorpus(seed=11).threads(tickets):
+        start = time.perf_counter()
+        graph.invoke({'messages': [HumanMessage(content=thread["messages"][0])], 'agent_notes': []},
+                     {'configurable': {'thread_id': thread["thread_id"], 'customer_tier': thread["tier"]}})
+        samples.append((time.perf_counter() - start) * 1000)
+    if index is not None:
+        index.uninstall()
+    return statistics.median(samples)
+
+def random_fields(rng):
+    return (rng.choice(STATUSES), rng.choice(PRIORITIES), rng.choice(CATEGORIES),
+            rng.choice(AGENTS), rng.choice(TIERS))
+
+def timed_us(fn, repeats=20):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples), result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=1_000_000)
+    parser.add_argument("--tickets", type=int, default=300, help="graph turns for the end-to-end overhead")
+    args = parser.parse_args()
+
+    print("🗂️  Thread index benchmark")
+    print("=" * 60)
+
+    baseline = turn_latency_ms(args.tickets)
+    indexed = turn_latency_ms(args.tickets, ThreadIndex())
+    print(f"⏱️  customer_service turn p50: {baseline:.3f} ms without index, {indexed:.3f} ms with "
+          f"({(indexed / baseline - 1) * 100:+.1f}%)")
+
+    rng = random.Random(0)
+    clock = FakeClock(time.time() - 86400)
+    index = ThreadIndex(clock=clock)
+    step = 86400 / args.threads
+    start = time.perf_counter()
+    for i in range(args.threads):
+        clock.now += step
+        index.update("customer_service", f"thread-{i}", random_fields(rng))
+    load_s = time.perf_counter() - start
+    print(f"📥 indexed {args.threads:,} threads: {load_s / args.threads * 1e6:.2f} µs per new thread, "
+          f"peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+
+    samples = []
+    for _ in range(100_000):
+        clock.now += 0.001
+        thread_id = f"thread-{rng.randrange(args.threads)}"
+        fields = random_fields(rng)
+        start = time.perf_counter_ns()
+        index.update("customer_service", thread_id, fields)
+        samples.append(time.perf_counter_ns() - start)
+    unchanged = []
+    for _ in range(100_000):
+        # Re-index a thread right after it changed, as the later checkpoints of a turn do
+        clock.now += 0.001
+        thread_id, fields = f"thread-{rng.randrange(args.threads)}", random_fields(rng)
+        index.update("customer_service", thread_id, fields)
+        start = time.perf_counter_ns()
+        index.update("customer_service", thread_id, fields)
+        unchanged.append(time.perf_counter_ns() - start)
+    print(f"✍️  update of a changed thread: {statistics.median(samples) / 1000:.2f} µs p50, "
+          f"{sorted(samples)[int(len(samples) * 0.999)] / 1000:.1f} µs p99.9 (compaction included); "
+          f"unchanged within touch interval: {statistics.median(unchanged) / 1000:.2f} µs")
+
+    hour_ago = clock.now - 3600
+    entries = index._entries
+
+    def scan():
+        status, priority = INDEXED_FIELDS.index("resolution_status"), INDEXED_FIELDS.index("ticket_priority")
+        matches = [key for key, (_, updated_at, fields) in entries.items()
+                   if fields[status] == "escalated" and fields[priority] == "high" and updated_at >= hour_ago]
+        # Newest first in update order, which is how the index breaks timestamp ties
+        matches.sort(key=lambda key: entries[key][0], reverse=True)
+        return matches[:50]
+
+    queries = [
+        ("escalated + high, last hour, page 1",
+         lambda: index.query("customer_service", since=hour_ago, resolution_status="escalated",
+                             ticket_priority="high")),
+        ("escalated + high + Premium, all time",
+         lambda: index.query("customer_service", resolution_status="escalated", ticket_priority="high",
+                             customer_tier="Premium")),
+        ("most recently updated threads",
+         lambda: index.query("customer_service", limit=100)),
+        ("count by resolution_status",
+         lambda: index.count("customer_service", "resolution_status")),
+    ]
+    print(f"🔎 queries over {len(index):,} threads (p50 of 20)")
+    for name, query in queries:
+        us, _ = timed_us(query)
+        print(f"   • {name:<38} {us:10.1f} µs")
+
+    pages, cursor, start = 0, None, time.perf_counter()
+    while True:
+        page = index.query("customer_service", cursor=cursor, limit=100, resolution_status="escalated",
+                           ticket_priority="high")
+        pages += 1
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    print(f"   • paged through every escalated + high thread: {pages} pages of 100 in "
+          f"{time.perf_counter() - start:.2f}s")
+
+    us, expected = timed_us(scan, repeats=3)
+    got = [(record.graph_name, record.thread_id) for record in queries[0][1]().threads]
+    print(f"🐢 full scan for the first query: {us / 1000:.1f} ms "
+          f"({'same' if got == expected else 'DIFFERENT'} result as the index)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Local Trace Sink Benchmark
+Measures invoke latency of customer_service_graph without tracing and with the
+buffered local tracer, and shows drop counting when the buffer overflows.
+"""
+
+import os
+import statistics
+import tempfile
+import time
+
+from langchain_core.messages import HumanMessage
+from customer_service_agent import create_customer_service_graph
+from trace_sink import LocalTraceSink, LocalTracer, read_runs
+
+INVOCATIONS = 500
+
+def run(graph, callbacks=None):
+    latencies = []
+    for i in range(INVOCATIONS):
+        config = {'configurable': {'thread_id': f'trace-{i}'}}
+        if callbacks:
+            config['callbacks'] = callbacks
+        start = time.perf_counter()
+        graph.invoke({'messages': [HumanMessage(content="My payment failed twice")], 'agent_notes': []}, config)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+def main():
+    graph = create_customer_service_graph()
+    run(graph)
+    
+    print("📈 Local trace sink benchmark")
+    print("=" * 60)
+    
+    baseline = run(graph)
+    print(f"   • No tracing:          median {statistics.median(baseline):.2f} ms")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        sink = LocalTraceSink(directory, max_file_bytes=1024 * 1024)
+        traced = run(graph, [LocalTracer(sink)])
+        sink.close()
+        files = [os.path.join(directory, f) for f in os.listdir(directory) if f.endswith(".jsonl")]
+        size = sum(os.path.getsize(f) for f in files)
+        print(f"   • Local buffered sink: median {statistics.median(traced):.2f} ms")
+        print(f"     {sink.stats()['written']} records, {len(files)} files, {size / 1024:.0f} KiB, "
+              f"{len(read_runs(files))} replayable runs, dropped {sink.stats()['dropped']}")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        sink = LocalTraceSink(directory, buffer_records=64, flush_interval=0.5)
+        burst = run(graph, [LocalTracer(sink)])
+        sink.close()
+        print(f"   • 64-record buffer:    median {statistics.median(burst):.2f} ms, "
+              f"dropped {sink.stats()['dropped']} of {sink.stats()['emitted'] + sink.stats()['dropped']} records")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Warm-Up Benchmark
+Starts a fresh server.py per run and times the first request to each graph,
+comparing a no-op health probe (traffic as soon as the process starts) with
+waiting for /ready, with and without warm-up.
+
+    python -m benchmarks.warmup --runs 3
+"""
+
+import argparse
+import statistics
+import subprocess
+import time
+
+import httpx
+
+from benchmarks.serving import ROOT, server_command, start, stop
+from warmup import START_STATE
+
+SCENARIOS = {
+    # name -> (extra server flags, wait for /ready before sending)
+    "no-op probe": (["--no-prefork", "--no-warmup"], False),
+    "/ready, no warm-up": (["--no-warmup"], True),
+    "/ready + warm-up": ([], True),
+}
+
+TEXTS = ["My invoice shows a double charge", "The app keeps crashing with an error", "Can I upgrade my plan?"]
+
+def payload(graph: str, i: int) -> dict:
+    return {"input": {"messages": [{"role": "user", "content": TEXTS[i % len(TEXTS)]}], **START_STATE[graph]}}
+
+def first_request_ms(client: httpx.Client, graph: str, retry_until: float) -> float:
+    """Latency of one request, counting time spent retrying refused connections."""
+    started = time.perf_counter()
+    while True:
+        try:
+            client.post(f"/graphs/{graph}/invoke", json=payload(graph, 0)).raise_for_status()
+            return (time.perf_counter() - started) * 1000
+        except httpx.ConnectError:
+            if time.perf_counter() > retry_until:
+                raise
+            time.sleep(0.01)
+
+def run(flags, wait_ready: bool, port: int, steady: int) -> dict:
+    command = server_command(port, 1, 100) + flags
+    if wait_ready:
+        process = start(command, "/ready", port)
+    else:
+        process = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                   start_new_session=True)
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+            first = {graph: first_request_ms(client, graph, time.perf_counter() + 60) for graph in START_STATE}
+            later = {}
+            for graph in START_STATE:
+                samples = []
+                for i in range(steady):
+                    started = time.perf_counter()
+                    client.post(f"/graphs/{graph}/invoke", json=payload(graph, i)).raise_for_status()
+                    samples.append((time.perf_counter() - started) * 1000)
+                later[graph] = statistics.median(samples)
+    finally:
+        stop(process)
+    return {"first": first, "steady": later}
+
+def main():
+    parser = argparse.ArgumentParser(description="First-request latency on a freshly started server")
+    parser.add_argument("--runs", type=int, default=3, help="fresh server starts per scenario")
+    parser.add_argument("--steady", type=int, default=20, help="requests per graph after the first")
+    parser.add_argument("--port", type=int, default=8720)
+    args = parser.parse_args()
+
+    print("🔥 First-request latency on a fresh server (median of runs, ms)")
+    print("=" * 60)
+    print(f"   {'scenario':<20}" + "".join(f"{graph:>22}" for graph in START_STATE))
+    for name, (flags, wait_ready) in SCENARIOS.items():
+        results = [run(flags, wait_ready, args.port, args.steady) for _ in range(args.runs)]
+        first = {graph: statistics.median(r["first"][graph] for r in results) for graph in START_STATE}
+        steady = {graph: statistics.median(r["steady"][graph] for r in results) for graph in START_STATE}
+        print(f"   {name:<20}" + "".join(f"{first[graph]:>12.1f} (then {steady[graph]:>4.1f})"
+                                          for graph in START_STATE))
+
+if __name__ == "__main__":
+    main()
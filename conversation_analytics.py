@@ -0,0 +1,179 @@
+"""
+Conversation Analytics
+Incremental store of handoff, category, sentiment, escalation and resolution
+statistics, updated as nodes finish so queries never scan thread history
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List
+
+from node_metrics import (
+    LatencyHistogram, NodeRun, RouteDecision,
+    add_node_observer, remove_node_observer, ROUTE_OBSERVERS
+)
+from prometheus_metrics import ENTRY_NODES
+
+# resolution_status values that close a ticket, and whether it was escalated
+CLOSING_STATUSES = {"resolved": False, "escalated_handling": True}
+
+class _Aggregates:
+    """Counters plus a resolution latency sketch; the unit both totals and window slots are made of."""
+
+    __slots__ = ("counts", "resolution_ns")
+
+    def __init__(self):
+        self.counts: Dict[tuple, int] = {}
+        self.resolution_ns = LatencyHistogram()
+
+    def add(self, key: tuple, amount: int = 1):
+        self.counts[key] = self.counts.get(key, 0) + amount
+
+    def merge(self, other: "_Aggregates"):
+        for key, value in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + value
+        self.resolution_ns.merge(other.resolution_ns)
+
+class SlidingWindow:
+    """
+    Ring of time slots covering the last window_s seconds. Writes go to the
+    slot for the current time, recycling it if it is stale; reads merge the
+    slots still inside the window, so both cost a fixed amount of work.
+    """
+
+    def __init__(self, window_s: float, slots: int, factory: Callable, clock: Callable = time.monotonic):
+        self.window_s = window_s
+        self.width = window_s / slots
+        self._factory = factory
+        self._clock = clock
+        self._slots = [factory() for _ in range(slots)]
+        self._epochs = [-1] * slots
+
+    def current(self):
+        epoch = int(self._clock() / self.width)
+        index = epoch % len(self._slots)
+        if self._epochs[index] != epoch:
+            self._slots[index] = self._factory()
+            self._epochs[index] = epoch
+        return self._slots[index]
+
+    def live(self) -> List[Any]:
+        oldest = int(self._clock() / self.width) - len(self._slots)
+        return [slot for slot, epoch in zip(self._slots, self._epochs) if epoch > oldest]
+
+class ConversationAnalytics:
+    """
+    Streaming conversation statistics fed by node and routing events.
+
+    Every event updates an all-time aggregate and the current slot of a
+    sliding window. Tickets are opened when a node sets resolution_status to
+    in_progress and closed when it is resolved or handed to escalation; open
+    tickets are kept for at most max_open_tickets threads, oldest first out.
+    """
+
+    def __init__(self, window_s: float = 300.0, slots: int = 30, max_open_tickets: int = 100000,
+                 clock: Callable = time.monotonic):
+        self._clock = clock
+        self._totals = _Aggregates()
+        self._window = SlidingWindow(window_s, slots, _Aggregates, clock)
+        self._open: "OrderedDict[tuple, float]" = OrderedDict()
+        self.max_open_tickets = max_open_tickets
+        self._lock = threading.Lock()
+
+    def install(self):
+        """Subscribes to node and routing events of every instrumented graph."""
+        add_node_observer(self._on_node)
+        if self._on_route not in ROUTE_OBSERVERS:
+            ROUTE_OBSERVERS.append(self._on_route)
+
+    def uninstall(self):
+        remove_node_observer(self._on_node)
+        if self._on_route in ROUTE_OBSERVERS:
+            ROUTE_OBSERVERS.remove(self._on_route)
+
+    def _record(self, key: tuple, amount: int = 1):
+        self._totals.add(key, amount)
+        self._window.current().add(key, amount)
+
+    def _on_node(self, run: NodeRun):
+        update = run.update
+        if run.error is not None or not isinstance(update, dict):
+            return
+        with self._lock:
+            if ENTRY_NODES.get(run.graph_name) == run.node_name:
+                self._record(("turns",))
+            if "issue_category" in update:
+                self._record(("category", update["issue_category"]))
+            if "sentiment" in update:
+                self._record(("sentiment", update["sentiment"]))
+            if run.node_name == "coordinator" and "current_agent" in update:
+                self._record(("routed_turns",))
+                self._record(("agent", update["current_agent"]))
+                if update["current_agent"] != run.state.get("current_agent"):
+                    self._record(("handoffs",))
+            if "resolution_status" in update:
+                self._on_status(run, update["resolution_status"])
+
+    def _on_status(self, run: NodeRun, status: str):
+        key = (run.graph_name, (run.config.get("configurable") or {}).get("thread_id"))
+        if status == "in_progress" and key not in self._open:
+            self._open[key] = self._clock()
+            if len(self._open) > self.max_open_tickets:
+                self._open.popitem(last=False)
+        elif status in CLOSING_STATUSES:
+            self._record(("escalations",) if CLOSING_STATUSES[status] else ("resolutions",))
+            opened = self._open.pop(key, None)
+            if opened is not None:
+                elapsed_ns = int((self._clock() - opened) * 1e9)
+                self._totals.resolution_ns.record(elapsed_ns)
+                self._window.current().resolution_ns.record(elapsed_ns)
+
+    def _on_route(self, decision: RouteDecision):
+        if decision.router_name == "entry_router":
+            with self._lock:
+                self._record(("turns",))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All-time and sliding-window statistics; cost does not grow with history."""
+        with self._lock:
+            window = _Aggregates()
+            for slot in self._window.live():
+                window.merge(slot)
+            totals = _summarize(self._totals)
+            totals["open_tickets"] = len(self._open)
+        return {**totals, "window": {"seconds": self._window.window_s, **_summarize(window)}}
+
+def _distribution(counts: Dict[tuple, int], kind: str) -> Dict[str, float]:
+    values = {key[1]: count for key, count in counts.items() if key[0] == kind}
+    total = sum(values.values())
+    return {name: round(count / total, 4) for name, count in sorted(values.items())} if total else {}
+
+def _summarize(aggregates: _Aggregates) -> Dict[str, Any]:
+    counts = aggregates.counts
+    turns = counts.get(("turns",), 0)
+    routed = counts.get(("routed_turns",), 0)
+    handoffs = counts.get(("handoffs",), 0)
+    escalations = counts.get(("escalations",), 0)
+    resolutions = counts.get(("resolutions",), 0)
+    closed = escalations + resolutions
+    latency = aggregates.resolution_ns.summary_ms()
+    return {
+        "turns": turns,
+        "handoffs": handoffs,
+        "routed_turns": routed,
+        "handoff_rate": round(handoffs / routed, 4) if routed else 0.0,
+        "agents": _distribution(counts, "agent"),
+        "categories": _distribution(counts, "category"),
+        "sentiments": _distribution(counts, "sentiment"),
+        "escalations": escalations,
+        "resolutions": resolutions,
+        "escalation_ratio": round(escalations / closed, 4) if closed else 0.0,
+        "resolution_latency_ms": {key: latency[key] for key in ("count", "p50", "p95", "p99")}
+    }
+
+# Process-wide analytics store read by the data analyst agent
+ANALYTICS = ConversationAnalytics()
+
+# Export analytics API
+__all__ = ["ConversationAnalytics", "SlidingWindow", "ANALYTICS"]
@@ -4,12 +4,24 @@ This agent demonstrates the Visual IDE features of LangGraph with a realistic cu
 """
 
 import os
-from typing import TypedDict, Annotated, Literal
+from typing import TypedDict, Annotated, List, Literal, Optional
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
 from langgraph.checkpoint.memory import MemorySaver
 from datetime import datetime
+from deadlines import deadline_aware
+from decision_tables import RuleBook, TableSchema
+from deployment_config import DEPLOYMENT_CONFIG
+from memoization import memoized, pure_node
+from sentiment_model import load_model
+from node_metrics import instrumented, instrumented_router, instrument_checkpointer
+import trace_sink  # registers the AILAB_LOCAL_TRACING hook
+import tail_sampling  # registers the AILAB_TAIL_SAMPLING hook
+import profiling  # profiles requests that ask for it, and a sample when AILAB_PROFILING is set
+import event_store  # records structured events when AILAB_EVENT_STORE is set
+import thread_index  # indexes thread state when AILAB_THREAD_INDEX is set
+import resource_accounting  # accounts per-thread resource usage when AILAB_RESOURCE_ACCOUNTING is set
 import json
 
 # Define the state schema for our customer service agent
@@ -22,6 +34,145 @@ class CustomerServiceState(TypedDict):
     escalation_reason: str
     resolution_status: str
     agent_notes: list
+    performance_metrics: dict
+
+# Keyword tables shared by the sentiment and categorization nodes, checked in order
+SENTIMENT_KEYWORDS = [
+    ("negative", ["angry", "frustrated", "terrible", "awful", "hate"]),
+    ("positive", ["happy", "great", "excellent", "love", "amazing"]),
+    ("urgent", ["urgent", "emergency", "critical", "asap"]),
+]
+
+ISSUE_CATEGORIES = [
+    ("billing", ["billing", "payment", "charge", "invoice", "refund"], "medium"),
+    ("technical", ["technical", "error", "bug", "not working", "broken"], "high"),
+    ("account", ["account", "login", "password", "access"], "medium"),
+    ("complaint", ["complaint", "dissatisfied", "problem"], "high"),
+]
+
+# Knowledge base articles per issue category, built once at import
+KNOWLEDGE_BASE = {
+    "billing": [
+        "To request a refund, please provide your transaction ID and reason for the refund.",
+        "Billing cycles are processed on the 1st of each month.",
+        "You can update your payment method in the account settings."
+    ],
+    "technical": [
+        "Try clearing your browser cache and cookies.",
+        "Ensure you're using the latest version of our application.",
+        "Check your internet connection and try again."
+    ],
+    "account": [
+        "Reset your password using the 'Forgot Password' link on the login page.",
+        "Account verification may take 24-48 hours to complete.",
+        "Enable two-factor authentication for enhanced security."
+    ],
+    "complaint": [
+        "We take all feedback seriously and will investigate your concern.",
+        "A manager will review your case within 24 hours.",
+        "Please provide specific details about your experience."
+    ],
+    "general": [
+        "Visit our FAQ section for common questions.",
+        "Contact us during business hours for immediate assistance.",
+        "Check our status page for any ongoing service issues."
+    ]
+}
+
+# Schemas of the priority and escalation decision tables; their rules are read
+# from the triage rules file and reloaded when it changes
+TRIAGE_SCHEMAS = {
+    "priority": TableSchema(
+        inputs={"base_priority": "str", "tier": "str", "sentiment": "str"},
+        outputs={"priority": "str"}
+    ),
+    "escalation": TableSchema(
+        inputs={"priority": "str", "sentiment": "str", "tier": "str", "previous_tickets": "int"},
+        outputs={"escalate": "bool", "reason": "str"}
+    ),
+}
+
+def triage_rules_path() -> str:
+    rules_file = DEPLOYMENT_CONFIG["triage"]["rules_file"]
+    return os.getenv("AILAB_TRIAGE_RULES", os.path.join(os.path.dirname(os.path.abspath(__file__)), rules_file))
+
+TRIAGE_RULES = RuleBook(triage_rules_path(), TRIAGE_SCHEMAS,
+                        check_interval=DEPLOYMENT_CONFIG["triage"]["reload_check_seconds"])
+
+SENTIMENT_LABELS = ["negative", "neutral", "positive", "urgent"]
+
+# Keyword sentiments that raise priority and escalation; an explicit hit for
+# one of these is not overridden by the model
+ESCALATING_SENTIMENTS = ("negative", "urgent")
+
+def sentiment_model_path() -> str:
+    model_path = DEPLOYMENT_CONFIG["sentiment"]["model_path"]
+    return os.getenv("AILAB_SENTIMENT_MODEL", os.path.join(os.path.dirname(os.path.abspath(__file__)), model_path))
+
+# None when no model is configured: every message uses the keyword rules
+SENTIMENT_MODEL = load_model(sentiment_model_path(), SENTIMENT_LABELS)
+
+def keyword_sentiment(text: str) -> str:
+    """
+    Keyword sentiment of a customer message: negative, positive, urgent or neutral.
+    """
+    text = text.lower()
+    for sentiment, keywords in SENTIMENT_KEYWORDS:
+        if any(word in text for word in keywords):
+            return sentiment
+    return "neutral"
+
+def combine_sentiment(text: str, predicted: Optional[str]) -> str:
+    """
+    The model's prediction for text unless a negative or urgent keyword says
+    otherwise; the keyword rules when the model made none.
+    """
+    lowered = text.lower()
+    for sentiment, keywords in SENTIMENT_KEYWORDS:
+        if sentiment in ESCALATING_SENTIMENTS and any(word in lowered for word in keywords):
+            return sentiment
+    return predicted or keyword_sentiment(text)
+
+def detect_sentiment(text: str) -> str:
+    """
+    Sentiment of a customer message from the hashed n-gram model, or from the
+    keyword rules when no model is loaded or it has no prediction (see
+    combine_sentiment for which wins when both have one).
+    """
+    return combine_sentiment(text, None if SENTIMENT_MODEL is None else SENTIMENT_MODEL.predict(text))
+
+def detect_sentiments(texts: List[str]) -> List[str]:
+    """detect_sentiment() for a batch of messages, with one model pass."""
+    if SENTIMENT_MODEL is None:
+        return [keyword_sentiment(text) for text in texts]
+    return [combine_sentiment(text, sentiment) for text, sentiment in zip(texts, SENTIMENT_MODEL.predict_batch(texts))]
+
+def categorize_issue(text: str) -> tuple:
+    """
+    Returns the (category, base priority) for a customer message.
+    """
+    text = text.lower()
+    for category, keywords, priority in ISSUE_CATEGORIES:
+        if any(word in text for word in keywords):
+            return category, priority
+    return "general", "low"
+
+def adjust_priority(priority: str, tier: str, sentiment: str) -> str:
+    """
+    Adjusts the base priority for the customer's tier and sentiment with the
+    priority decision table (by default: Premium raises medium to high, and
+    negative or urgent sentiment makes any ticket high).
+    """
+    return TRIAGE_RULES.rules().tables["priority"].evaluate(priority, tier, sentiment)[0]
+
+def last_customer_message(state: CustomerServiceState):
+    """
+    Content of the latest HumanMessage in the conversation, or None.
+    """
+    for msg in reversed(state["messages"]):
+        if isinstance(msg, HumanMessage):
+            return msg.content
+    return None
 
 def customer_identification_node(state: CustomerServiceState):
     """
@@ -52,72 +203,43 @@ def customer_identification_node(state: CustomerServiceState):
         "resolution_status": "in_progress"
     }
 
+@pure_node(last_customer_message)
 def sentiment_analysis_node(state: CustomerServiceState):
     """
     Analyzes the sentiment of the customer's message to determine urgency and approach.
     """
-    messages = state["messages"]
-    customer_message = None
-    
-    # Find the last customer message
-    for msg in reversed(messages):
-        if isinstance(msg, HumanMessage):
-            customer_message = msg.content
-            break
+    customer_message = last_customer_message(state)
     
-    # Simple sentiment analysis (in production, you'd use a proper sentiment model)
-    sentiment = "neutral"
-    if any(word in customer_message.lower() for word in ["angry", "frustrated", "terrible", "awful", "hate"]):
-        sentiment = "negative"
-    elif any(word in customer_message.lower() for word in ["happy", "great", "excellent", "love", "amazing"]):
-        sentiment = "positive"
-    elif any(word in customer_message.lower() for word in ["urgent", "emergency", "critical", "asap"]):
-        sentiment = "urgent"
+    sentiment = detect_sentiment(customer_message)
     
+    # No timestamp in the note: the node is memoized on the message alone
     return {
         "sentiment": sentiment,
-        "agent_notes": [f"Sentiment detected: {sentiment} at {datetime.now().strftime('%H:%M:%S')}"]
+        "agent_notes": [f"Sentiment detected: {sentiment}"]
     }
 
+@pure_node(lambda state: (
+    last_customer_message(state),
+    state.get("customer_info", {}).get("tier"),
+    state.get("sentiment", "neutral"),
+    # The update extends the notes written so far (the sentiment note), so they are part of the key
+    tuple(state.get("agent_notes", [])),
+    # Reloaded decision tables start new keys
+    TRIAGE_RULES.rules()
+))
 def issue_categorization_node(state: CustomerServiceState):
     """
     Categorizes the customer's issue to route to the appropriate handler.
     """
-    messages = state["messages"]
-    customer_message = None
-    
-    # Find the last customer message
-    for msg in reversed(messages):
-        if isinstance(msg, HumanMessage):
-            customer_message = msg.content.lower()
-            break
+    customer_message = last_customer_message(state)
     
     # Issue categorization logic
-    if any(word in customer_message for word in ["billing", "payment", "charge", "invoice", "refund"]):
-        category = "billing"
-        priority = "medium"
-    elif any(word in customer_message for word in ["technical", "error", "bug", "not working", "broken"]):
-        category = "technical"
-        priority = "high"
-    elif any(word in customer_message for word in ["account", "login", "password", "access"]):
-        category = "account"
-        priority = "medium"
-    elif any(word in customer_message for word in ["complaint", "dissatisfied", "problem"]):
-        category = "complaint"
-        priority = "high"
-    else:
-        category = "general"
-        priority = "low"
+    category, priority = categorize_issue(customer_message)
     
     # Adjust priority based on customer tier and sentiment
     customer_info = state.get("customer_info", {})
     sentiment = state.get("sentiment", "neutral")
-    
-    if customer_info.get("tier") == "Premium":
-        priority = "high" if priority == "medium" else priority
-    
-    if sentiment in ["negative", "urgent"]:
-        priority = "high"
+    priority = adjust_priority(priority, customer_info.get("tier"), sentiment)
     
     return {
         "issue_category": category,
@@ -133,36 +255,8 @@ def knowledge_base_search_node(state: CustomerServiceState):
     """
     issue_category = state.get("issue_category", "general")
     
-    # Simulate knowledge base search
-    knowledge_base = {
-        "billing": [
-            "To request a refund, please provide your transaction ID and reason for the refund.",
-            "Billing cycles are processed on the 1st of each month.",
-            "You can update your payment method in the account settings."
-        ],
-        "technical": [
-            "Try clearing your browser cache and cookies.",
-            "Ensure you're using the latest version of our application.",
-            "Check your internet connection and try again."
-        ],
-        "account": [
-            "Reset your password using the 'Forgot Password' link on the login page.",
-            "Account verification may take 24-48 hours to complete.",
-            "Enable two-factor authentication for enhanced security."
-        ],
-        "complaint": [
-            "We take all feedback seriously and will investigate your concern.",
-            "A manager will review your case within 24 hours.",
-            "Please provide specific details about your experience."
-        ],
-        "general": [
-            "Visit our FAQ section for common questions.",
-            "Contact us during business hours for immediate assistance.",
-            "Check our status page for any ongoing service issues."
-        ]
-    }
-    
-    relevant_articles = knowledge_base.get(issue_category, knowledge_base["general"])
+    # Simulated knowledge base search
+    relevant_articles = KNOWLEDGE_BASE.get(issue_category, KNOWLEDGE_BASE["general"])
     
     response = AIMessage(
         content=f"I've found some relevant information for your {issue_category} inquiry:\n\n" + 
@@ -177,6 +271,25 @@ def knowledge_base_search_node(state: CustomerServiceState):
         ]
     }
 
+def knowledge_base_fast_path(state: CustomerServiceState):
+    """
+    Degraded knowledge base step used when the request deadline is close:
+    skips the article lookup and promises a follow-up instead.
+    """
+    issue_category = state.get("issue_category", "general")
+    
+    response = AIMessage(
+        content=f"I've logged your {issue_category} inquiry. We're experiencing high demand right now, "
+                "so a member of our team will follow up with detailed guidance shortly."
+    )
+    
+    return {
+        "messages": [response],
+        "agent_notes": state.get("agent_notes", []) + [
+            f"Knowledge base search skipped for {issue_category} issues (deadline)"
+        ]
+    }
+
 def escalation_router_node(state: CustomerServiceState):
     """
     Determines if the issue needs to be escalated based on various factors.
@@ -185,19 +298,10 @@ def escalation_router_node(state: CustomerServiceState):
     sentiment = state.get("sentiment", "neutral")
     customer_info = state.get("customer_info", {})
     
-    escalation_needed = False
-    escalation_reason = ""
-    
-    # Escalation criteria
-    if priority == "high" and sentiment in ["negative", "urgent"]:
-        escalation_needed = True
-        escalation_reason = "High priority issue with negative sentiment"
-    elif customer_info.get("tier") == "Premium" and sentiment == "negative":
-        escalation_needed = True
-        escalation_reason = "Premium customer with negative experience"
-    elif customer_info.get("previous_tickets", 0) > 3:
-        escalation_needed = True
-        escalation_reason = "Customer with multiple previous tickets"
+    # Escalation criteria, from the escalation decision table
+    escalation_needed, escalation_reason = TRIAGE_RULES.rules().tables["escalation"].evaluate(
+        priority, sentiment, customer_info.get("tier"), customer_info.get("previous_tickets", 0)
+    )
     
     if escalation_needed:
         response = AIMessage(
@@ -293,14 +397,17 @@ def create_customer_service_graph():
     # Create the graph
     workflow = StateGraph(CustomerServiceState)
     
-    # Add all nodes to showcase the visual workflow
-    workflow.add_node("customer_identification", customer_identification_node)
-    workflow.add_node("sentiment_analysis", sentiment_analysis_node)
-    workflow.add_node("issue_categorization", issue_categorization_node)
-    workflow.add_node("knowledge_base_search", knowledge_base_search_node)
-    workflow.add_node("escalation_router", escalation_router_node)
-    workflow.add_node("resolution", resolution_node)
-    workflow.add_node("escalation", escalation_node)
+    # Add all nodes to showcase the visual workflow; each checks the request deadline
+    # and records its latency, and the pure ones are memoized
+    timed = instrumented("customer_service", state_metrics=True)
+    memo = memoized("customer_service")
+    workflow.add_node("customer_identification", timed("customer_identification", deadline_aware(customer_identification_node)))
+    workflow.add_node("sentiment_analysis", timed("sentiment_analysis", deadline_aware(memo("sentiment_analysis", sentiment_analysis_node))))
+    workflow.add_node("issue_categorization", timed("issue_categorization", deadline_aware(memo("issue_categorization", issue_categorization_node))))
+    workflow.add_node("knowledge_base_search", timed("knowledge_base_search", deadline_aware(knowledge_base_search_node, degraded=knowledge_base_fast_path)))
+    workflow.add_node("escalation_router", timed("escalation_router", deadline_aware(escalation_router_node)))
+    workflow.add_node("resolution", timed("resolution", deadline_aware(resolution_node)))
+    workflow.add_node("escalation", timed("escalation", deadline_aware(escalation_node)))
     
     # Define the workflow edges for visual representation
     workflow.add_edge(START, "customer_identification")
@@ -312,7 +419,7 @@ def create_customer_service_graph():
     # Conditional edge based on escalation decision
     workflow.add_conditional_edges(
         "escalation_router",
-        should_escalate,
+        instrumented_router("customer_service", "should_escalate", should_escalate),
         {
             "escalate": "escalation",
             "resolve": "resolution"
@@ -324,7 +431,7 @@ def create_customer_service_graph():
     workflow.add_edge("resolution", END)
     
     # Add memory for persistence
-    memory = MemorySaver()
+    memory = instrument_checkpointer("customer_service", MemorySaver())
     
     # Compile the graph
     app = workflow.compile(checkpointer=memory)
@@ -335,7 +442,7 @@ def create_customer_service_graph():
 customer_service_graph = create_customer_service_graph()
 
 # Export for LangGraph deployment
-__all__ = ["customer_service_graph"]
+__all__ = ["customer_service_graph", "detect_sentiment", "detect_sentiments", "combine_sentiment", "categorize_issue", "adjust_priority", "TRIAGE_RULES"]
 
 
 
@@ -0,0 +1,250 @@
+"""
+Request Deadlines and Load Shedding
+Propagates the configured timeout budget through graph invocations and rejects
+work early once the deployment is saturated
+"""
+
+import asyncio
+import contextlib
+import time
+from collections import deque
+from typing import Callable, Dict, Any, Optional
+
+from deployment_config import DEPLOYMENT_CONFIG
+from prometheus_metrics import QUEUE_WAIT
+
+DEFAULT_TIMEOUT_SECONDS = DEPLOYMENT_CONFIG["performance"]["timeout_seconds"]
+DEFAULT_MAX_CONCURRENT = DEPLOYMENT_CONFIG["performance"]["concurrent_executions"]
+
+# Class of requests admitted through a scheduler without one
+DEFAULT_PRIORITY = "medium"
+
+# Nodes switch to their degraded fast path once less than this share of the budget is left
+DEGRADE_FRACTION = 0.1
+
+# configurable keys for the absolute deadline and the degrade threshold. LangGraph
+# copies configurable values into checkpoint metadata except for keys starting
+# with "__", so these do not outlive the invocation that set them
+DEADLINE_KEY = "__ailab_deadline"
+DEGRADE_BELOW_KEY = "__ailab_degrade_below"
+
+class DeadlineExceeded(Exception):
+    """Raised when a node starts after the invocation's deadline has passed."""
+
+class Overloaded(Exception):
+    """Raised by the admission layer when a request is shed; carries a retry hint."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"{reason} (retry after {retry_after:.1f}s)")
+        self.reason = reason
+        self.retry_after = retry_after
+
+def with_deadline(config: Optional[Dict[str, Any]] = None, timeout: float = None) -> Dict[str, Any]:
+    """
+    Returns a copy of config whose configurable dict carries an absolute deadline.
+    An existing deadline is kept if it is earlier than the new one. The
+    deadline is derived afresh on every invocation and never persisted.
+    """
+    timeout = DEFAULT_TIMEOUT_SECONDS if timeout is None else timeout
+    config = dict(config or {})
+    configurable = dict(config.get("configurable", {}))
+    deadline = time.time() + timeout
+    if DEADLINE_KEY in configurable:
+        deadline = min(deadline, configurable[DEADLINE_KEY])
+    configurable[DEADLINE_KEY] = deadline
+    configurable.setdefault(DEGRADE_BELOW_KEY, timeout * DEGRADE_FRACTION)
+    config["configurable"] = configurable
+    return config
+
+def remaining_budget(config: Optional[Dict[str, Any]]) -> float:
+    """Seconds left before the invocation's deadline, or infinity when none is set."""
+    deadline = (config or {}).get("configurable", {}).get(DEADLINE_KEY)
+    if deadline is None:
+        return float("inf")
+    return deadline - time.time()
+
+def should_degrade(config: Optional[Dict[str, Any]]) -> bool:
+    """True when the remaining budget is below the invocation's degrade threshold."""
+    configurable = (config or {}).get("configurable", {})
+    if DEADLINE_KEY not in configurable:
+        return False
+    return remaining_budget(config) < configurable.get(DEGRADE_BELOW_KEY, 0)
+
+def deadline_aware(node: Callable, degraded: Callable = None) -> Callable:
+    """
+    Wraps a graph node so it checks the invocation's remaining budget first.
+    Raises DeadlineExceeded when the budget is spent and runs the degraded
+    fast path, if one is given, when the budget is nearly spent.
+    """
+    def wrapped(state, config):
+        budget = remaining_budget(config)
+        if budget <= 0:
+            raise DeadlineExceeded(f"{node.__name__} started {-budget:.3f}s past the deadline")
+        if degraded is not None and should_degrade(config):
+            return degraded(state)
+        return node(state)
+
+    wrapped.__name__ = node.__name__
+    wrapped.__doc__ = node.__doc__
+    return wrapped
+
+class LoadShedder:
+    """
+    Admission layer enforcing the concurrency limit and a maximum queue age.
+
+    Requests beyond the concurrency limit wait in FIFO order, or in the
+    priority classes of scheduler (an admission_scheduler.AdmissionScheduler
+    with the same limit) when one is given; requests then pass their class
+    as priority. A request is rejected with Overloaded instead of being
+    queued when its estimated wait exceeds max_queue_age or its own remaining
+    budget, and a queued request is dropped once it has waited longer than
+    max_queue_age.
+    """
+
+    def __init__(self, max_concurrent: int = None, max_queue_age: float = None,
+                 timeout: float = None, scheduler=None):
+        self.max_concurrent = max_concurrent or DEFAULT_MAX_CONCURRENT
+        self.timeout = DEFAULT_TIMEOUT_SECONDS if timeout is None else timeout
+        self.max_queue_age = self.timeout * 0.5 if max_queue_age is None else max_queue_age
+        self.scheduler = scheduler
+        self._in_flight = 0
+        self._waiters = deque()
+        self._service_time = None
+        self._counts = {"admitted": 0, "shed": 0, "expired": 0, "cancelled": 0, "completed": 0,
+                        "deadline_exceeded": 0}
+
+    def estimated_wait(self, priority: str = None) -> float:
+        """Expected queueing delay for a new arrival, from the smoothed service time."""
+        if self.scheduler is not None:
+            if self.scheduler.can_admit(priority) or self._service_time is None:
+                return 0.0
+            # Lower classes queued meanwhile do not hold this request back
+            return (self.scheduler.queued_ahead(priority) + 1) * self._service_time / self.max_concurrent
+        if self._in_flight < self.max_concurrent or self._service_time is None:
+            return 0.0
+        return (len(self._waiters) + 1) * self._service_time / self.max_concurrent
+
+    async def submit(self, graph, payload: Dict[str, Any], config: Dict[str, Any] = None, priority: str = None):
+        """
+        Admits the request, runs it with a propagated deadline and records its service time.
+        """
+        config = with_deadline(config, self.timeout)
+        async with self.slot(config, priority):
+            try:
+                result = await asyncio.wait_for(graph.ainvoke(payload, config),
+                                                timeout=max(remaining_budget(config), 0))
+                self._counts["completed"] += 1
+                return result
+            except (asyncio.TimeoutError, DeadlineExceeded):
+                self._counts["deadline_exceeded"] += 1
+                raise DeadlineExceeded("invocation did not finish within its deadline")
+
+    @contextlib.asynccontextmanager
+    async def slot(self, config: Dict[str, Any], priority: str = None):
+        """
+        Holds one concurrency slot for the body of the block, for work that is
+        not a single ainvoke (e.g. a stream). config must carry a deadline.
+        """
+        if self.scheduler is not None:
+            priority = priority or DEFAULT_PRIORITY
+            await self._admit_by_priority(remaining_budget(config), priority)
+        else:
+            await self._admit(remaining_budget(config))
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self._service_time = elapsed if self._service_time is None else 0.9 * self._service_time + 0.1 * elapsed
+            if self.scheduler is not None:
+                self.scheduler.release(priority)
+            else:
+                self._release()
+
+    async def _admit_by_priority(self, budget: float, priority: str):
+        if self.scheduler.can_admit(priority):
+            # Granted without suspending, so not worth a wait_for task
+            await self.scheduler.acquire(priority)
+            self._counts["admitted"] += 1
+            return
+        wait = self.estimated_wait(priority)
+        if wait > self.max_queue_age or wait > budget:
+            self._counts["shed"] += 1
+            raise Overloaded("concurrency limit reached", retry_after=max(wait, 1.0))
+        try:
+            # The scheduler withdraws a cancelled waiter, or releases the slot it was just granted
+            await asyncio.wait_for(self.scheduler.acquire(priority), timeout=min(self.max_queue_age, budget))
+        except asyncio.TimeoutError:
+            self._counts["expired"] += 1
+            raise Overloaded("queue age limit reached", retry_after=max(self.estimated_wait(priority), 1.0))
+        except asyncio.CancelledError:
+            self._counts["cancelled"] += 1
+            raise
+        self._counts["admitted"] += 1
+
+    async def _admit(self, budget: float):
+        if self._in_flight < self.max_concurrent and not self._waiters:
+            self._in_flight += 1
+            self._counts["admitted"] += 1
+            QUEUE_WAIT.observe(0.0, "load_shedder")
+            return
+
+        wait = self.estimated_wait()
+        if wait > self.max_queue_age or wait > budget:
+            self._counts["shed"] += 1
+            raise Overloaded("concurrency limit reached", retry_after=max(wait, 1.0))
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        queued_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=min(self.max_queue_age, budget))
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self._counts["expired"] += 1
+            raise Overloaded("queue age limit reached", retry_after=max(self.estimated_wait(), 1.0))
+        except asyncio.CancelledError:
+            # A cancelled request must not leave a dead waiter for _release to hand a slot to
+            self._abandon(waiter)
+            self._counts["cancelled"] += 1
+            raise
+        self._counts["admitted"] += 1
+        QUEUE_WAIT.observe(time.perf_counter() - queued_at, "load_shedder")
+
+    def _abandon(self, waiter: asyncio.Future):
+        """Drops a waiter that gave up, or hands its slot on if it was granted just before."""
+        if waiter.done() and not waiter.cancelled():
+            self._release()
+        else:
+            waiter.cancel()
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Current load and cumulative admission outcomes."""
+        if self.scheduler is not None:
+            scheduler = self.scheduler.stats()
+            load = {"in_flight": scheduler["running"],
+                    "queued": sum(stats["queued"] for stats in scheduler["classes"].values()),
+                    "classes": scheduler["classes"]}
+        else:
+            load = {"in_flight": self._in_flight, "queued": len(self._waiters)}
+        return {
+            **load,
+            "service_time_ms": round((self._service_time or 0.0) * 1000, 3),
+            **self._counts
+        }
+
+# Export deadline API
+__all__ = [
+    "DeadlineExceeded", "Overloaded", "LoadShedder",
+    "with_deadline", "remaining_budget", "should_degrade", "deadline_aware"
+]
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Decision Tables
+First-match rule tables loaded from a JSON file and compiled into Python
+functions for single evaluations and NumPy boolean masks for batches, with
+atomic hot reload so thresholds change without a deploy
+
+The code that evaluates a table declares its schema (input and output names
+and types, in call order); the file only holds rules over those names:
+
+    {
+      "tables": {
+        "escalation": {
+          "rules": [
+            {"when": {"priority": {"eq": "high"}, "sentiment": {"in": ["negative", "urgent"]}},
+             "then": {"escalate": true, "reason": "High priority issue with negative sentiment"}},
+            {"when": {"previous_tickets": {"gt": 3}},
+             "then": {"escalate": true, "reason": "Customer with multiple previous tickets"}}
+          ],
+          "default": {"escalate": false, "reason": ""}
+        }
+      }
+    }
+
+Conditions in a rule are ANDed; the first matching rule wins and the
+default applies when none does. An output may copy an input with
+{"input": "<name>"}. Operators: eq, ne, in, not_in, gt, ge, lt, le.
+
+    python decision_tables.py triage_rules.json    # validate a file and print the compiled code
+"""
+
+import argparse
+import json
+import operator
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Python source operator per condition operator
+OPERATORS = {"eq": "==", "ne": "!=", "in": "in", "not_in": "not in", "gt": ">", "ge": ">=", "lt": "<", "le": "<="}
+# Row-at-a-time predicate per condition operator, for dictionary-encoded columns
+PREDICATES = {
+    "eq": operator.eq, "ne": operator.ne, "gt": operator.gt, "ge": operator.ge, "lt": operator.lt, "le": operator.le,
+    "in": lambda field, values: field in values, "not_in": lambda field, values: field not in values,
+}
+ORDERED = {"gt", "ge", "lt", "le"}
+MEMBERSHIP = {"in", "not_in"}
+
+# Schema type name -> (Python types accepted in rules, NumPy dtype for batches)
+TYPES = {
+    "str": ((str,), object),
+    "int": ((int,), np.int64),
+    "float": ((int, float), np.float64),
+    "bool": ((bool,), np.bool_),
+}
+
+class RuleError(ValueError):
+    """Raised for a rules file that does not fit its tables' schemas."""
+
+class TableSchema:
+    """
+    Inputs and outputs of one table as {name: type name}, in the order the
+    compiled function takes its arguments and returns its outputs.
+    """
+
+    def __init__(self, inputs: Dict[str, str], outputs: Dict[str, str]):
+        for name, kind in {**inputs, **outputs}.items():
+            if not name.isidentifier() or name.startswith("_"):
+                raise ValueError(f"schema name {name!r} is not a plain identifier")
+            if kind not in TYPES:
+                raise ValueError(f"unknown type {kind!r} for {name!r}")
+        self.inputs = dict(inputs)
+        self.outputs = dict(outputs)
+
+def _check_value(table: str, name: str, kind: str, value: Any):
+    accepted = TYPES[kind][0]
+    # bool is an int subclass; keep the two apart
+    if not isinstance(value, accepted) or (kind != "bool" and isinstance(value, bool)):
+        raise RuleError(f"{table}: {name} expects a {kind} value, got {value!r}")
+
+class DecisionTable:
+    """
+    One compiled table. evaluate(*inputs) returns the outputs as a tuple in
+    schema order; evaluate_batch(columns) returns one NumPy array per output.
+    """
+
+    def __init__(self, name: str, schema: TableSchema, spec: Dict[str, Any]):
+        self.name = name
+        self.schema = schema
+        self.rules = [self._parse_rule(i, rule) for i, rule in enumerate(spec.get("rules") or [])]
+        if "default" not in spec:
+            raise RuleError(f"{name}: a default is required")
+        self.default = self._parse_outputs("default", spec["default"], complete=True)
+        self.source, self.evaluate = self._compile()
+
+    def _parse_rule(self, index: int, rule: Dict[str, Any]) -> Tuple[List[Tuple[str, str, Any]], Dict[str, Any]]:
+        where = f"{self.name} rule {index}"
+        if not isinstance(rule, dict) or not isinstance(rule.get("when"), dict) or "then" not in rule:
+            raise RuleError(f"{where}: needs \"when\" and \"then\" objects")
+        conditions = []
+        for field, tests in rule["when"].items():
+            if field not in self.schema.inputs:
+                raise RuleError(f"{where}: unknown input {field!r}")
+            if not isinstance(tests, dict) or not tests:
+                raise RuleError(f"{where}: condition on {field!r} must be an object like {{\"eq\": ...}}")
+            kind = self.schema.inputs[field]
+            for op, value in tests.items():
+                if op not in OPERATORS:
+                    raise RuleError(f"{where}: unknown operator {op!r}")
+                if op in ORDERED and kind not in ("int", "float"):
+                    raise RuleError(f"{where}: {op} needs a numeric input, {field!r} is {kind}")
+                if op in MEMBERSHIP:
+                    if not isinstance(value, list) or not value:
+                        raise RuleError(f"{where}: {op} on {field!r} needs a non-empty list")
+                    for item in value:
+                        _check_value(where, field, kind, item)
+                    value = frozenset(value)
+                else:
+                    _check_value(where, field, kind, value)
+                conditions.append((field, op, value))
+        if not conditions:
+            raise RuleError(f"{where}: \"when\" is empty; use the default instead")
+        return conditions, self._parse_outputs(where, rule["then"], complete=False)
+
+    def _parse_outputs(self, where: str, then: Dict[str, Any], complete: bool) -> Dict[str, Any]:
+        if not isinstance(then, dict):
+            raise RuleError(f"{where}: outputs must be an object")
+        outputs = {}
+        for name, value in then.items():
+            if name not in self.schema.outputs:
+                raise RuleError(f"{where}: unknown output {name!r}")
+            kind = self.schema.outputs[name]
+            if isinstance(value, dict):
+                source = value.get("input")
+                if set(value) != {"input"} or self.schema.inputs.get(source) != kind:
+                    raise RuleError(f"{where}: {name} can only copy a {kind} input, got {value!r}")
+                outputs[name] = ("input", source)
+            else:
+                _check_value(where, name, kind, value)
+                outputs[name] = ("value", value)
+        missing = [name for name in self.schema.outputs if name not in outputs]
+        if complete and missing:
+            raise RuleError(f"{where}: missing outputs {missing}")
+        return outputs
+
+    def _row_outputs(self, outputs: Dict[str, Any]) -> Dict[str, Any]:
+        # Outputs a rule leaves out come from the default
+        return {name: outputs.get(name, self.default[name]) for name in self.schema.outputs}
+
+    def _compile(self) -> Tuple[str, Callable]:
+        """
+        Generates the if-chain a person would write. Only schema names (checked
+        identifiers) appear in the source; rule values are bound as constants.
+        """
+        constants: Dict[str, Any] = {}
+
+        def constant(value) -> str:
+            name = f"_c{len(constants)}"
+            constants[name] = value
+            return name
+
+        def result(outputs) -> str:
+            outputs = self._row_outputs(outputs)
+            if all(kind == "value" for kind, _ in outputs.values()):
+                return constant(tuple(value for _, value in outputs.values()))
+            items = [value if kind == "input" else constant(value) for kind, value in outputs.values()]
+            return "(" + ", ".join(items) + ",)"
+
+        args = ", ".join(self.schema.inputs)
+        lines = [f"def evaluate({args}):"]
+        for conditions, outputs in self.rules:
+            test = " and ".join(f"{field} {OPERATORS[op]} {constant(value)}" for field, op, value in conditions)
+            lines.append(f"    if {test}:")
+            lines.append(f"        return {result(outputs)}")
+        lines.append(f"    return {result(self.default)}")
+        source = "\n".join(lines) + "\n"
+        namespace = dict(constants)
+        exec(compile(source, f"<decision table {self.name}>", "exec"), namespace)
+        return source, namespace["evaluate"]
+
+    def evaluate_batch(self, columns: Mapping[str, Sequence], strings: Sequence[str] = None) -> Dict[str, np.ndarray]:
+        """
+        Evaluates every row of columns ({input: sequence}, all the same
+        length) with boolean masks: each rule claims the rows it matches
+        that no earlier rule did.
+
+        String columns may be dictionary-encoded like the event store's
+        (integer codes into strings, e.g. StringPool.strings): conditions on
+        them are evaluated once per distinct string and gathered by code,
+        instead of comparing Python objects row by row.
+        """
+        arrays, encoded = {}, set()
+        for name, kind in self.schema.inputs.items():
+            if name not in columns:
+                raise KeyError(f"{self.name}: missing input column {name!r}")
+            column = columns[name]
+            if kind == "str" and strings is not None and getattr(column, "dtype", None) is not None \
+                    and column.dtype.kind in "iu":
+                arrays[name] = column
+                encoded.add(name)
+            else:
+                arrays[name] = np.asarray(column, dtype=TYPES[kind][1])
+        rows = len(next(iter(arrays.values()))) if arrays else 0
+        if any(len(array) != rows for array in arrays.values()):
+            raise ValueError(f"{self.name}: input columns differ in length")
+
+        # Index of the rule that claims each row; len(rules) is the default
+        choice = np.full(rows, len(self.rules), dtype=np.intp)
+        unmatched = np.ones(rows, dtype=bool)
+        for index, (conditions, _) in enumerate(self.rules):
+            if not unmatched.any():
+                break
+            mask = unmatched.copy()
+            for field, op, value in conditions:
+                if field in encoded:
+                    mask &= self._string_matches(strings, op, value)[arrays[field]]
+                else:
+                    mask &= self._condition_mask(arrays[field], op, value)
+            choice[mask] = index
+            unmatched &= ~mask
+
+        # Each output is one gather of its per-rule constants by choice, then
+        # the rows of rules that copy an input
+        row_outputs = [self._row_outputs(outputs) for _, outputs in [*self.rules, (None, self.default)]]
+        results = {}
+        for name, kind in self.schema.outputs.items():
+            constants = np.empty(len(row_outputs), dtype=TYPES[kind][1])
+            for index, outputs in enumerate(row_outputs):
+                source, value = outputs[name]
+                if source == "value":
+                    constants[index] = value
+            results[name] = constants[choice]
+            for index, outputs in enumerate(row_outputs):
+                source, value = outputs[name]
+                if source == "input":
+                    mask = choice == index
+                    column = arrays[value][mask]
+                    results[name][mask] = np.asarray(strings, dtype=object)[column] if value in encoded else column
+        return results
+
+    @staticmethod
+    def _string_matches(strings: Sequence[str], op: str, value: Any) -> np.ndarray:
+        """Whether each dictionary string satisfies the condition, indexable by code."""
+        test = PREDICATES[op]
+        return np.fromiter((test(string, value) for string in strings), dtype=bool, count=len(strings))
+
+    @staticmethod
+    def _condition_mask(column: np.ndarray, op: str, value: Any) -> np.ndarray:
+        if op in MEMBERSHIP:
+            # Lists are short; equality masks also work on object columns holding None,
+            # which np.isin would have to sort
+            mask = np.zeros(len(column), dtype=bool)
+            for item in value:
+                mask |= column == item
+            return ~mask if op == "not_in" else mask
+        if op == "eq":
+            return column == value
+        if op == "ne":
+            return column != value
+        return {"gt": np.greater, "ge": np.greater_equal, "lt": np.less, "le": np.less_equal}[op](column, value)
+
+class RuleSet:
+    """Every table compiled from one version of a rules file. Never modified once built."""
+
+    def __init__(self, spec: Dict[str, Any], schemas: Dict[str, TableSchema], source: str = None):
+        if not isinstance(spec, dict) or not isinstance(spec.get("tables"), dict):
+            raise RuleError("rules file needs a \"tables\" object")
+        missing = [name for name in schemas if name not in spec["tables"]]
+        if missing:
+            raise RuleError(f"rules file is missing tables {missing}")
+        unknown = [name for name in spec["tables"] if name not in schemas]
+        if unknown:
+            raise RuleError(f"rules file has unknown tables {unknown}")
+        self.tables = {name: DecisionTable(name, schema, spec["tables"][name]) for name, schema in schemas.items()}
+        self.source = source
+        self.loaded_at = time.time()
+
+    def __getitem__(self, name: str) -> DecisionTable:
+        return self.tables[name]
+
+    @classmethod
+    def from_file(cls, path: str, schemas: Dict[str, TableSchema]) -> "RuleSet":
+        with open(path) as f:
+            try:
+                spec = json.load(f)
+            except json.JSONDecodeError as e:
+                raise RuleError(f"{path}: {e}")
+        return cls(spec, schemas, source=path)
+
+class RuleBook:
+    """
+    The current RuleSet for a rules file. rules() re-checks the file's
+    modification time at most every check_interval seconds; a changed file
+    is compiled in full and swapped in with one reference assignment, so a
+    caller that takes rules() once per ticket never sees a mix of versions.
+    A file that fails to parse or validate is reported and the previous
+    rules stay in force. Write new files atomically (write, then rename).
+    """
+
+    def __init__(self, path: str, schemas: Dict[str, TableSchema], check_interval: float = 2.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.path = path
+        self.schemas = schemas
+        self.check_interval = check_interval
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._stamp = self._file_stamp()
+        self._current = RuleSet.from_file(path, schemas)
+        self._next_check = clock() + check_interval
+        self._counts = {"reloads": 0, "reload_errors": 0}
+        self.last_error: Optional[str] = None
+        RULE_BOOKS[path] = self
+
+    def _file_stamp(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def rules(self) -> RuleSet:
+        if self.clock() >= self._next_check:
+            self.check()
+        return self._current
+
+    def check(self) -> bool:
+        """Reloads the file if it changed since the last load. Returns True when new rules were swapped in."""
+        # Only one thread checks; the others keep using the current rules
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self._next_check = self.clock() + self.check_interval
+            stamp = self._file_stamp()
+            if stamp is None or stamp == self._stamp:
+                return False
+            self._stamp = stamp
+            try:
+                rules = RuleSet.from_file(self.path, self.schemas)
+            except (OSError, RuleError) as e:
+                self._counts["reload_errors"] += 1
+                self.last_error = str(e)
+                print(f"⚠️  Keeping the current decision tables: {e}")
+                return False
+            self._current = rules
+            self._counts["reloads"] += 1
+            self.last_error = None
+            return True
+        finally:
+            self._lock.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": self.path, "loaded_at": self._current.loaded_at, "last_error": self.last_error,
+                **self._counts}
+
+# Every RuleBook created in this process, by rules file path
+RULE_BOOKS: Dict[str, RuleBook] = {}
+
+def rule_book_stats() -> Dict[str, Dict[str, Any]]:
+    """Load time, reload counts and the last reload error per rules file."""
+    return {path: book.stats() for path, book in RULE_BOOKS.items()}
+
+# Export decision table API
+__all__ = ["RuleBook", "RuleSet", "DecisionTable", "TableSchema", "RuleError", "RULE_BOOKS", "rule_book_stats"]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate a triage rules file and print the compiled tables")
+    parser.add_argument("path", nargs="?", default=None, help="rules file (default: the configured triage rules)")
+    args = parser.parse_args()
+
+    from customer_service_agent import TRIAGE_SCHEMAS, triage_rules_path
+    path = args.path or triage_rules_path()
+    try:
+        rule_set = RuleSet.from_file(path, TRIAGE_SCHEMAS)
+    except RuleError as e:
+        raise SystemExit(f"❌ {e}")
+    for table in rule_set.tables.values():
+        print(f"# {table.name}: {len(table.rules)} rules")
+        print(table.source)
+    print(f"✅ {path} is valid")
@@ -58,7 +58,79 @@ DEPLOYMENT_CONFIG = {
         "concurrent_executions": 100,
         "timeout_seconds": 300,
         "memory_limit_mb": 1024,
-        "auto_scaling": True
+        "auto_scaling": True,
+        
+        # LRU of pure nodes' updates (memoization.py), per node; AILAB_NODE_MEMO overrides.
+        # Off while the pure nodes are keyword matches cheaper than a cache hit
+        "node_memo": False,
+        "node_memo_max_entries": 4096
+    },
+    
+    # Production HTTP server (python server.py)
+    "serving": {
+        "host": "0.0.0.0",
+        "port": 8000,
+        # One worker: each worker checkpoints threads in its own MemorySaver, and
+        # turns of a thread landing on different workers would lose its state
+        "workers": 1,
+        "prefork": True,
+        "warmup": True,
+        "keep_alive_seconds": 75,
+        "backlog": 2048,
+        "max_batch_size": 100,
+        # Background workers per graph for deferred specialist tasks (task_queue.py)
+        "task_workers": 4,
+        # Share of the concurrency limit each ticket priority may hold
+        # (admission_scheduler.py); most traffic is low, so lower classes
+        # only leave headroom for high priority requests rather than halving capacity
+        "admission_class_shares": {"high": 1.0, "medium": 0.9, "low": 0.8},
+        
+        # Server-Sent Events (/graphs/{name}/events)
+        "sse_buffer_events": 16,
+        "sse_heartbeat_seconds": 15,
+        "sse_send_timeout_seconds": 30
+    },
+    
+    # Priority and escalation decision tables (decision_tables.py); AILAB_TRIAGE_RULES
+    # overrides the file, e.g. with a mounted ConfigMap, and edits apply without a deploy
+    "triage": {
+        "rules_file": "triage_rules.json",
+        "reload_check_seconds": 2.0
+    },
+    
+    # Hashed n-gram sentiment classifier (sentiment_model.py); AILAB_SENTIMENT_MODEL
+    # overrides the path, and an empty value or a missing file means keyword sentiment
+    "sentiment": {
+        "model_path": "models/sentiment.npz"
+    },
+    
+    # Local metrics endpoint scraped by Prometheus
+    "monitoring": {
+        "metrics_port": 9464,
+        
+        # Buffered local trace files, replayed to LangSmith offline
+        "trace_dir": "traces",
+        "trace_max_file_mb": 64,
+        "trace_max_files": 20,
+        "trace_buffer_records": 10000,
+        "trace_carry_max_seconds": 3600,
+        
+        # Tail-based sampling: keep escalated, failed and slow runs plus a random share
+        "tail_sample_rate": 0.05,
+        "tail_latency_threshold_ms": 1000,
+        "tail_max_buffered_traces": 1000,
+        "tail_max_spans_per_trace": 200,
+        
+        # Per-thread resource accounting
+        "accounting_max_threads": 100000,
+        "allocation_sample_rate": 0.01,
+        
+        # On-demand node profiling (collapsed stacks for flamegraphs)
+        "profile_dir": "profiles",
+        "profile_sample_rate": 0.0,
+        
+        # Columnar event store for offline analysis
+        "event_dir": "events"
     },
     
     # Visual IDE optimization
@@ -76,7 +148,10 @@ def get_cloud_environment_variables() -> Dict[str, str]:
     Returns environment variables optimized for cloud deployment.
     """
     return {
-        "LANGCHAIN_TRACING_V2": "true",
+        # Traces go to the local buffered sink; replay them with `python trace_sink.py upload`
+        "LANGCHAIN_TRACING_V2": "false",
+        "AILAB_LOCAL_TRACING": "true",
+        "AILAB_TRACE_DIR": "traces",
         "LANGCHAIN_ENDPOINT": "https://eu.api.smith.langchain.com",
         "LANGSMITH_ENDPOINT": "https://eu.api.smith.langchain.com",
         "LANGCHAIN_PROJECT": "AI-LAB-Customer-Service-Dev",
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Columnar Event Store
+Append-only store of structured graph events (routing, handoffs, escalations,
+node runs) kept as per-column NumPy segments with a dictionary-encoded string
+pool, memory-mapped for vectorized offline analysis
+"""
+
+import argparse
+import atexit
+import glob
+import json
+import os
+import socket
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from deployment_config import DEPLOYMENT_CONFIG
+from node_metrics import NodeRun, RouteDecision, add_node_observer, remove_node_observer, ROUTE_OBSERVERS
+
+MONITORING = DEPLOYMENT_CONFIG["monitoring"]
+
+# Set AILAB_EVENT_STORE=true to record events from every instrumented graph
+EVENT_STORE_ENV = "AILAB_EVENT_STORE"
+
+# Column name -> dtype; every column except ts holds string pool codes
+COLUMNS = {
+    "ts": np.float64,
+    "thread": np.uint32,
+    "graph": np.uint32,
+    "node": np.uint32,
+    "event_type": np.uint32,
+    "category": np.uint32,
+    "priority": np.uint32,
+    "agent": np.uint32,
+}
+STRING_COLUMNS = [name for name in COLUMNS if name != "ts"]
+
+class StringPool:
+    """
+    Dictionary encoding shared by all string columns. Code 0 is the empty
+    string; new strings are appended to strings.jsonl, one JSON string per
+    line, so a code is the string's line number.
+
+    Not thread-safe: EventStore encodes under its own lock and tells
+    flush() how many strings existed at that point.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.strings: List[str] = [""]
+        self._codes: Dict[str, int] = {"": 0}
+        self._persisted = 1
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    self._add(json.loads(line))
+            self._persisted = len(self.strings)
+
+    def _add(self, value: str) -> int:
+        code = self._codes[value] = len(self.strings)
+        self.strings.append(value)
+        return code
+
+    def encode(self, value: Optional[str]) -> int:
+        if not value:
+            return 0
+        code = self._codes.get(value)
+        return self._add(value) if code is None else code
+
+    def code(self, value: str) -> Optional[int]:
+        """Code of an existing string, or None if it never occurred."""
+        return self._codes.get(value or "")
+
+    def decode(self, codes) -> List[str]:
+        strings = self.strings
+        return [strings[code] for code in codes]
+
+    def flush(self, count: int = None):
+        """Persists the first count strings (all by default) that are not yet in the file."""
+        count = len(self.strings) if count is None else count
+        if self._persisted < count:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(value) + "\n" for value in self.strings[self._persisted:count])
+            self._persisted = count
+
+class EventStore:
+    """
+    Writer and reader for one store directory, with one writing process:
+    the segment counter and string pool codes are only valid within it.
+    Processes sharing an event directory each write their own partition
+    (see writer_directory() and partitions()).
+
+    Appended events are buffered in column lists and written as an immutable
+    segment of .npy files (one per column) every segment_rows events, or on
+    flush(). Readers memory-map the segments, so scans over tens of millions
+    of rows touch only the columns they use.
+    """
+
+    def __init__(self, directory: str = None, segment_rows: int = 65536):
+        self.directory = directory or event_directory()
+        self.segment_rows = segment_rows
+        os.makedirs(self.directory, exist_ok=True)
+        self.pool = StringPool(os.path.join(self.directory, "strings.jsonl"))
+        self._buffer: Dict[str, list] = {name: [] for name in COLUMNS}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._next_segment = len(self._segment_dirs())
+
+    def append(self, event_type: str, graph: str, thread: str = None, node: str = None,
+               category: str = None, priority: str = None, agent: str = None, ts: float = None):
+        encode = self.pool.encode
+        with self._lock:
+            buffer = self._buffer
+            buffer["ts"].append(time.time() if ts is None else ts)
+            buffer["thread"].append(encode(thread))
+            buffer["graph"].append(encode(graph))
+            buffer["node"].append(encode(node))
+            buffer["event_type"].append(encode(event_type))
+            buffer["category"].append(encode(category))
+            buffer["priority"].append(encode(priority))
+            buffer["agent"].append(encode(agent))
+            full = len(buffer["ts"]) >= self.segment_rows
+        if full:
+            self.flush()
+
+    def append_columns(self, columns: Dict[str, Any]):
+        """
+        Bulk ingest: writes whole columns as one segment. String columns may be
+        given as strings or as codes already in the pool; missing columns are empty.
+        """
+        rows = len(columns["ts"])
+        arrays = {}
+        for name, dtype in COLUMNS.items():
+            values = columns.get(name)
+            if values is None:
+                arrays[name] = np.zeros(rows, dtype=dtype)
+            elif dtype is not np.float64 and len(values) and isinstance(values[0], str):
+                # Under the lock, like append(), so concurrent encodes never hand out the same code
+                with self._lock:
+                    arrays[name] = np.fromiter((self.pool.encode(v) for v in values), dtype=dtype, count=rows)
+            else:
+                arrays[name] = np.asarray(values, dtype=dtype)
+        with self._flush_lock:
+            self._write_segment(arrays)
+
+    def flush(self):
+        """Writes buffered events as a new segment."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._buffer["ts"]:
+                    return
+                buffer, self._buffer = self._buffer, {name: [] for name in COLUMNS}
+            self._write_segment({name: np.asarray(values, dtype=COLUMNS[name]) for name, values in buffer.items()})
+
+    def _write_segment(self, arrays: Dict[str, np.ndarray]):
+        # The pool goes first so every code in a visible segment can be decoded.
+        # Strings encoded after this count are left for the next flush; one
+        # appended between writing and marking would be marked but never written
+        with self._lock:
+            count = len(self.pool.strings)
+        self.pool.flush(count)
+        final = os.path.join(self.directory, f"segment-{self._next_segment:06d}")
+        partial = final + ".part"
+        os.makedirs(partial, exist_ok=True)
+        for name, array in arrays.items():
+            np.save(os.path.join(partial, f"{name}.npy"), array)
+        os.replace(partial, final)
+        self._next_segment += 1
+
+    def _segment_dirs(self) -> List[str]:
+        return sorted(path for path in glob.glob(os.path.join(self.directory, "segment-*"))
+                      if not path.endswith(".part"))
+
+    def segments(self, columns: List[str]) -> Iterator[Dict[str, np.ndarray]]:
+        """Memory-mapped columns of each segment."""
+        for path in self._segment_dirs():
+            yield {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in columns}
+
+    def column(self, name: str) -> np.ndarray:
+        """One column across all segments, concatenated into memory."""
+        parts = [segment[name] for segment in self.segments([name])]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=COLUMNS[name])
+
+    def rows(self) -> int:
+        return sum(len(segment["ts"]) for segment in self.segments(["ts"]))
+
+    def count_by(self, column: str, since: float = None, **filters: str) -> Dict[str, int]:
+        """
+        Event counts per value of a string column, with optional equality
+        filters on other string columns and a lower bound on ts. Runs as a
+        vectorized scan over the memory-mapped segments.
+        """
+        codes = {}
+        for name, value in filters.items():
+            code = self.pool.code(value)
+            if code is None:
+                return {}
+            codes[name] = code
+        needed = [column, *codes] + (["ts"] if since is not None else [])
+        totals = np.zeros(len(self.pool.strings), dtype=np.int64)
+        for segment in self.segments(list(dict.fromkeys(needed))):
+            mask = None
+            for name, code in codes.items():
+                match = segment[name] == code
+                mask = match if mask is None else mask & match
+            if since is not None:
+                match = segment["ts"] >= since
+                mask = match if mask is None else mask & match
+            values = segment[column] if mask is None else segment[column][mask]
+            counts = np.bincount(values, minlength=len(totals))
+            totals[:len(counts)] += counts[:len(totals)]
+        nonzero = np.nonzero(totals)[0]
+        return dict(zip(self.pool.decode(nonzero), totals[nonzero].tolist()))
+
+class EventRecorder:
+    """
+    Turns node and routing events into structured rows in an EventStore;
+    without one, in the process-wide store current at each event, so a
+    recorder installed before fork records into each worker's own partition.
+    """
+
+    def __init__(self, store: EventStore = None):
+        self._store = store
+
+    @property
+    def store(self) -> EventStore:
+        return self._store or get_store()
+
+    def install(self):
+        add_node_observer(self._on_node)
+        if self._on_route not in ROUTE_OBSERVERS:
+            ROUTE_OBSERVERS.append(self._on_route)
+
+    def uninstall(self):
+        remove_node_observer(self._on_node)
+        if self._on_route in ROUTE_OBSERVERS:
+            ROUTE_OBSERVERS.remove(self._on_route)
+
+    def _on_node(self, run: NodeRun):
+        update = run.update if isinstance(run.update, dict) else {}
+        state = run.state
+
+        def field(name):
+            return update.get(name) or state.get(name)
+
+        thread = (run.config.get("configurable") or {}).get("thread_id")
+        common = dict(graph=run.graph_name, thread=thread, node=run.node_name,
+                      category=field("issue_category"), priority=field("ticket_priority"),
+                      agent=field("current_agent"))
+        append = self.store.append
+        append("node_error" if run.error is not None else "node_run", **common)
+        if run.error is not None:
+            return
+        if run.node_name == "coordinator" and update.get("current_agent") not in (None, state.get("current_agent")):
+            append("handoff", **common)
+        status = update.get("resolution_status")
+        if status == "escalated_handling":
+            append("escalation", **common)
+        elif status == "resolved":
+            append("resolution", **common)
+
+    def _on_route(self, decision: RouteDecision):
+        self.store.append(f"route:{decision.router_name}", graph=decision.graph_name, agent=decision.route)
+
+def event_directory() -> str:
+    return os.getenv("AILAB_EVENT_DIR", MONITORING["event_dir"])
+
+def writer_directory(directory: str = None) -> str:
+    """This process's partition of an event directory, so concurrent writers never share codes or segments."""
+    return os.path.join(directory or event_directory(), f"writer-{socket.gethostname()}-{os.getpid()}")
+
+def partitions(directory: str = None) -> List[EventStore]:
+    """
+    Every writer's partition under directory, plus directory itself when it
+    holds segments written directly (bulk loads, stores from before
+    partitioning).
+    """
+    directory = directory or event_directory()
+    paths = sorted(path for path in glob.glob(os.path.join(directory, "writer-*")) if os.path.isdir(path))
+    if glob.glob(os.path.join(directory, "segment-*")):
+        paths.insert(0, directory)
+    return [EventStore(path) for path in paths]
+
+def count_by(directory: str, column: str, since: float = None, **filters: str) -> Dict[str, int]:
+    """EventStore.count_by() across every partition of directory, merged by string value."""
+    totals: Dict[str, int] = {}
+    for store in partitions(directory):
+        for value, count in store.count_by(column, since=since, **filters).items():
+            totals[value] = totals.get(value, 0) + count
+    return totals
+
+_store: Optional[EventStore] = None
+_store_lock = threading.Lock()
+
+def get_store() -> EventStore:
+    """Process-wide store writing this process's partition, created on first use and flushed at exit."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = EventStore(writer_directory())
+                atexit.register(_store.flush)
+    return _store
+
+def shutdown():
+    """Flushes this process's store, for exits that skip atexit (os._exit in forked workers)."""
+    if _store is not None:
+        _store.flush()
+
+def _reset_after_fork():
+    # A forked worker must not append to the parent's partition (its segment
+    # counter and pool codes would diverge from the parent's) nor flush the
+    # parent's buffered rows at exit; it opens its own partition on first use
+    global _store, _store_lock
+    if _store is not None:
+        atexit.unregister(_store.flush)
+    _store = None
+    _store_lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+if os.getenv(EVENT_STORE_ENV, "false").lower() == "true":
+    EventRecorder().install()
+
+# Export event store API
+__all__ = ["EventStore", "EventRecorder", "StringPool", "get_store", "shutdown", "partitions", "count_by",
+           "writer_directory", "COLUMNS"]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aggregate events from a columnar event store")
+    parser.add_argument("column", choices=STRING_COLUMNS, help="column to group by")
+    parser.add_argument("--dir", default=None, help="store directory (default: AILAB_EVENT_DIR or events)")
+    parser.add_argument("--where", nargs="*", default=[], metavar="COLUMN=VALUE", help="equality filters")
+    parser.add_argument("--last-hours", type=float, default=None)
+    args = parser.parse_args()
+
+    filters = dict(item.split("=", 1) for item in args.where)
+    since = time.time() - args.last_hours * 3600 if args.last_hours else None
+    started = time.perf_counter()
+    counts = count_by(args.dir, args.column, since=since, **filters)
+    for value, count in sorted(counts.items(), key=lambda item: -item[1]):
+        print(f"{count:>12}  {value or '(none)'}")
+    stores = partitions(args.dir)
+    print(f"📊 {sum(counts.values())} events of {sum(store.rows() for store in stores)} from {len(stores)} writers "
+          f"in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,183 @@
+"""
+Request Coalescing and Idempotency
+Collapses duplicate submissions of the same turn into a single graph execution
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from langchain_core.messages import BaseMessage
+
+# Completed results are replayed for this long; keep it short so a user who
+# genuinely repeats a message later still gets a fresh turn
+DEFAULT_TTL_SECONDS = 30.0
+DEFAULT_MAX_ENTRIES = 10000
+
+def _message_text(message) -> str:
+    if isinstance(message, BaseMessage):
+        return f"{message.type}:{message.content}"
+    if isinstance(message, dict):
+        return f"{message.get('role', '')}:{message.get('content', '')}"
+    if isinstance(message, (tuple, list)):
+        return f"{message[0]}:{message[1]}"
+    return str(message)
+
+def request_key(payload: Dict[str, Any], config: Optional[Dict[str, Any]] = None,
+                checkpoint_id: Optional[str] = None) -> str:
+    """
+    Identity of a submission: the explicit configurable "idempotency_key" when
+    the client sends one, otherwise a hash of the new messages and the
+    checkpoint the turn starts from, so a message the user genuinely repeats
+    after the thread has moved on is a new turn. Both are scoped by thread_id.
+    """
+    configurable = (config or {}).get("configurable", {})
+    thread_id = configurable.get("thread_id", "")
+    if configurable.get("idempotency_key"):
+        return f"key:{thread_id}:{configurable['idempotency_key']}"
+
+    digest = hashlib.sha256()
+    for message in payload.get("messages") or []:
+        digest.update(_message_text(message).encode("utf-8"))
+        digest.update(b"\0")
+    return f"thread:{thread_id}:{checkpoint_id or ''}:{digest.hexdigest()}"
+
+class IdempotencyLayer:
+    """
+    Front door for a compiled graph that deduplicates retried submissions.
+
+    Concurrent submissions with the same key share one in-flight execution;
+    submissions arriving after it completes are answered from a short-lived
+    LRU cache. Failed executions are not cached, so a retry after an error
+    runs the graph again. When the execution is cancelled (its caller went
+    away), a duplicate still waiting on it takes over and runs it instead.
+
+    Submissions without an explicit key are keyed by the thread's checkpoint
+    from checkpointer (default: the graph's): the latest one, or, while a turn
+    on the thread runs, the one that turn started from, so a duplicate sent
+    mid-turn still finds it. Once the turn has written its checkpoints the
+    same message is a new turn; only explicit keys replay completed results.
+    """
+
+    def __init__(self, graph, ttl: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 checkpointer=None):
+        self.graph = graph
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.checkpointer = checkpointer if checkpointer is not None else getattr(graph, "checkpointer", None)
+        # thread_id -> [checkpoint the running turns started from, running turns]
+        self._turn_bases: Dict[str, List] = {}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._completed: "OrderedDict[str, tuple]" = OrderedDict()
+        self._counts = {"executed": 0, "coalesced": 0, "replayed": 0, "taken_over": 0}
+
+    async def ainvoke(self, payload: Dict[str, Any], config: Dict[str, Any] = None):
+        """
+        Runs the graph once per distinct submission and shares or replays the result.
+        """
+        return await self.run_turn(payload, config, lambda: self.graph.ainvoke(payload, config))
+
+    async def run_turn(self, payload: Dict[str, Any], config: Optional[Dict[str, Any]], work: Callable[[], Awaitable]):
+        """
+        run() for a turn whose work() invokes the graph with payload and config,
+        keyed by request_key() with the checkpoint the turn starts from.
+        """
+        configurable = (config or {}).get("configurable", {})
+        thread_id = configurable.get("thread_id")
+        if configurable.get("idempotency_key") or thread_id is None or self.checkpointer is None:
+            return await self.run(request_key(payload, config), work)
+
+        base = self._turn_bases.get(thread_id)
+        checkpoint_id = base[0] if base is not None else await self._latest_checkpoint(thread_id)
+        # A turn may have started on the thread while the checkpoint was read
+        base = self._turn_bases.get(thread_id)
+        if base is not None:
+            checkpoint_id = base[0]
+
+        async def turn():
+            entry = self._turn_bases.setdefault(thread_id, [checkpoint_id, 0])
+            entry[1] += 1
+            try:
+                return await work()
+            finally:
+                entry[1] -= 1
+                if not entry[1] and self._turn_bases.get(thread_id) is entry:
+                    del self._turn_bases[thread_id]
+
+        return await self.run(request_key(payload, config, checkpoint_id), turn)
+
+    async def _latest_checkpoint(self, thread_id: str) -> Optional[str]:
+        saved = await self.checkpointer.aget_tuple({"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}})
+        return saved.config["configurable"]["checkpoint_id"] if saved is not None else None
+
+    async def run(self, key: str, work: Callable[[], Awaitable]):
+        """
+        Runs work() once per distinct key and shares or replays the result, for
+        callers that invoke the graph through other layers (e.g. admission).
+        """
+        waited = False
+        while True:
+            cached = self._completed.get(key)
+            if cached is not None:
+                expires_at, result = cached
+                if expires_at > time.monotonic():
+                    self._completed.move_to_end(key)
+                    self._counts["replayed"] += 1
+                    return result
+                del self._completed[key]
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                if waited:
+                    self._counts["taken_over"] += 1
+                return await self._execute(key, work)
+            if not waited:
+                self._counts["coalesced"] += 1
+                waited = True
+            try:
+                return await asyncio.shield(in_flight)
+            except asyncio.CancelledError:
+                # The execution's own caller was cancelled, not this one: take
+                # it over, or wait on whichever duplicate got there first
+                if not in_flight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+    async def _execute(self, key: str, work: Callable[[], Awaitable]):
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self._counts["executed"] += 1
+        try:
+            result = await work()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when no duplicate was waiting on it
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            self._remember(key, result)
+            return result
+        finally:
+            del self._in_flight[key]
+
+    def _remember(self, key: str, result):
+        self._completed[key] = (time.monotonic() + self.ttl, result)
+        self._completed.move_to_end(key)
+        while len(self._completed) > self.max_entries:
+            self._completed.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Executions run versus duplicates coalesced or replayed."""
+        return {
+            "in_flight": len(self._in_flight),
+            "cached": len(self._completed),
+            **self._counts
+        }
+
+# Export idempotency API
+__all__ = ["IdempotencyLayer", "request_key"]
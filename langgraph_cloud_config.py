@@ -6,10 +6,21 @@ Enhanced multi-agent system for cloud deployment with full Visual IDE support
 import os
 from typing import TypedDict, Annotated, Literal, List, Dict, Any
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
 from langgraph.checkpoint.memory import MemorySaver
 from datetime import datetime
+from task_queue import enqueue_task
+from deadlines import deadline_aware
+from node_metrics import instrumented, instrumented_router, instrument_checkpointer
+from conversation_analytics import ANALYTICS
+import trace_sink  # registers the AILAB_LOCAL_TRACING hook
+import tail_sampling  # registers the AILAB_TAIL_SAMPLING hook
+import profiling  # profiles requests that ask for it, and a sample when AILAB_PROFILING is set
+import event_store  # records structured events when AILAB_EVENT_STORE is set
+import thread_index  # indexes thread state when AILAB_THREAD_INDEX is set
+import resource_accounting  # accounts per-thread resource usage when AILAB_RESOURCE_ACCOUNTING is set
 import json
 
 # Enhanced state schema for multi-agent coordination
@@ -53,6 +64,52 @@ AGENT_DEFINITIONS = {
     }
 }
 
+# Keyword routing rules used by the coordinator, checked in order
+ROUTING_RULES = [
+    ("technical_expert", ["technical", "error", "bug", "not working", "broken", "troubleshoot"], "Technical issue detected"),
+    ("sales_advisor", ["buy", "purchase", "upgrade", "pricing", "features", "demo"], "Sales inquiry detected"),
+    ("customer_service", ["support", "help", "problem", "issue", "complaint", "billing"], "Customer service request detected"),
+    ("data_analyst", ["analytics", "data", "report", "metrics", "analysis"], "Data analysis request detected"),
+]
+
+# Words any support conversation uses; they pick a first specialist but are no
+# sign that a follow-up turn wants a different one
+GENERIC_SUPPORT_WORDS = frozenset(["support", "help", "problem", "issue"])
+
+# Each specialist's own routing keywords, used to decide whether a follow-up
+# turn leaves the current specialist
+SPECIALIST_KEYWORDS = {
+    agent: [word for word in keywords if word not in GENERIC_SUPPORT_WORDS]
+    for agent, keywords, _ in ROUTING_RULES
+}
+
+SPECIALIST_AGENTS = ["customer_service", "technical_expert", "sales_advisor", "data_analyst"]
+
+# Follow-up turns go straight to the current specialist unless disabled
+# per invocation with config["configurable"]["sticky_routing"] = False
+STICKY_ROUTING = os.getenv("ENHANCED_STICKY_ROUTING", "true").lower() == "true"
+
+def detect_intent(content: str):
+    """
+    Returns (agent, reason) for the first routing rule matching the lowercased
+    message content, or None when no keyword matches.
+    """
+    for agent, keywords, reason in ROUTING_RULES:
+        if any(word in content for word in keywords):
+            return agent, reason
+    return None
+
+def last_human_content(messages: list) -> str:
+    """Content of the latest customer message, skipping agent replies such as the coordinator's handoff."""
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            return message.content
+    return ""
+
+def specialist_matches(content: str) -> Dict[str, int]:
+    """How many of each specialist's own keywords the lowercased message content contains."""
+    return {agent: sum(word in content for word in keywords) for agent, keywords in SPECIALIST_KEYWORDS.items()}
+
 def coordinator_agent_node(state: EnhancedAgentState):
     """
     Central coordinator that routes conversations to appropriate specialized agents.
@@ -76,18 +133,9 @@ def coordinator_agent_node(state: EnhancedAgentState):
     content = last_message.content.lower() if hasattr(last_message, 'content') else str(last_message).lower()
     
     # Routing logic
-    if any(word in content for word in ["technical", "error", "bug", "not working", "broken", "troubleshoot"]):
-        next_agent = "technical_expert"
-        routing_reason = "Technical issue detected"
-    elif any(word in content for word in ["buy", "purchase", "upgrade", "pricing", "features", "demo"]):
-        next_agent = "sales_advisor"
-        routing_reason = "Sales inquiry detected"
-    elif any(word in content for word in ["support", "help", "problem", "issue", "complaint", "billing"]):
-        next_agent = "customer_service"
-        routing_reason = "Customer service request detected"
-    elif any(word in content for word in ["analytics", "data", "report", "metrics", "analysis"]):
-        next_agent = "data_analyst"
-        routing_reason = "Data analysis request detected"
+    intent = detect_intent(content)
+    if intent:
+        next_agent, routing_reason = intent
     else:
         next_agent = "customer_service"
         routing_reason = "Default routing to customer service"
@@ -105,6 +153,24 @@ def coordinator_agent_node(state: EnhancedAgentState):
         ]
     }
 
+def coordinator_fast_path(state: EnhancedAgentState):
+    """
+    Degraded coordinator used when the request deadline is close: routes on
+    keywords without the handoff message.
+    """
+    messages = state["messages"]
+    last_message = messages[-1] if messages else None
+    content = last_message.content.lower() if hasattr(last_message, 'content') else str(last_message or "").lower()
+    next_agent, routing_reason = detect_intent(content) or ("customer_service", "Default routing to customer service")
+    
+    return {
+        "current_agent": next_agent,
+        "agent_handoffs": state.get("agent_handoffs", []) + [f"coordinator_to_{next_agent}"],
+        "coordination_notes": state.get("coordination_notes", []) + [
+            f"Routed to {next_agent}: {routing_reason} (deadline fast path)"
+        ]
+    }
+
 def customer_service_agent_node(state: EnhancedAgentState):
     """
     Specialized customer service agent with enhanced capabilities.
@@ -144,8 +210,14 @@ def customer_service_agent_node(state: EnhancedAgentState):
 def technical_expert_agent_node(state: EnhancedAgentState):
     """
     Technical expert agent for complex problem-solving.
+
+    Queues a follow_up_diagnostics task for the customer's issue. Tasks stay
+    "pending" in task_queue until a TaskWorkerPool runs them, as server.py does
+    for every graph with a task_queue channel; a plain graph.invoke leaves them
+    pending.
     """
     messages = state["messages"]
+    issue = last_human_content(messages)
     
     response = AIMessage(
         content="Hi there! I'm Alex, your Technical Expert. I've analyzed your issue and I'm ready to help you resolve any technical challenges. Let me run a quick diagnostic and provide you with a comprehensive solution. Can you provide more details about the specific error or issue you're experiencing?"
@@ -156,11 +228,14 @@ def technical_expert_agent_node(state: EnhancedAgentState):
         "agent_outputs": {
             **state.get("agent_outputs", {}),
             "technical_expert": {
+                # Keep results merged in by the deferred task workers
+                **state.get("agent_outputs", {}).get("technical_expert", {}),
                 "diagnostic_initiated": True,
                 "expertise_level": "senior",
                 "timestamp": datetime.now().isoformat()
             }
         },
+        "task_queue": enqueue_task(state, "follow_up_diagnostics", "technical_expert", {"issue": issue[:500]}),
         "coordination_notes": state.get("coordination_notes", []) + [
             f"Technical Expert engaged for problem resolution at {datetime.now().strftime('%H:%M:%S')}"
         ]
@@ -192,22 +267,48 @@ def sales_advisor_agent_node(state: EnhancedAgentState):
         ]
     }
 
+def predict_satisfaction(stats: dict) -> str:
+    """
+    Satisfaction outlook from the share of negative or urgent messages and the
+    escalation ratio in an analytics snapshot.
+    """
+    sentiments = stats["sentiments"]
+    if not sentiments and not stats["escalations"] + stats["resolutions"]:
+        return "unknown"
+    strain = max(sentiments.get("negative", 0.0) + sentiments.get("urgent", 0.0), stats["escalation_ratio"])
+    if strain <= 0.2:
+        return "high"
+    return "medium" if strain <= 0.4 else "low"
+
 def data_analyst_agent_node(state: EnhancedAgentState):
     """
     Data analyst for insights and reporting.
     """
     messages = state["messages"]
     
-    # Simulate analytics processing
+    # Platform-wide figures come from the incremental analytics store, so this
+    # costs the same however much traffic has been seen. Only the figures the
+    # reply quotes are kept; the full snapshot would be checkpointed every turn
+    window = ANALYTICS.snapshot()["window"]
+    platform_summary = {
+        "window_seconds": window["seconds"],
+        "turns": window["turns"],
+        "handoff_rate": window["handoff_rate"],
+        "escalation_ratio": window["escalation_ratio"]
+    }
     analytics_data = {
         "conversation_length": len(messages),
         "agent_handoffs": len(state.get("agent_handoffs", [])),
-        "engagement_score": 8.5,
-        "predicted_satisfaction": "high"
+        "predicted_satisfaction": predict_satisfaction(window),
+        "handoff_rate": window["handoff_rate"],
+        "escalation_ratio": window["escalation_ratio"]
     }
     
     response = AIMessage(
-        content=f"Hello! I'm Dr. Emma, your Data Analyst. I've been analyzing the conversation patterns and I have some interesting insights to share. Based on our current interaction metrics, I can provide detailed analytics and recommendations. What specific data insights are you looking for?"
+        content=f"Hello! I'm Dr. Emma, your Data Analyst. I've been analyzing the conversation patterns and I have some interesting insights to share. "
+                f"Over the last {int(platform_summary['window_seconds'] // 60)} minutes we handled {platform_summary['turns']} turns with a handoff rate of "
+                f"{platform_summary['handoff_rate']:.0%}, and {platform_summary['escalation_ratio']:.0%} of closed tickets were escalated. "
+                f"What specific data insights are you looking for?"
     )
     
     return {
@@ -215,17 +316,39 @@ def data_analyst_agent_node(state: EnhancedAgentState):
         "agent_outputs": {
             **state.get("agent_outputs", {}),
             "data_analyst": {
+                **state.get("agent_outputs", {}).get("data_analyst", {}),
                 "analytics_data": analytics_data,
+                "platform_summary": platform_summary,
                 "insights_generated": True,
                 "timestamp": datetime.now().isoformat()
             }
         },
+        "task_queue": enqueue_task(state, "conversation_report", "data_analyst", {
+            **analytics_data,
+            "agents_involved": list(state.get("agent_outputs", {}).keys())
+        }),
         "performance_metrics": analytics_data,
         "coordination_notes": state.get("coordination_notes", []) + [
             f"Data Analyst provided insights at {datetime.now().strftime('%H:%M:%S')}"
         ]
     }
 
+def data_analyst_fast_path(state: EnhancedAgentState):
+    """
+    Degraded data analyst used when the request deadline is close: answers
+    without computing analytics or queueing a report.
+    """
+    response = AIMessage(
+        content="Hello! I'm Dr. Emma, your Data Analyst. We're under heavy load right now, so I'll keep this brief. What specific data insights are you looking for?"
+    )
+    
+    return {
+        "messages": [response],
+        "coordination_notes": state.get("coordination_notes", []) + [
+            f"Data Analyst answered on the deadline fast path at {datetime.now().strftime('%H:%M:%S')}"
+        ]
+    }
+
 def agent_router(state: EnhancedAgentState) -> str:
     """
     Routes to the appropriate agent based on the current_agent state.
@@ -244,6 +367,30 @@ def agent_router(state: EnhancedAgentState) -> str:
     
     return agent_routing.get(current_agent, "coordinator")
 
+def entry_router(state: EnhancedAgentState, config: RunnableConfig) -> str:
+    """
+    Sticky-session entry point. Follow-up turns skip the coordinator and go
+    straight to the specialist already handling the thread, unless the new
+    message matches more of another specialist's own keywords than of the
+    current one's. Generic support words ("help", "issue") never reroute.
+    """
+    sticky = config.get("configurable", {}).get("sticky_routing", STICKY_ROUTING)
+    current_agent = state.get("current_agent", "coordinator")
+    messages = state["messages"]
+    
+    if not sticky or current_agent not in SPECIALIST_AGENTS or not messages:
+        return "coordinator"
+    
+    last_message = messages[-1]
+    content = last_message.content.lower() if hasattr(last_message, 'content') else str(last_message).lower()
+    matches = specialist_matches(content)
+    current_match = matches.pop(current_agent, 0)
+    
+    if max(matches.values(), default=0) > current_match:
+        return "coordinator"
+    
+    return current_agent
+
 def create_enhanced_multi_agent_graph():
     """
     Creates an enhanced multi-agent system optimized for LangGraph Cloud deployment.
@@ -251,12 +398,16 @@ def create_enhanced_multi_agent_graph():
     # Create the graph
     workflow = StateGraph(EnhancedAgentState)
     
-    # Add all agent nodes
-    workflow.add_node("coordinator", coordinator_agent_node)
-    workflow.add_node("customer_service", customer_service_agent_node)
-    workflow.add_node("technical_expert", technical_expert_agent_node)
-    workflow.add_node("sales_advisor", sales_advisor_agent_node)
-    workflow.add_node("data_analyst", data_analyst_agent_node)
+    # Feed the data analyst's analytics store from every instrumented graph
+    ANALYTICS.install()
+    
+    # Add all agent nodes; each checks the request deadline and records its latency
+    timed = instrumented("enhanced_multi_agent", state_metrics=True)
+    workflow.add_node("coordinator", timed("coordinator", deadline_aware(coordinator_agent_node, degraded=coordinator_fast_path)))
+    workflow.add_node("customer_service", timed("customer_service", deadline_aware(customer_service_agent_node)))
+    workflow.add_node("technical_expert", timed("technical_expert", deadline_aware(technical_expert_agent_node)))
+    workflow.add_node("sales_advisor", timed("sales_advisor", deadline_aware(sales_advisor_agent_node)))
+    workflow.add_node("data_analyst", timed("data_analyst", deadline_aware(data_analyst_agent_node, degraded=data_analyst_fast_path)))
     
     # Add a completion node
     def completion_node(state: EnhancedAgentState):
@@ -277,15 +428,25 @@ def create_enhanced_multi_agent_graph():
             ]
         }
     
-    workflow.add_node("completion", completion_node)
+    workflow.add_node("completion", timed("completion", deadline_aware(completion_node)))
     
-    # Define the flow with conditional routing
-    workflow.add_edge(START, "coordinator")
+    # Define the flow with conditional routing; follow-up turns may bypass the coordinator
+    workflow.add_conditional_edges(
+        START,
+        instrumented_router("enhanced_multi_agent", "entry_router", entry_router),
+        {
+            "coordinator": "coordinator",
+            "customer_service": "customer_service",
+            "technical_expert": "technical_expert",
+            "sales_advisor": "sales_advisor",
+            "data_analyst": "data_analyst"
+        }
+    )
     
     # Conditional routing from coordinator to specialized agents
     workflow.add_conditional_edges(
         "coordinator",
-        agent_router,
+        instrumented_router("enhanced_multi_agent", "agent_router", agent_router),
         {
             "coordinator": "completion",
             "customer_service": "customer_service",
@@ -296,13 +457,13 @@ def create_enhanced_multi_agent_graph():
     )
     
     # All specialized agents can route to completion or back to coordinator
-    for agent in ["customer_service", "technical_expert", "sales_advisor", "data_analyst"]:
+    for agent in SPECIALIST_AGENTS:
         workflow.add_edge(agent, "completion")
     
     workflow.add_edge("completion", END)
     
     # Add memory for persistence
-    memory = MemorySaver()
+    memory = instrument_checkpointer("enhanced_multi_agent", MemorySaver())
     
     # Compile the graph
     app = workflow.compile(checkpointer=memory)
@@ -313,4 +474,4 @@ def create_enhanced_multi_agent_graph():
 enhanced_multi_agent_graph = create_enhanced_multi_agent_graph()
 
 # Export for LangGraph deployment
-__all__ = ["enhanced_multi_agent_graph", "AGENT_DEFINITIONS"]
+__all__ = ["enhanced_multi_agent_graph", "AGENT_DEFINITIONS", "ROUTING_RULES", "detect_intent"]
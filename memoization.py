@@ -0,0 +1,143 @@
+"""
+Pure-Node Memoization
+Nodes declared pure over a projection of their state are served from a
+bounded LRU keyed by that projection, so repeated messages ("I forgot my
+password", "refund please") skip the node body
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from langchain_core.messages import BaseMessage
+
+from deployment_config import DEPLOYMENT_CONFIG
+from prometheus_metrics import NODE_MEMO
+
+PERFORMANCE = DEPLOYMENT_CONFIG["performance"]
+
+NODE_MEMO_ENV = "AILAB_NODE_MEMO"
+
+def pure_node(projection: Callable[[dict], Hashable], max_entries: int = None) -> Callable:
+    """
+    Declares a node pure over projection(state): its update must depend on
+    nothing else in the state, the config or the clock. memoized() then
+    caches the update per distinct projection. The projection must be
+    hashable and cheap, e.g. a tuple of strings.
+    """
+    def mark(func: Callable) -> Callable:
+        func.memo_projection = projection
+        func.memo_max_entries = max_entries
+        return func
+    return mark
+
+def _fresh(update: dict) -> dict:
+    """
+    A copy of a cached update for one run: lists and dicts are copied one
+    level deep and messages are copied, because add_messages assigns ids to
+    the message objects it is given and a shared message would replace,
+    rather than append to, an earlier reply with the same id.
+    """
+    fresh = {}
+    for key, value in update.items():
+        if type(value) is list:
+            value = [item.model_copy() if isinstance(item, BaseMessage) else item for item in value]
+        elif type(value) is dict:
+            value = dict(value)
+        fresh[key] = value
+    return fresh
+
+class NodeMemo:
+    """
+    Bounded LRU of one pure node's updates keyed by its projection. Sync
+    nodes run on executor threads, so lookups take a lock; the node itself
+    runs outside it, and two threads missing on the same key both compute
+    the same update.
+    """
+
+    def __init__(self, graph_name: str, node_name: str, func: Callable, projection: Callable[[dict], Hashable],
+                 max_entries: int):
+        self.graph_name = graph_name
+        self.node_name = node_name
+        self.func = func
+        self.projection = projection
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def __call__(self, state: dict) -> dict:
+        key = self.projection(state)
+        with self._lock:
+            update = self._entries.get(key)
+            if update is not None:
+                self._entries.move_to_end(key)
+                self._counts["hits"] += 1
+        if update is not None:
+            NODE_MEMO.inc(self.graph_name, self.node_name, "hit")
+            return _fresh(update)
+
+        update = self.func(state)
+        NODE_MEMO.inc(self.graph_name, self.node_name, "miss")
+        with self._lock:
+            self._counts["misses"] += 1
+            self._entries[key] = update
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counts["evictions"] += 1
+        return _fresh(update)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+            size = len(self._entries)
+        lookups = counts["hits"] + counts["misses"]
+        return {"entries": size, "max_entries": self.max_entries, **counts,
+                "hit_rate": round(counts["hits"] / lookups, 4) if lookups else None}
+
+# Every memo created by memoized(), by (graph, node)
+MEMOS: Dict[Tuple[str, str], NodeMemo] = {}
+
+def memo_enabled() -> bool:
+    return os.getenv(NODE_MEMO_ENV, str(PERFORMANCE["node_memo"])).lower() == "true"
+
+def memoized(graph_name: str, enabled: Optional[bool] = None) -> Callable:
+    """
+    Returns a wrapper factory for the nodes of one graph, applied inside
+    deadline_aware and instrumented so hits are still timed and observed.
+    Nodes declared with pure_node() are memoized when performance.node_memo
+    or AILAB_NODE_MEMO enables it; other nodes are returned unchanged.
+    """
+    enabled = memo_enabled() if enabled is None else enabled
+
+    def wrap(node_name: str, func: Callable) -> Callable:
+        projection = getattr(func, "memo_projection", None)
+        if not enabled or projection is None:
+            return func
+        memo = MEMOS[(graph_name, node_name)] = NodeMemo(
+            graph_name, node_name, func, projection,
+            func.memo_max_entries or PERFORMANCE["node_memo_max_entries"]
+        )
+
+        def wrapped(state):
+            return memo(state)
+
+        wrapped.__name__ = func.__name__
+        wrapped.__doc__ = func.__doc__
+        wrapped.memo = memo
+        return wrapped
+
+    return wrap
+
+def memo_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit, miss and eviction counts per memoized node, keyed "graph/node"."""
+    return {f"{graph}/{node}": memo.stats() for (graph, node), memo in MEMOS.items()}
+
+# Export memoization API
+__all__ = ["pure_node", "memoized", "memo_stats", "NodeMemo", "MEMOS"]
@@ -9,28 +9,43 @@ from langchain_core.messages import HumanMessage, AIMessage
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
 from langgraph.checkpoint.memory import MemorySaver
+from deadlines import deadline_aware
+from memoization import memoized, pure_node
+from node_metrics import instrumented, instrument_checkpointer
+import trace_sink  # registers the AILAB_LOCAL_TRACING hook
+import tail_sampling  # registers the AILAB_TAIL_SAMPLING hook
+import profiling  # profiles requests that ask for it, and a sample when AILAB_PROFILING is set
+import event_store  # records structured events when AILAB_EVENT_STORE is set
+import thread_index  # indexes thread state when AILAB_THREAD_INDEX is set
+import resource_accounting  # accounts per-thread resource usage when AILAB_RESOURCE_ACCOUNTING is set
 
 # Define the state schema
 class State(TypedDict):
     messages: Annotated[list, add_messages]
     user_info: dict
 
+def last_message_text(state: State):
+    """
+    Text of the last message, or None for an empty conversation: all the chatbot reads.
+    """
+    messages = state["messages"]
+    if not messages:
+        return None
+    last_message = messages[-1]
+    return last_message.content if hasattr(last_message, 'content') else str(last_message)
+
+@pure_node(last_message_text)
 def chatbot_node(state: State):
     """
     Main chatbot node that processes user messages and generates responses.
     """
-    messages = state["messages"]
-    user_info = state.get("user_info", {})
-    
     # Get the last message from the user
-    last_message = messages[-1] if messages else None
+    user_content = last_message_text(state)
     
-    if not last_message:
+    if user_content is None:
         response_content = "Hello! I'm the AI LAB assistant. How can I help you today?"
     else:
         # Simple response logic - in a real application, you'd use an LLM here
-        user_content = last_message.content if hasattr(last_message, 'content') else str(last_message)
-        
         # Basic conversational responses
         if "hello" in user_content.lower() or "hi" in user_content.lower():
             response_content = f"Hello! Welcome to AI LAB. I'm here to assist you. What would you like to know?"
@@ -47,8 +62,7 @@ def chatbot_node(state: State):
     ai_message = AIMessage(content=response_content)
     
     return {
-        "messages": [ai_message],
-        "user_info": user_info
+        "messages": [ai_message]
     }
 
 def create_graph():
@@ -59,14 +73,16 @@ def create_graph():
     workflow = StateGraph(State)
     
     # Add nodes
-    workflow.add_node("chatbot", chatbot_node)
+    timed = instrumented("my_agent")
+    memo = memoized("my_agent")
+    workflow.add_node("chatbot", timed("chatbot", deadline_aware(memo("chatbot", chatbot_node))))
     
     # Define the flow
     workflow.add_edge(START, "chatbot")
     workflow.add_edge("chatbot", END)
     
     # Add memory for persistence
-    memory = MemorySaver()
+    memory = instrument_checkpointer("my_agent", MemorySaver())
     
     # Compile the graph
     app = workflow.compile(checkpointer=memory)
@@ -0,0 +1,353 @@
+"""
+Per-Node Latency Metrics
+Wall and CPU time histograms for every node registered in the graph factories,
+plus observer hooks for node runs, routing decisions and checkpoint writes
+"""
+
+import contextlib
+import inspect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+# Significant bits kept per bucket: values are recorded with under 1% relative error
+PRECISION_BITS = 7
+
+# Default for config["configurable"]["metrics_in_state"]
+METRICS_IN_STATE = False
+
+class LatencyHistogram:
+    """
+    Sparse log-linear histogram of nanosecond values in the style of HdrHistogram.
+    Each power-of-two range is split into 2**(PRECISION_BITS - 1) buckets, so
+    recording is a bit_length, a shift and a dict increment.
+    """
+
+    __slots__ = ("counts", "total", "sum", "max")
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+        self.sum = 0
+        self.max = 0
+
+    def record(self, value: int):
+        shift = value.bit_length() - PRECISION_BITS
+        key = value if shift <= 0 else (shift << PRECISION_BITS) | (value >> shift)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.total += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "LatencyHistogram"):
+        # other may be a shard another thread is still recording into; copying its
+        # items in one C call keeps a new bucket key from breaking the iteration
+        for key, count in list(other.counts.items()):
+            self.counts[key] = self.counts.get(key, 0) + count
+        self.total += other.total
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    @staticmethod
+    def _bucket_value(key: int) -> int:
+        shift = key >> PRECISION_BITS
+        if shift == 0:
+            return key
+        mantissa = key & ((1 << PRECISION_BITS) - 1)
+        # Midpoint of the bucket's range
+        return (mantissa << shift) + (1 << (shift - 1))
+
+    def percentile(self, pct: float) -> int:
+        """Value at the given percentile (0-100), in the recorded unit."""
+        if not self.total:
+            return 0
+        rank = max(1, int(self.total * pct / 100 + 0.5))
+        seen = 0
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen >= rank:
+                return min(self._bucket_value(key), self.max)
+        return self.max
+
+    def summary_ms(self) -> Dict[str, float]:
+        """Count, mean, p50/p95/p99 and max in milliseconds."""
+        return {
+            "count": self.total,
+            "mean": round(self.sum / self.total / 1e6, 4) if self.total else 0.0,
+            "p50": round(self.percentile(50) / 1e6, 4),
+            "p95": round(self.percentile(95) / 1e6, 4),
+            "p99": round(self.percentile(99) / 1e6, 4),
+            "max": round(self.max / 1e6, 4)
+        }
+
+class NodeMetricsRegistry:
+    """
+    Process-wide registry of (graph, node) wall and CPU histograms.
+    Every OS thread records into its own shard, so the hot path takes no lock;
+    shards are merged when a snapshot is read.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[Dict[tuple, tuple]] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> Dict[tuple, tuple]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def record(self, graph_name: str, node_name: str, wall_ns: int, cpu_ns: int):
+        shard = self._shard()
+        histograms = shard.get((graph_name, node_name))
+        if histograms is None:
+            histograms = shard[(graph_name, node_name)] = (LatencyHistogram(), LatencyHistogram())
+        histograms[0].record(wall_ns)
+        histograms[1].record(cpu_ns)
+
+    def histograms(self, graph_name: str = None) -> Dict[tuple, tuple]:
+        """Merged (wall, cpu) histograms keyed by (graph, node)."""
+        merged: Dict[tuple, tuple] = {}
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for key, (wall, cpu) in list(shard.items()):
+                if graph_name is not None and key[0] != graph_name:
+                    continue
+                if key not in merged:
+                    merged[key] = (LatencyHistogram(), LatencyHistogram())
+                merged[key][0].merge(wall)
+                merged[key][1].merge(cpu)
+        return merged
+
+    def snapshot(self, graph_name: str = None) -> Dict[str, Dict[str, Any]]:
+        """Percentile summaries as {graph: {node: {"wall_ms": ..., "cpu_ms": ...}}}."""
+        result: Dict[str, Dict[str, Any]] = {}
+        for (graph, node), (wall, cpu) in sorted(self.histograms(graph_name).items()):
+            result.setdefault(graph, {})[node] = {
+                "wall_ms": wall.summary_ms(),
+                "cpu_ms": cpu.summary_ms()
+            }
+        return result
+
+    def reset(self):
+        with self._shards_lock:
+            for shard in self._shards:
+                shard.clear()
+
+# Process-wide registry used by all instrumented graphs
+REGISTRY = NodeMetricsRegistry()
+
+class NodeRun(NamedTuple):
+    """A finished node execution, as passed to node observers."""
+    graph_name: str
+    node_name: str
+    state: dict
+    config: dict
+    update: Optional[dict]
+    wall_ns: int
+    cpu_ns: int
+    error: Optional[BaseException]
+
+class NodeStart(NamedTuple):
+    """A node about to execute, as passed to node start observers."""
+    graph_name: str
+    node_name: str
+    state: dict
+    config: dict
+
+# Callbacks invoked with a NodeRun after every instrumented node
+NODE_OBSERVERS: List[Callable[[NodeRun], None]] = []
+
+# Callbacks invoked with a NodeStart before every instrumented node
+NODE_START_OBSERVERS: List[Callable[[NodeStart], None]] = []
+
+def add_node_observer(observer: Callable[[NodeRun], None]):
+    if observer not in NODE_OBSERVERS:
+        NODE_OBSERVERS.append(observer)
+
+def remove_node_observer(observer: Callable[[NodeRun], None]):
+    if observer in NODE_OBSERVERS:
+        NODE_OBSERVERS.remove(observer)
+
+# False while unobserved() is active in the current context
+_observed: ContextVar[bool] = ContextVar("ailab_observed", default=True)
+
+@contextlib.contextmanager
+def unobserved():
+    """
+    Runs graph calls made in this context (and the tasks and threads
+    LangGraph starts from it) without recording node latencies or notifying
+    observers, e.g. synthetic warm-up traffic. Other requests are unaffected.
+    """
+    token = _observed.set(False)
+    try:
+        yield
+    finally:
+        _observed.reset(token)
+
+def _notify_all(observers: list, event):
+    if not _observed.get():
+        return
+    for observer in observers:
+        try:
+            observer(event)
+        except Exception:
+            # Observers must never fail the request
+            pass
+
+def instrumented(graph_name: str, state_metrics: bool = False) -> Callable:
+    """
+    Returns a wrapper factory for the nodes of one graph.
+
+    Wrapped nodes take (state, config), record wall and CPU time into REGISTRY
+    and notify NODE_START_OBSERVERS before and NODE_OBSERVERS after running.
+    With state_metrics set, the graph's performance_metrics channel receives
+    the node's latency percentiles whenever
+    config["configurable"]["metrics_in_state"] is true.
+    """
+    def wrap(node_name: str, func: Callable) -> Callable:
+        perf_counter_ns = time.perf_counter_ns
+        thread_time_ns = time.thread_time_ns
+        record = REGISTRY.record
+
+        def wrapped(state, config):
+            if not _observed.get():
+                return func(state, config)
+            if NODE_START_OBSERVERS:
+                _notify_all(NODE_START_OBSERVERS, NodeStart(graph_name, node_name, state, config))
+            wall_start = perf_counter_ns()
+            cpu_start = thread_time_ns()
+            try:
+                update = func(state, config)
+            except BaseException as e:
+                wall_ns = perf_counter_ns() - wall_start
+                cpu_ns = thread_time_ns() - cpu_start
+                record(graph_name, node_name, wall_ns, cpu_ns)
+                if NODE_OBSERVERS:
+                    _notify_all(NODE_OBSERVERS, NodeRun(graph_name, node_name, state, config, None, wall_ns, cpu_ns, e))
+                raise
+            wall_ns = perf_counter_ns() - wall_start
+            cpu_ns = thread_time_ns() - cpu_start
+            record(graph_name, node_name, wall_ns, cpu_ns)
+            if NODE_OBSERVERS:
+                _notify_all(NODE_OBSERVERS, NodeRun(graph_name, node_name, state, config, update, wall_ns, cpu_ns, None))
+
+            if state_metrics and config.get("configurable", {}).get("metrics_in_state", METRICS_IN_STATE):
+                update = _with_state_metrics(graph_name, node_name, state, update)
+            return update
+
+        wrapped.__name__ = func.__name__
+        wrapped.__doc__ = func.__doc__
+        return wrapped
+
+    return wrap
+
+class RouteDecision(NamedTuple):
+    """A conditional-edge decision, as passed to route observers."""
+    graph_name: str
+    router_name: str
+    state: dict
+    route: str
+
+class CheckpointWrite(NamedTuple):
+    """A checkpoint persisted by an instrumented checkpointer."""
+    graph_name: str
+    thread_id: str
+    size_bytes: int
+    # Channel values of the checkpoint (the full state) and the write's configurable
+    values: Optional[dict] = None
+    configurable: Optional[dict] = None
+
+# Callbacks invoked after every instrumented routing function and checkpoint write
+ROUTE_OBSERVERS: List[Callable[[RouteDecision], None]] = []
+CHECKPOINT_OBSERVERS: List[Callable[[CheckpointWrite], None]] = []
+
+def instrumented_router(graph_name: str, router_name: str, func: Callable) -> Callable:
+    """
+    Wraps a conditional-edge function so ROUTE_OBSERVERS see every decision.
+    """
+    takes_config = "config" in inspect.signature(func).parameters
+
+    def wrapped(state, config):
+        route = func(state, config) if takes_config else func(state)
+        if ROUTE_OBSERVERS:
+            _notify_all(ROUTE_OBSERVERS, RouteDecision(graph_name, router_name, state, route))
+        return route
+
+    wrapped.__name__ = func.__name__
+    wrapped.__doc__ = func.__doc__
+    return wrapped
+
+def instrument_checkpointer(graph_name: str, saver):
+    """
+    Reports the bytes each checkpoint write persists to CHECKPOINT_OBSERVERS.
+    For the in-memory saver the size is read back from its storage; other
+    savers have the checkpoint re-serialized. Returns the saver.
+    """
+    put = saver.put
+
+    def metered_put(config, checkpoint, metadata, new_versions):
+        result = put(config, checkpoint, metadata, new_versions)
+        if CHECKPOINT_OBSERVERS:
+            thread_id = config["configurable"]["thread_id"]
+            _notify_all(CHECKPOINT_OBSERVERS, CheckpointWrite(
+                graph_name, thread_id, _checkpoint_size(saver, result, checkpoint, new_versions),
+                checkpoint["channel_values"], config["configurable"]
+            ))
+        return result
+
+    saver.put = metered_put
+    if not isinstance(saver, InMemorySaver):
+        aput = saver.aput
+
+        async def metered_aput(config, checkpoint, metadata, new_versions):
+            result = await aput(config, checkpoint, metadata, new_versions)
+            if CHECKPOINT_OBSERVERS:
+                thread_id = config["configurable"]["thread_id"]
+                _notify_all(CHECKPOINT_OBSERVERS, CheckpointWrite(
+                    graph_name, thread_id, _checkpoint_size(saver, result, checkpoint, new_versions),
+                    checkpoint["channel_values"], config["configurable"]
+                ))
+            return result
+
+        saver.aput = metered_aput
+    return saver
+
+def _checkpoint_size(saver, saved_config: dict, checkpoint: dict, new_versions: dict) -> int:
+    if isinstance(saver, InMemorySaver):
+        configurable = saved_config["configurable"]
+        thread_id, checkpoint_ns = configurable["thread_id"], configurable["checkpoint_ns"]
+        entry = saver.storage[thread_id][checkpoint_ns][configurable["checkpoint_id"]]
+        size = len(entry[0][1]) + len(entry[1][1])
+        for channel, version in new_versions.items():
+            size += len(saver.blobs[(thread_id, checkpoint_ns, channel, version)][1])
+        return size
+    return len(saver.serde.dumps_typed(checkpoint)[1])
+
+def _with_state_metrics(graph_name: str, node_name: str, state: dict, update: Optional[dict]) -> dict:
+    update = dict(update or {})
+    histograms = REGISTRY.histograms(graph_name).get((graph_name, node_name))
+    metrics = {**(state.get("performance_metrics") or {}), **update.get("performance_metrics", {})}
+    node_latency = dict(metrics.get("node_latency", {}))
+    if histograms:
+        node_latency[node_name] = histograms[0].summary_ms()
+    metrics["node_latency"] = node_latency
+    update["performance_metrics"] = metrics
+    return update
+
+# Export metrics API
+__all__ = [
+    "LatencyHistogram", "NodeMetricsRegistry", "REGISTRY",
+    "NodeStart", "NodeRun", "RouteDecision", "CheckpointWrite",
+    "NODE_START_OBSERVERS", "NODE_OBSERVERS", "ROUTE_OBSERVERS", "CHECKPOINT_OBSERVERS",
+    "instrumented", "instrumented_router", "instrument_checkpointer",
+    "add_node_observer", "remove_node_observer", "unobserved"
+]
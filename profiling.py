@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+On-Demand Node Profiling
+Records exact call stacks of selected node executions and writes them as
+collapsed stacks, ready for flamegraph.pl, speedscope or inferno
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from deployment_config import DEPLOYMENT_CONFIG
+from node_metrics import NodeStart, NodeRun, add_node_observer, remove_node_observer, NODE_START_OBSERVERS
+
+MONITORING = DEPLOYMENT_CONFIG["monitoring"]
+
+# A request can always ask for a profile with config["configurable"]["profile"];
+# set AILAB_PROFILING=true to also profile a sampled share of invocations, at
+# AILAB_PROFILE_SAMPLE_RATE or the configured sampling rate
+PROFILING_ENV = "AILAB_PROFILING"
+
+class _StackRecorder:
+    """
+    sys.setprofile callback that attributes self time, in nanoseconds, to the
+    full call path of every Python and C function called while it is active.
+    """
+
+    __slots__ = ("stacks", "_frames", "_clock")
+
+    def __init__(self, root: str):
+        self.stacks: Dict[str, int] = defaultdict(int)
+        self._clock = time.perf_counter_ns
+        # (path, start_ns, child_ns) per active call
+        self._frames: List[list] = [[root, self._clock(), 0]]
+
+    def __call__(self, frame, event, arg):
+        now = self._clock()
+        if event == "call":
+            code = frame.f_code
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._frames.append([f"{self._frames[-1][0]};{label}", now, 0])
+        elif event == "c_call":
+            label = f"{getattr(arg, '__module__', None) or 'builtins'}.{getattr(arg, '__qualname__', arg)}"
+            self._frames.append([f"{self._frames[-1][0]};{label}", now, 0])
+        elif len(self._frames) > 1:
+            # return, c_return or c_exception; returns from frames entered
+            # before recording started leave the root in place
+            path, start, child = self._frames.pop()
+            elapsed = now - start
+            self.stacks[path] += elapsed - child
+            self._frames[-1][2] += elapsed
+
+    def finish(self) -> Dict[str, int]:
+        now = self._clock()
+        while len(self._frames) > 1:
+            path, start, child = self._frames.pop()
+            self.stacks[path] += now - start - child
+            self._frames[-1][2] += now - start
+        path, start, child = self._frames[0]
+        self.stacks[path] += now - start - child
+        return self.stacks
+
+class NodeProfiler:
+    """
+    Profiles node executions that ask for it and a random share of the rest.
+
+    A node is profiled when config["configurable"]["profile"] is true (every
+    node of that invocation) or when its invocation is sampled, so sampled
+    profiles add up to a statistical picture of production traffic. The
+    sampling decision is made once per invocation, with probability
+    sample_rate, and holds for all of its nodes: it is a hash of the thread_id
+    and the id of the latest human message, which every node of the turn sees.
+    Nodes whose state has no such message are sampled one by one.
+    Stacks are rooted at graph;thread_id=<id>;node and appended to
+    <directory>/<graph>.collapsed with self time in microseconds.
+
+    The profiler costs nothing until install() is called. Once installed, an
+    unselected node pays one dict lookup and, with sampling on, one hash of
+    its invocation key. Profiled nodes run several times slower while they
+    are recorded.
+    """
+
+    def __init__(self, directory: str = None, sample_rate: float = None, seed: int = None):
+        self.directory = directory or os.getenv("AILAB_PROFILE_DIR", MONITORING["profile_dir"])
+        if sample_rate is None:
+            sample_rate = float(os.getenv("AILAB_PROFILE_SAMPLE_RATE", MONITORING["profile_sample_rate"]))
+        self.sample_rate = sample_rate
+        self._random = random.Random(seed)
+        # Salts invocation keys so separate profilers (and processes) sample different invocations
+        self._salt = f"{self._random.getrandbits(32)}:"
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self.profiled = 0
+
+    def install(self):
+        if self._on_node_start not in NODE_START_OBSERVERS:
+            NODE_START_OBSERVERS.append(self._on_node_start)
+        add_node_observer(self._on_node)
+
+    def uninstall(self):
+        if self._on_node_start in NODE_START_OBSERVERS:
+            NODE_START_OBSERVERS.remove(self._on_node_start)
+        remove_node_observer(self._on_node)
+
+    def _on_node_start(self, start: NodeStart):
+        configurable = start.config.get("configurable") or {}
+        if not configurable.get("profile") and not (self.sample_rate and self._sampled(start, configurable)):
+            return
+        # Leave threads that are already being profiled or traced alone
+        if sys.getprofile() is not None:
+            return
+        thread_id = configurable.get("thread_id", "none")
+        recorder = _StackRecorder(f"{start.graph_name};thread_id={thread_id};{start.node_name}")
+        self._local.recorder = recorder
+        sys.setprofile(recorder)
+
+    def _sampled(self, start: NodeStart, configurable: dict) -> bool:
+        messages = start.state.get("messages") if isinstance(start.state, dict) else None
+        message_id = next((getattr(message, "id", None) for message in reversed(messages or [])
+                           if getattr(message, "type", None) == "human"), None)
+        if message_id is None:
+            return self._random.random() < self.sample_rate
+        key = f"{self._salt}{configurable.get('thread_id')}:{message_id}"
+        return zlib.crc32(key.encode()) < self.sample_rate * 2 ** 32
+
+    def _on_node(self, run: NodeRun):
+        recorder: Optional[_StackRecorder] = getattr(self._local, "recorder", None)
+        if recorder is None:
+            return
+        sys.setprofile(None)
+        self._local.recorder = None
+        self.write(run.graph_name, recorder.finish())
+
+    def write(self, graph_name: str, stacks: Dict[str, int]):
+        lines = [f"{path} {ns // 1000}\n" for path, ns in stacks.items() if ns >= 1000]
+        os.makedirs(self.directory, exist_ok=True)
+        with self._write_lock:
+            with open(os.path.join(self.directory, f"{graph_name}.collapsed"), "a") as f:
+                f.writelines(lines)
+            self.profiled += 1
+
+def merge_collapsed(paths: List[str], thread_id: str = None, keep_threads: bool = False) -> Dict[str, int]:
+    """
+    Sums collapsed stacks from profile files, optionally restricted to one
+    thread. Unless keep_threads is set, the thread_id frame is dropped so all
+    threads fold into one flamegraph.
+    """
+    merged: Dict[str, int] = defaultdict(int)
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                stack, _, value = line.rstrip("\n").rpartition(" ")
+                frames = stack.split(";")
+                if len(frames) < 2:
+                    continue
+                if thread_id is not None and frames[1] != f"thread_id={thread_id}":
+                    continue
+                if not keep_threads:
+                    del frames[1]
+                merged[";".join(frames)] += int(value)
+    return merged
+
+_profiler: Optional[NodeProfiler] = None
+
+def get_profiler() -> NodeProfiler:
+    global _profiler
+    if _profiler is None:
+        _profiler = NodeProfiler()
+    return _profiler
+
+# Always installed so per-request profiles work; sampling only with AILAB_PROFILING
+_profiler = NodeProfiler(sample_rate=None if os.getenv(PROFILING_ENV, "false").lower() == "true" else 0.0)
+_profiler.install()
+
+# Export profiling API
+__all__ = ["NodeProfiler", "get_profiler", "merge_collapsed"]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fold node profiles into flamegraph input")
+    parser.add_argument("graph", help="graph name, e.g. customer_service")
+    parser.add_argument("--dir", default=None, help="profile directory (default: AILAB_PROFILE_DIR or profiles)")
+    parser.add_argument("--thread", default=None, help="only stacks of this thread_id")
+    parser.add_argument("--keep-threads", action="store_true", help="keep one flamegraph tower per thread")
+    args = parser.parse_args()
+
+    directory = args.dir or os.getenv("AILAB_PROFILE_DIR", MONITORING["profile_dir"])
+    for stack, value in sorted(merge_collapsed([os.path.join(directory, f"{args.graph}.collapsed")],
+                                                args.thread, args.keep_threads).items()):
+        print(f"{stack} {value}")
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Prometheus Metrics
+Counters and histograms for graph traffic, served in the Prometheus text
+exposition format on each server.py worker's /metrics, or from a lightweight
+local HTTP endpoint for processes without one
+"""
+
+import bisect
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Sequence, Tuple
+
+from deployment_config import DEPLOYMENT_CONFIG
+from node_metrics import (
+    NodeRun, RouteDecision, CheckpointWrite,
+    add_node_observer, ROUTE_OBSERVERS, CHECKPOINT_OBSERVERS
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Nodes that run exactly once at the start of every invocation of their graph;
+# the enhanced graph's entry is counted from its entry_router decision instead
+ENTRY_NODES = {
+    "my_agent": "chatbot",
+    "customer_service": "customer_identification"
+}
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class _ShardedMetric:
+    """
+    Base for metrics whose samples are kept in one shard per OS thread.
+    Updates touch only the caller's shard, so concurrent writers never
+    contend; shards are summed when the metric is rendered.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _all_shards(self) -> List[dict]:
+        with self._shards_lock:
+            return list(self._shards)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+class Counter(_ShardedMetric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def values(self) -> Dict[Tuple[str, ...], float]:
+        totals: Dict[Tuple[str, ...], float] = {}
+        for shard in self._all_shards():
+            for labels, value in list(shard.items()):
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+                for labels, value in sorted(self.values().items())]
+
+class Histogram(_ShardedMetric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels: str):
+        shard = self._shard()
+        entry = shard.get(labels)
+        if entry is None:
+            # Per-bucket counts (last slot is +Inf), then sum
+            entry = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        entry[bisect.bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    def values(self) -> Dict[Tuple[str, ...], list]:
+        totals: Dict[Tuple[str, ...], list] = {}
+        for shard in self._all_shards():
+            for labels, entry in list(shard.items()):
+                total = totals.setdefault(labels, [0] * len(entry))
+                for i, value in enumerate(entry):
+                    total[i] += value
+        return totals
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for labels, entry in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), entry[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = _format_labels(self.labelnames, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {entry[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+INVOCATIONS = Counter("ailab_graph_invocations_total", "Graph invocations started.", ["graph"])
+ROUTES = Counter("ailab_route_decisions_total", "Conditional-edge routing decisions.", ["graph", "router", "route"])
+ESCALATIONS = Counter("ailab_escalations_total", "Tickets escalated by should_escalate.", ["graph"])
+RESOLUTIONS = Counter("ailab_resolutions_total", "Tickets resolved without escalation.", ["graph"])
+NODE_ERRORS = Counter("ailab_node_errors_total", "Node executions that raised.", ["graph", "node"])
+NODE_LATENCY = Histogram("ailab_node_latency_seconds", "Node wall-clock latency.", ["graph", "node"])
+CHECKPOINT_BYTES = Histogram("ailab_checkpoint_size_bytes", "Bytes persisted per checkpoint write.",
+                             ["graph"], buckets=SIZE_BUCKETS)
+QUEUE_WAIT = Histogram("ailab_queue_wait_seconds", "Time spent waiting in an admission or work queue.", ["queue"])
+NODE_MEMO = Counter("ailab_node_memo_lookups_total", "Pure-node memo lookups by result (hit or miss).",
+                    ["graph", "node", "result"])
+
+METRICS = [INVOCATIONS, ROUTES, ESCALATIONS, RESOLUTIONS, NODE_ERRORS, NODE_LATENCY, CHECKPOINT_BYTES, QUEUE_WAIT, NODE_MEMO]
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+def _on_node(run: NodeRun):
+    NODE_LATENCY.observe(run.wall_ns / 1e9, run.graph_name, run.node_name)
+    if run.error is not None:
+        NODE_ERRORS.inc(run.graph_name, run.node_name)
+        return
+    if ENTRY_NODES.get(run.graph_name) == run.node_name:
+        INVOCATIONS.inc(run.graph_name)
+    if run.update and run.update.get("resolution_status") == "resolved":
+        RESOLUTIONS.inc(run.graph_name)
+
+def _on_route(decision: RouteDecision):
+    ROUTES.inc(decision.graph_name, decision.router_name, decision.route)
+    if decision.router_name == "entry_router":
+        INVOCATIONS.inc(decision.graph_name)
+    elif decision.router_name == "should_escalate" and decision.route == "escalate":
+        ESCALATIONS.inc(decision.graph_name)
+
+def _on_checkpoint(write: CheckpointWrite):
+    CHECKPOINT_BYTES.observe(write.size_bytes, write.graph_name)
+
+def install():
+    """Subscribes the metrics to graph node, routing and checkpoint events."""
+    add_node_observer(_on_node)
+    if _on_route not in ROUTE_OBSERVERS:
+        ROUTE_OBSERVERS.append(_on_route)
+    if _on_checkpoint not in CHECKPOINT_OBSERVERS:
+        CHECKPOINT_OBSERVERS.append(_on_checkpoint)
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_metrics_server(port: int = None, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Installs the observers and serves /metrics from a daemon thread.
+    """
+    if port is None:
+        port = int(os.getenv("METRICS_PORT", DEPLOYMENT_CONFIG["monitoring"]["metrics_port"]))
+    install()
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+# Export metrics API
+__all__ = [
+    "Counter", "Histogram", "render", "install", "start_metrics_server",
+    "INVOCATIONS", "ROUTES", "ESCALATIONS", "RESOLUTIONS", "NODE_ERRORS",
+    "NODE_LATENCY", "CHECKPOINT_BYTES", "QUEUE_WAIT", "NODE_MEMO"
+]
+
+if __name__ == "__main__":
+    import time
+    import my_agent.graph
+    import customer_service_agent
+    import langgraph_cloud_config
+
+    server = start_metrics_server()
+    print(f"📊 Serving Prometheus metrics at http://{server.server_address[0]}:{server.server_address[1]}/metrics")
+    while True:
+        time.sleep(3600)
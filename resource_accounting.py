@@ -0,0 +1,202 @@
+"""
+Per-Thread Resource Accounting
+Attributes CPU time, sampled peak allocations, checkpoint bytes and node
+executions to each conversation thread, and to the issue category and agent
+that were active when the work was done
+"""
+
+import os
+import random
+import threading
+import tracemalloc
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from deployment_config import DEPLOYMENT_CONFIG
+from node_metrics import (
+    NodeStart, NodeRun, CheckpointWrite,
+    add_node_observer, remove_node_observer, NODE_START_OBSERVERS, CHECKPOINT_OBSERVERS
+)
+
+MONITORING = DEPLOYMENT_CONFIG["monitoring"]
+
+# Set AILAB_RESOURCE_ACCOUNTING=true to account the threads of every instrumented graph
+RESOURCE_ACCOUNTING_ENV = "AILAB_RESOURCE_ACCOUNTING"
+
+# State fields usage can be aggregated by
+GROUP_FIELDS = ("issue_category", "current_agent")
+
+UNKNOWN = "unknown"
+
+def _new_usage() -> Dict[str, Any]:
+    return {"cpu_ns": 0, "wall_ns": 0, "nodes": 0, "checkpoint_bytes": 0, "checkpoints": 0,
+            "alloc_samples": 0, "peak_alloc_bytes": 0}
+
+class ResourceAccountant:
+    """
+    Accumulates resource usage per (graph, thread_id) from node and checkpoint events.
+
+    Node cost is attributed to the issue_category and current_agent in the
+    node's update (falling back to the state it ran on), so a categorization or
+    routing decision owns the work it triggers. Checkpoint bytes go to the
+    thread's most recent labels.
+
+    Peak allocation is measured for a random allocation_sample_rate share of
+    node runs by tracing only for the duration of that node; unsampled runs pay
+    nothing. One node is traced at a time, and allocations other threads make
+    meanwhile are counted with it, so treat the figure as an estimate.
+
+    At most max_threads threads are tracked individually, least recently
+    active first out; aggregates by label keep counting evicted threads.
+    """
+
+    def __init__(self, allocation_sample_rate: float = None, max_threads: int = None, seed: int = None):
+        self.allocation_sample_rate = (MONITORING["allocation_sample_rate"]
+                                       if allocation_sample_rate is None else allocation_sample_rate)
+        self.max_threads = max_threads or MONITORING["accounting_max_threads"]
+        self._random = random.Random(seed)
+        self._threads: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._groups: Dict[tuple, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._sampling = threading.local()
+        self._tracemalloc_lock = threading.Lock()
+        self.evicted = 0
+
+    def install(self):
+        """Subscribes to node start, node run and checkpoint events."""
+        if self._on_node_start not in NODE_START_OBSERVERS:
+            NODE_START_OBSERVERS.append(self._on_node_start)
+        add_node_observer(self._on_node)
+        if self._on_checkpoint not in CHECKPOINT_OBSERVERS:
+            CHECKPOINT_OBSERVERS.append(self._on_checkpoint)
+
+    def uninstall(self):
+        if self._on_node_start in NODE_START_OBSERVERS:
+            NODE_START_OBSERVERS.remove(self._on_node_start)
+        remove_node_observer(self._on_node)
+        if self._on_checkpoint in CHECKPOINT_OBSERVERS:
+            CHECKPOINT_OBSERVERS.remove(self._on_checkpoint)
+
+    def _on_node_start(self, start: NodeStart):
+        if self.allocation_sample_rate <= 0 or self._random.random() >= self.allocation_sample_rate:
+            return
+        # Skip the sample if another node is being traced or tracing is already in use
+        if tracemalloc.is_tracing() or not self._tracemalloc_lock.acquire(blocking=False):
+            return
+        self._sampling.active = True
+        tracemalloc.start()
+
+    def _stop_sampling(self) -> Optional[int]:
+        if not getattr(self._sampling, "active", False):
+            return None
+        self._sampling.active = False
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self._tracemalloc_lock.release()
+        return peak
+
+    def _on_node(self, run: NodeRun):
+        peak = self._stop_sampling()
+        thread_id = (run.config.get("configurable") or {}).get("thread_id")
+        if thread_id is None:
+            return
+        update = run.update if isinstance(run.update, dict) else {}
+        labels = {field: update.get(field) or run.state.get(field) or UNKNOWN for field in GROUP_FIELDS}
+
+        with self._lock:
+            entry = self._thread_entry(run.graph_name, thread_id)
+            entry["labels"] = labels
+            for usage in self._targets(run.graph_name, entry):
+                usage["cpu_ns"] += run.cpu_ns
+                usage["wall_ns"] += run.wall_ns
+                usage["nodes"] += 1
+                if peak is not None:
+                    usage["alloc_samples"] += 1
+                    usage["peak_alloc_bytes"] = max(usage["peak_alloc_bytes"], peak)
+
+    def _on_checkpoint(self, write: CheckpointWrite):
+        with self._lock:
+            entry = self._thread_entry(write.graph_name, write.thread_id)
+            for usage in self._targets(write.graph_name, entry):
+                usage["checkpoint_bytes"] += write.size_bytes
+                usage["checkpoints"] += 1
+
+    def _thread_entry(self, graph_name: str, thread_id: str) -> Dict[str, Any]:
+        key = (graph_name, thread_id)
+        entry = self._threads.get(key)
+        if entry is None:
+            entry = self._threads[key] = {"usage": _new_usage(), "labels": dict.fromkeys(GROUP_FIELDS, UNKNOWN)}
+            if len(self._threads) > self.max_threads:
+                self._threads.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._threads.move_to_end(key)
+        return entry
+
+    def _targets(self, graph_name: str, entry: Dict[str, Any]):
+        yield entry["usage"]
+        for field in GROUP_FIELDS:
+            group_key = (graph_name, field, entry["labels"][field])
+            usage = self._groups.get(group_key)
+            if usage is None:
+                usage = self._groups[group_key] = _new_usage()
+            yield usage
+
+    def thread_usage(self, graph_name: str, thread_id: str) -> Optional[Dict[str, Any]]:
+        """Usage of one thread, or None if it is unknown or was evicted."""
+        with self._lock:
+            entry = self._threads.get((graph_name, thread_id))
+            if entry is None:
+                return None
+            return {**_summarize(entry["usage"]), **entry["labels"]}
+
+    def threads(self, graph_name: str = None, top: int = None) -> Dict[str, Dict[str, Any]]:
+        """Per-thread usage, most CPU-expensive first."""
+        with self._lock:
+            entries = [(key, entry["usage"], dict(entry["labels"])) for key, entry in self._threads.items()
+                       if graph_name is None or key[0] == graph_name]
+        entries.sort(key=lambda item: item[1]["cpu_ns"], reverse=True)
+        return {f"{graph}/{thread_id}": {**_summarize(usage), **labels}
+                for (graph, thread_id), usage, labels in entries[:top]}
+
+    def by(self, field: str, graph_name: str = None) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Usage aggregated by a GROUP_FIELDS value, as {graph: {value: usage}}."""
+        if field not in GROUP_FIELDS:
+            raise ValueError(f"Unknown accounting field: {field}")
+        with self._lock:
+            groups = [(key, dict(usage)) for key, usage in self._groups.items()]
+        result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (graph, group_field, value), usage in sorted(groups):
+            if group_field == field and (graph_name is None or graph == graph_name):
+                result.setdefault(graph, {})[value] = _summarize(usage)
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._threads.clear()
+            self._groups.clear()
+            self.evicted = 0
+
+def _summarize(usage: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "cpu_ms": round(usage["cpu_ns"] / 1e6, 3),
+        "wall_ms": round(usage["wall_ns"] / 1e6, 3),
+        "nodes": usage["nodes"],
+        "checkpoint_bytes": usage["checkpoint_bytes"],
+        "checkpoints": usage["checkpoints"],
+        "peak_alloc_bytes": usage["peak_alloc_bytes"] if usage["alloc_samples"] else None
+    }
+
+_accountant: Optional[ResourceAccountant] = None
+
+def get_accountant() -> ResourceAccountant:
+    global _accountant
+    if _accountant is None:
+        _accountant = ResourceAccountant()
+    return _accountant
+
+if os.getenv(RESOURCE_ACCOUNTING_ENV, "false").lower() == "true":
+    get_accountant().install()
+
+# Export accounting API
+__all__ = ["ResourceAccountant", "GROUP_FIELDS", "get_accountant"]
@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+"""
+Production HTTP Server
+Serves every graph in langgraph.json with invoke, stream and batch endpoints
+on an asyncio core (uvloop and httptools when installed) with HTTP keep-alive
+
+    python server.py --concurrency 100
+    python server.py --workers 4        # only with a shared checkpointer, see below
+    python server.py --no-prefork       # uvicorn's own workers, each importing everything
+    curl -s localhost:8000/graphs/customer_service/invoke \\
+        -d '{"input": {"messages": [{"role": "user", "content": "I was double charged"}]}}'
+
+Endpoints, for each graph name in langgraph.json:
+
+    GET  /graphs                  graph names
+    POST /graphs/{name}/invoke    {"input": {...}, "config": {...}, "thread_id": "..."} -> final state
+    POST /graphs/{name}/stream    same body -> one JSON line per node update
+    POST /graphs/{name}/events    same body -> Server-Sent Events, one per node update (see sse.py)
+    GET  /graphs/{name}/events    ?message=...&thread_id=... for EventSource clients
+    POST /graphs/{name}/batch     {"inputs": [...], "configs": [...]} -> one result or error per input
+    GET  /live                    liveness: the worker's event loop is answering
+    GET  /ready                   readiness: 200 once every graph is compiled and warmed, 503 before
+    GET  /stats
+    GET  /metrics                 Prometheus metrics of the worker that answers (prometheus_metrics.py)
+
+invoke and batch run each distinct turn once (idempotency.py): a retry sent
+while the turn runs waits for it, and one sent shortly after with the same
+Idempotency-Key header gets its result. A turn is identified by that header
+(suffixed with the input's index for batch) within its thread, else by its
+thread_id, messages and the checkpoint it starts from, so a message repeated
+once the turn is done runs again. A keyed request without a thread_id gets
+a thread derived from the key, so its retries land on the same thread.
+
+By default the master process imports and compiles every graph, freezes the
+garbage collector's heap and then forks the workers, so the modules, compiled
+graphs and keyword and knowledge base tables stay in pages shared
+copy-on-write instead of being rebuilt per worker. The master also runs the
+warm-up invocations (warmup.py) before forking, so workers start ready; with
+--no-prefork each worker warms up after it starts and reports ready when done.
+
+Threads are checkpointed in each worker's MemorySaver, so every turn of a
+multi-turn thread must reach the same worker. Workers share one listening
+socket with no thread affinity, so serving.workers defaults to 1: scale with
+one-worker containers behind a sticky load balancer, or give the graphs a
+shared checkpointer before raising it.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import importlib
+import json
+import os
+import signal
+import socket
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import orjson
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+
+from admission_scheduler import AdmissionScheduler, estimate_priority
+from deadlines import DeadlineExceeded, LoadShedder, Overloaded, remaining_budget, with_deadline
+from decision_tables import rule_book_stats
+from deployment_config import DEPLOYMENT_CONFIG
+import event_store
+from idempotency import IdempotencyLayer
+from memoization import memo_stats
+import prometheus_metrics
+from sse import EventStream, EventStreamResponse, encode_event, project_update
+from task_queue import TaskWorkerPool
+from thread_actors import ThreadActorExecutor
+import trace_sink
+from warmup import START_STATE, warm_up
+
+SERVING = DEPLOYMENT_CONFIG["serving"]
+PERFORMANCE = DEPLOYMENT_CONFIG["performance"]
+
+LANGGRAPH_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "langgraph.json")
+
+class BadRequest(Exception):
+    """Raised for a request body the server cannot run."""
+
+def load_graphs(config_path: str = LANGGRAPH_CONFIG) -> Dict[str, Any]:
+    """Imports every graph listed in langgraph.json, keyed by its name there."""
+    with open(config_path) as f:
+        specs = json.load(f)["graphs"]
+    graphs = {}
+    for name, spec in specs.items():
+        path, _, attribute = spec.partition(":")
+        module = path.removeprefix("./").removesuffix(".py").replace("/", ".")
+        graphs[name] = getattr(importlib.import_module(module), attribute)
+    return graphs
+
+def _default(value):
+    # Messages and other pydantic models; anything else is sent as text
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return str(value)
+
+def dumps(value: Any) -> bytes:
+    return orjson.dumps(value, default=_default)
+
+class JSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+class ClosingStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that awaits on_close once the response ends for any
+    reason, including a client that disconnects before the body starts
+    (its generator's finally would then never run).
+    """
+
+    def __init__(self, content, on_close: Callable[[], Awaitable], **kwargs):
+        super().__init__(content, **kwargs)
+        self.on_close = on_close
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.on_close()
+
+def _error(status: int, message: str, headers: Dict[str, str] = None) -> JSONResponse:
+    return JSONResponse({"error": message}, status_code=status, headers=headers)
+
+# Namespace for the thread_ids of keyed requests that name no thread
+IDEMPOTENT_THREAD_NAMESPACE = uuid.UUID("6f0c1f7e-3d2b-4c55-9a51-2f8e0b6a7c14")
+
+def _run_config(body: Dict[str, Any], config: Optional[Dict[str, Any]] = None,
+                idempotency_key: str = None) -> Dict[str, Any]:
+    """
+    Request config with a thread_id; a new thread is started when none is
+    given, named after idempotency_key when there is one.
+    """
+    config = dict(config or {})
+    configurable = dict(config.get("configurable") or {})
+    if body.get("thread_id"):
+        configurable["thread_id"] = body["thread_id"]
+    if idempotency_key:
+        configurable["idempotency_key"] = idempotency_key
+        configurable.setdefault("thread_id", str(uuid.uuid5(IDEMPOTENT_THREAD_NAMESPACE, idempotency_key)))
+    configurable.setdefault("thread_id", str(uuid.uuid4()))
+    config["configurable"] = configurable
+    return config
+
+class GraphServer:
+    """
+    Per-worker serving state: the graphs, one thread-actor executor per graph
+    so turns on the same thread never run concurrently (invoke, batch and
+    both streaming endpoints all go through it), and a LoadShedder
+    bounding in-flight work to max_concurrent with a queue-age limit. Requests
+    over the limit queue in an AdmissionScheduler's priority classes, by the
+    ticket priority estimated from their input (or configurable "priority").
+    Graphs with a task_queue channel get a TaskWorkerPool, running while the
+    app does, that works off the tasks each turn leaves and merges their
+    results through the same actors.
+
+    A server created with ready=False warms its graphs when the app starts
+    and fails readiness until that finishes. Creating one installs the
+    Prometheus observers, so every worker serves its own /metrics.
+    """
+
+    def __init__(self, graphs: Dict[str, Any], max_concurrent: int = None, timeout: float = None,
+                 max_batch_size: int = None, ready: bool = False):
+        self.graphs = graphs
+        self.ready = ready
+        self.warmup_ms: Dict[str, float] = {}
+        self.actors = {name: ThreadActorExecutor(graph) for name, graph in graphs.items()}
+        self.idempotency = {name: IdempotencyLayer(executor, checkpointer=getattr(graphs[name], "checkpointer", None))
+                            for name, executor in self.actors.items()}
+        self.task_pools = {name: TaskWorkerPool(graph, max_workers=SERVING["task_workers"], actors=self.actors[name])
+                           for name, graph in graphs.items() if "task_queue" in graph.channels}
+        max_concurrent = max_concurrent or PERFORMANCE["concurrent_executions"]
+        scheduler = AdmissionScheduler(max_concurrent, class_limits={
+            cls: max(1, int(max_concurrent * share)) for cls, share in SERVING["admission_class_shares"].items()
+        })
+        self.shedder = LoadShedder(max_concurrent, timeout=timeout, scheduler=scheduler)
+        self.max_batch_size = max_batch_size or SERVING["max_batch_size"]
+        self.sse_counts = {"opened": 0, "open": 0, "heartbeats": 0, "backpressure_waits": 0, "slow_client_drops": 0}
+        prometheus_metrics.install()
+
+    async def _read(self, request: Request) -> Tuple[str, Dict[str, Any]]:
+        name = request.path_params["graph"]
+        if name not in self.graphs:
+            raise KeyError(name)
+        if request.method != "POST":
+            # EventSource can only send GET, so the user message comes in the query string
+            message = request.query_params.get("message")
+            if not message:
+                raise BadRequest("a \"message\" query parameter is required")
+            return name, {"input": {"messages": [{"role": "user", "content": message}], **START_STATE.get(name, {})},
+                          "thread_id": request.query_params.get("thread_id")}
+        try:
+            body = orjson.loads(await request.body() or b"{}")
+        except orjson.JSONDecodeError as e:
+            raise BadRequest(f"invalid JSON: {e}")
+        if not isinstance(body, dict):
+            raise BadRequest("request body must be a JSON object")
+        return name, body
+
+    async def _invoke(self, name: str, payload: Dict[str, Any], config: Dict[str, Any]) -> Dict[str, Any]:
+        """One admitted turn through the thread's actor, then its deferred tasks are scheduled."""
+        output = await self.shedder.submit(self.actors[name], payload, config,
+                                           priority=estimate_priority(payload, config))
+        self._schedule_tasks(name, output, config)
+        return {"thread_id": config["configurable"]["thread_id"], "output": output}
+
+    async def _invoke_once(self, name: str, payload: Dict[str, Any], config: Dict[str, Any]) -> Dict[str, Any]:
+        # Duplicates share or replay the turn, and the thread it ran on, without taking a concurrency slot
+        return await self.idempotency[name].run_turn(payload, config, lambda: self._invoke(name, payload, config))
+
+    def _schedule_tasks(self, name: str, state: Any, config: Dict[str, Any]):
+        pool = self.task_pools.get(name)
+        if pool is not None and isinstance(state, dict):
+            pool.schedule(state, config)
+
+    async def _schedule_streamed_tasks(self, name: str, config: Dict[str, Any]):
+        # Streams only see node updates, so the tasks are read from the turn's checkpoint
+        if name in self.task_pools:
+            snapshot = await self.graphs[name].aget_state(config)
+            self._schedule_tasks(name, snapshot.values, config)
+
+    async def _handle(self, request: Request, run) -> Response:
+        try:
+            name, body = await self._read(request)
+            return await run(name, body)
+        except KeyError as e:
+            return _error(404, f"unknown graph {e}")
+        except BadRequest as e:
+            return _error(400, str(e))
+        except Overloaded as e:
+            return _error(503, str(e), {"Retry-After": str(max(1, round(e.retry_after)))})
+        except DeadlineExceeded as e:
+            return _error(504, str(e))
+
+    async def invoke(self, request: Request) -> Response:
+        async def run(name, body):
+            config = _run_config(body, body.get("config"), request.headers.get("idempotency-key"))
+            try:
+                result = await self._invoke_once(name, body.get("input") or {}, config)
+            except (Overloaded, DeadlineExceeded):
+                raise
+            except Exception as e:
+                return _error(500, f"{type(e).__name__}: {e}")
+            return JSONResponse(result)
+        return await self._handle(request, run)
+
+    async def stream(self, request: Request) -> Response:
+        async def run(name, body):
+            config = with_deadline(_run_config(body, body.get("config")), self.shedder.timeout)
+            # Admit before the response starts so a shed stream still gets a 503
+            slot = self.shedder.slot(config, estimate_priority(body.get("input") or {}, config))
+            await slot.__aenter__()
+
+            async def lines():
+                try:
+                    yield dumps({"thread_id": config["configurable"]["thread_id"]}) + b"\n"
+                    async with contextlib.aclosing(self.actors[name].astream(
+                            body.get("input") or {}, config, stream_mode="updates")) as updates:
+                        async for update in updates:
+                            yield dumps(update) + b"\n"
+                            if remaining_budget(config) <= 0:
+                                yield dumps({"error": "stream did not finish within its deadline"}) + b"\n"
+                                return
+                    await self._schedule_streamed_tasks(name, config)
+                except Exception as e:
+                    yield dumps({"error": f"{type(e).__name__}: {e}"}) + b"\n"
+
+            body_lines = lines()
+
+            async def close():
+                # Closing the body cancels the thread's turn if the client left mid-stream
+                try:
+                    await body_lines.aclose()
+                finally:
+                    await slot.__aexit__(None, None, None)
+
+            return ClosingStreamingResponse(body_lines, on_close=close, media_type="application/x-ndjson")
+        return await self._handle(request, run)
+
+    async def events(self, request: Request) -> Response:
+        async def run(name, body):
+            config = with_deadline(_run_config(body, body.get("config")), self.shedder.timeout)
+            thread_id = config["configurable"]["thread_id"]
+            # Admit before the response starts so a shed stream still gets a 503
+            slot = self.shedder.slot(config, estimate_priority(body.get("input") or {}, config))
+            await slot.__aenter__()
+
+            async def frames():
+                yield encode_event("metadata", dumps({"thread_id": thread_id}))
+                try:
+                    async with contextlib.aclosing(self.actors[name].astream(
+                            body.get("input") or {}, config, stream_mode="updates")) as updates:
+                        async for update in updates:
+                            for event in project_update(update):
+                                yield encode_event("update", dumps(event))
+                            if remaining_budget(config) <= 0:
+                                yield encode_event("error",
+                                                   dumps({"error": "stream did not finish within its deadline"}))
+                                return
+                    await self._schedule_streamed_tasks(name, config)
+                except Exception as e:
+                    yield encode_event("error", dumps({"error": f"{type(e).__name__}: {e}"}))
+                    return
+                yield encode_event("end", dumps({"thread_id": thread_id}))
+
+            stream = EventStream(frames(), buffer_events=SERVING["sse_buffer_events"],
+                                 heartbeat=SERVING["sse_heartbeat_seconds"],
+                                 send_timeout=SERVING["sse_send_timeout_seconds"],
+                                 on_close=lambda: slot.__aexit__(None, None, None), counts=self.sse_counts)
+            return EventStreamResponse(stream)
+        return await self._handle(request, run)
+
+    async def batch(self, request: Request) -> Response:
+        async def run(name, body):
+            inputs = body.get("inputs")
+            if not isinstance(inputs, list):
+                raise BadRequest("batch body needs an \"inputs\" list")
+            if len(inputs) > self.max_batch_size:
+                raise BadRequest(f"batch of {len(inputs)} exceeds the limit of {self.max_batch_size}")
+            configs = body.get("configs") or [body.get("config")] * len(inputs)
+            if len(configs) != len(inputs):
+                raise BadRequest("\"configs\" must have one entry per input")
+
+            key = request.headers.get("idempotency-key")
+
+            async def one(index, payload, config):
+                config = _run_config({}, config, f"{key}:{index}" if key else None)
+                try:
+                    return await self._invoke_once(name, payload or {}, config)
+                except Exception as e:
+                    return {"thread_id": config["configurable"]["thread_id"], "error": f"{type(e).__name__}: {e}"}
+
+            results = await asyncio.gather(*(one(index, payload, config)
+                                             for index, (payload, config) in enumerate(zip(inputs, configs))))
+            return JSONResponse({"results": results})
+        return await self._handle(request, run)
+
+    async def list_graphs(self, request: Request) -> Response:
+        return JSONResponse({"graphs": list(self.graphs)})
+
+    async def live(self, request: Request) -> Response:
+        return JSONResponse({"status": "ok", "pid": os.getpid()})
+
+    async def readiness(self, request: Request) -> Response:
+        if not self.ready:
+            return JSONResponse({"status": "warming", "pid": os.getpid()}, status_code=503)
+        return JSONResponse({"status": "ready", "pid": os.getpid(), "warmup_ms": self.warmup_ms})
+
+    async def warm(self):
+        self.warmup_ms = await warm_up(self.graphs, dumps)
+        self.ready = True
+
+    @contextlib.asynccontextmanager
+    async def lifespan(self, app: Starlette):
+        task = None if self.ready else asyncio.create_task(self.warm())
+        for pool in self.task_pools.values():
+            pool.start()
+        yield
+        if task is not None and not task.done():
+            task.cancel()
+        # Tasks still queued stay pending in their thread's task_queue
+        await asyncio.gather(*(pool.stop(drain=False) for pool in self.task_pools.values()))
+
+    async def stats(self, request: Request) -> Response:
+        return JSONResponse({
+            "pid": os.getpid(),
+            "admission": self.shedder.stats(),
+            "sse": dict(self.sse_counts),
+            "node_memo": memo_stats(),
+            "decision_tables": rule_book_stats(),
+            "actors": {name: executor.stats() for name, executor in self.actors.items()},
+            "idempotency": {name: layer.stats() for name, layer in self.idempotency.items()},
+            "tasks": {name: pool.stats() for name, pool in self.task_pools.items()}
+        })
+
+    async def metrics(self, request: Request) -> Response:
+        return Response(prometheus_metrics.render(), media_type=prometheus_metrics.CONTENT_TYPE)
+
+    def app(self) -> Starlette:
+        return Starlette(lifespan=self.lifespan, routes=[
+            Route("/graphs", self.list_graphs, methods=["GET"]),
+            Route("/graphs/{graph}/invoke", self.invoke, methods=["POST"]),
+            Route("/graphs/{graph}/stream", self.stream, methods=["POST"]),
+            Route("/graphs/{graph}/batch", self.batch, methods=["POST"]),
+            Route("/graphs/{graph}/events", self.events, methods=["GET", "POST"]),
+            Route("/live", self.live, methods=["GET"]),
+            Route("/ready", self.readiness, methods=["GET"]),
+            Route("/stats", self.stats, methods=["GET"]),
+            Route("/metrics", self.metrics, methods=["GET"]),
+        ])
+
+def create_app() -> Starlette:
+    """ASGI app factory for one worker; limits come from AILAB_* variables set by main()."""
+    concurrency = os.getenv("AILAB_SERVER_CONCURRENCY")
+    timeout = os.getenv("AILAB_SERVER_TIMEOUT")
+    warmup = os.getenv("AILAB_SERVER_WARMUP", "true").lower() == "true"
+    return GraphServer(load_graphs(), max_concurrent=int(concurrency) if concurrency else None,
+                       timeout=float(timeout) if timeout else None, ready=not warmup).app()
+
+def _run_worker(graphs: Dict[str, Any], sock: socket.socket, args: argparse.Namespace, warmup_ms: Dict[str, float]):
+    server = GraphServer(graphs, max_concurrent=args.concurrency, timeout=args.timeout, ready=True)
+    server.warmup_ms = warmup_ms
+    app = server.app()
+    config = uvicorn.Config(app, loop="auto", http="auto", timeout_keep_alive=args.keep_alive,
+                            access_log=args.access_log, log_level="warning")
+    uvicorn.Server(config).run(sockets=[sock])
+
+def _exit_worker(signum, frame):
+    # uvicorn re-raises the signal that stopped it once it has shut down
+    # gracefully; leave through spawn()'s finally instead of dying outright
+    raise SystemExit(0)
+
+def serve_prefork(args: argparse.Namespace):
+    """
+    Preloads and warms the graphs, binds the listening socket and forks
+    args.workers workers that accept on it. The master restarts workers that
+    die and forwards SIGTERM and SIGINT to them for a graceful shutdown.
+    """
+    graphs = load_graphs()
+    timings = {}
+    if args.warmup:
+        # asyncio.run closes its loop and joins the executor threads, so nothing runs across fork
+        timings = asyncio.run(warm_up(graphs, dumps))
+        print(f"🔥 Warmed up {', '.join(f'{name} {ms:.0f} ms' for name, ms in timings.items())}")
+    family = socket.AF_INET6 if ":" in args.host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(args.backlog)
+    sock.set_inheritable(True)
+
+    # Objects that survive to here are never collected, so the collector never
+    # writes to their pages and children keep sharing them
+    gc.collect()
+    gc.freeze()
+
+    workers: Dict[int, float] = {}
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, _exit_worker)
+            signal.signal(signal.SIGINT, _exit_worker)
+            code = 0
+            try:
+                _run_worker(graphs, sock, args, timings)
+            except SystemExit as e:
+                code = e.code or 0
+            except BaseException:
+                code = 1
+                raise
+            finally:
+                try:
+                    # os._exit skips atexit, where these write out their buffers
+                    event_store.shutdown()
+                    trace_sink.shutdown()
+                finally:
+                    os._exit(code)
+        workers[pid] = time.monotonic()
+
+    def shutdown(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    for _ in range(args.workers):
+        spawn()
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = workers.pop(pid, None)
+        if started is None or stopping:
+            continue
+        print(f"⚠️  Worker {pid} exited with status {status}; restarting")
+        # Back off when workers die during startup instead of forking in a loop
+        if time.monotonic() - started < 1.0:
+            time.sleep(1.0)
+        spawn()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the graphs in langgraph.json over HTTP")
+    parser.add_argument("--host", default=SERVING["host"])
+    parser.add_argument("--port", type=int, default=SERVING["port"])
+    parser.add_argument("--workers", type=int, default=int(os.getenv("AILAB_WORKERS", SERVING["workers"])),
+                        help="worker processes")
+    parser.add_argument("--concurrency", type=int, default=PERFORMANCE["concurrent_executions"],
+                        help="in-flight graph runs per worker before requests queue")
+    parser.add_argument("--timeout", type=float, default=PERFORMANCE["timeout_seconds"],
+                        help="per-request deadline in seconds")
+    parser.add_argument("--keep-alive", type=int, default=SERVING["keep_alive_seconds"],
+                        help="idle seconds before a keep-alive connection is closed")
+    parser.add_argument("--backlog", type=int, default=SERVING["backlog"])
+    parser.add_argument("--prefork", action=argparse.BooleanOptionalAction, default=SERVING["prefork"],
+                        help="preload graphs in the master and fork workers sharing them copy-on-write")
+    parser.add_argument("--warmup", action=argparse.BooleanOptionalAction, default=SERVING["warmup"],
+                        help="run synthetic invocations before reporting ready")
+    parser.add_argument("--access-log", action="store_true")
+    args = parser.parse_args()
+
+    print(f"🚀 Serving langgraph.json graphs on http://{args.host}:{args.port} "
+          f"with {args.workers} {'preforked ' if args.prefork else ''}workers x {args.concurrency} concurrent runs")
+    if args.prefork:
+        serve_prefork(args)
+        return
+    os.environ["AILAB_SERVER_CONCURRENCY"] = str(args.concurrency)
+    os.environ["AILAB_SERVER_TIMEOUT"] = str(args.timeout)
+    os.environ["AILAB_SERVER_WARMUP"] = str(args.warmup).lower()
+    uvicorn.run("server:create_app", factory=True, host=args.host, port=args.port, workers=args.workers,
+                loop="auto", http="auto", timeout_keep_alive=args.keep_alive, backlog=args.backlog,
+                access_log=args.access_log, log_level="warning")
+
+if __name__ == "__main__":
+    main()
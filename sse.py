@@ -0,0 +1,169 @@
+"""
+Server-Sent Events
+Frames graph updates as text/event-stream events and pumps them to one
+client through a bounded buffer, so a slow client holds back its own graph
+run instead of growing server memory
+
+Events sent on /graphs/{name}/events:
+
+    event: metadata   {"thread_id": "..."}
+    event: update     {"node": "...", "messages": [...], "resolution_status": "...", "ticket_priority": "..."}
+    event: error      {"error": "..."}
+    event: end        {"thread_id": "..."}
+
+An update carries only the fields its node returned. Browsers' EventSource
+reconnects whenever a stream closes, so clients should close() on "end".
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional
+
+from starlette.responses import StreamingResponse
+
+# State fields forwarded in update events
+SSE_FIELDS = ("messages", "resolution_status", "ticket_priority")
+
+HEARTBEAT = b": ping\n\n"
+
+def encode_event(event: str, data: bytes) -> bytes:
+    """One SSE frame; data must be a single line, as compact JSON is."""
+    return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+
+def _message(message: Any) -> Dict[str, Any]:
+    if isinstance(message, dict):
+        return {"role": message.get("role") or message.get("type"), "content": message.get("content")}
+    if hasattr(message, "content"):
+        return {"role": getattr(message, "type", None), "content": message.content}
+    return {"role": None, "content": str(message)}
+
+def project_update(update: Dict[str, Any], fields=SSE_FIELDS) -> Iterator[Dict[str, Any]]:
+    """
+    Turns one stream_mode="updates" chunk into an event per node, keeping
+    the fields in SSE_FIELDS that the node returned.
+    """
+    for node, values in update.items():
+        event = {"node": node}
+        if isinstance(values, dict):
+            for field in fields:
+                if field in values:
+                    value = values[field]
+                    event[field] = [_message(m) for m in value] if field == "messages" else value
+        yield event
+
+class EventStream:
+    """
+    One client's stream. A producer task iterates source (already framed
+    events) into a queue of at most buffer_events, and iterating the
+    EventStream yields them to the response. The response only pulls the
+    next event once the server has written the last one, so when the client
+    reads slowly the queue fills and the producer - and the graph run behind
+    source - waits. A client that keeps the queue full for send_timeout
+    seconds is dropped. HEARTBEAT comment lines are sent after heartbeat
+    seconds without events so proxies do not time out idle streams.
+
+    on_close is awaited exactly once when the stream ends, however it ends
+    (including a client that disconnects before the first event), and is
+    where the run's concurrency slot is released.
+    """
+
+    def __init__(self, source: AsyncIterator[bytes], buffer_events: int, heartbeat: float, send_timeout: float,
+                 on_close: Optional[Callable[[], Awaitable]] = None, counts: Optional[Dict[str, int]] = None):
+        self.source = source
+        self.heartbeat = heartbeat
+        self.send_timeout = send_timeout
+        self.on_close = on_close
+        self.counts = counts if counts is not None else {}
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_events)
+        self._producer: Optional[asyncio.Task] = None
+        self._started = False
+        self._closing = False
+
+    def _count(self, key: str, n: int = 1):
+        self.counts[key] = self.counts.get(key, 0) + n
+
+    async def _close(self):
+        if self._closing:
+            return
+        self._closing = True
+        try:
+            await self.source.aclose()
+        finally:
+            if self.on_close is not None:
+                await self.on_close()
+
+    async def _produce(self):
+        self._started = True
+        try:
+            async for chunk in self.source:
+                if not self._queue.full():
+                    self._queue.put_nowait(chunk)
+                    continue
+                self._count("backpressure_waits")
+                try:
+                    await asyncio.wait_for(self._queue.put(chunk), timeout=self.send_timeout)
+                except asyncio.TimeoutError:
+                    self._count("slow_client_drops")
+                    return
+        finally:
+            await self._close()
+
+    def stop(self):
+        """Ends the stream from the response side; safe to call more than once."""
+        if self._producer is not None:
+            self._producer.cancel()
+        if not self._started:
+            # A task cancelled before its first step never runs its finally
+            asyncio.ensure_future(self._close())
+
+    async def __aiter__(self):
+        self._count("opened")
+        self._count("open")
+        self._producer = asyncio.create_task(self._produce())
+        getter = None
+        try:
+            while True:
+                # Only wait (and arm the heartbeat timer) when nothing is buffered
+                if getter is None and not self._queue.empty():
+                    yield self._queue.get_nowait()
+                    continue
+                if getter is None:
+                    getter = asyncio.ensure_future(self._queue.get())
+                done, _ = await asyncio.wait((getter, self._producer), timeout=self.heartbeat,
+                                            return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    chunk, getter = getter.result(), None
+                    yield chunk
+                elif self._producer in done:
+                    # Cancelling a woken getter leaves its item in the queue, so drain after
+                    getter.cancel()
+                    getter = None
+                    while not self._queue.empty():
+                        yield self._queue.get_nowait()
+                    return
+                else:
+                    self._count("heartbeats")
+                    yield HEARTBEAT
+        finally:
+            if getter is not None:
+                getter.cancel()
+            self.stop()
+            self._count("open", -1)
+
+class EventStreamResponse(StreamingResponse):
+    """text/event-stream response that stops its EventStream when the response ends for any reason."""
+
+    media_type = "text/event-stream"
+
+    def __init__(self, stream: EventStream, headers: Optional[Dict[str, str]] = None):
+        # X-Accel-Buffering stops nginx from buffering the stream
+        super().__init__(stream, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", **(headers or {})})
+        self.event_stream = stream
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.event_stream.stop()
+
+# Export SSE API
+__all__ = ["EventStream", "EventStreamResponse", "encode_event", "project_update", "HEARTBEAT", "SSE_FIELDS"]
@@ -28,7 +28,9 @@ fi
 
 # Set environment variables
 echo "🔧 Setting environment variables..."
-export LANGCHAIN_TRACING_V2=true
+# Traces are buffered to local files; replay them with `python3 trace_sink.py upload`
+export LANGCHAIN_TRACING_V2=false
+export AILAB_LOCAL_TRACING=true
 export LANGSMITH_ENDPOINT=https://eu.api.smith.langchain.com
 export LANGCHAIN_ENDPOINT=https://eu.api.smith.langchain.com
 export LANGCHAIN_ORGANIZATION_ID=fb2e6235-a27a-4a33-bd77-7c865b6d5252
@@ -37,7 +39,7 @@ export LANGCHAIN_ORGANIZATION_ID=fb2e6235-a27a-4a33-bd77-7c865b6d5252
 echo "✅ Environment configured:"
 echo "   • LangSmith Endpoint: $LANGSMITH_ENDPOINT"
 echo "   • Organization ID: $LANGCHAIN_ORGANIZATION_ID"
-echo "   • Tracing: Enabled"
+echo "   • Tracing: Local trace files (./traces)"
 
 # Test the customer service agent
 echo ""
@@ -0,0 +1,153 @@
+"""
+Tail-Based Trace Sampling
+Buffers each run's spans until the run completes, then keeps the runs worth
+looking at: escalations, errors, slow runs and a random share of the rest
+"""
+
+import random
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from langchain_core.tracers.context import register_configure_hook
+from langchain_core.tracers.schemas import Run
+
+from deployment_config import DEPLOYMENT_CONFIG
+from trace_sink import LocalTraceSink, LocalTracer, get_sink
+
+MONITORING = DEPLOYMENT_CONFIG["monitoring"]
+
+# Set AILAB_TAIL_SAMPLING=true to attach TailSamplingTracer to every graph
+# invocation; use it instead of AILAB_LOCAL_TRACING, not alongside it
+TAIL_SAMPLING_ENV = "AILAB_TAIL_SAMPLING"
+
+ESCALATED_STATUSES = ("escalated", "escalated_handling")
+
+class _PendingTrace:
+    __slots__ = ("records", "escalated", "errored", "truncated")
+
+    def __init__(self):
+        self.records: List[Dict[str, Any]] = []
+        self.escalated = False
+        self.errored = False
+        self.truncated = False
+
+class TailSampler:
+    """
+    Holds in-flight traces in memory and decides at completion whether to keep them.
+
+    Memory is bounded twice: a trace stops buffering spans after
+    max_spans_per_trace records (it is still decided on, and marked truncated),
+    and when more than max_buffered_traces are in flight the oldest one is
+    evicted and counted.
+    """
+
+    def __init__(self, sink: LocalTraceSink = None, sample_rate: float = None,
+                 latency_threshold_ms: float = None, max_buffered_traces: int = None,
+                 max_spans_per_trace: int = None, seed: int = None):
+        self._sink = sink
+        self.sample_rate = MONITORING["tail_sample_rate"] if sample_rate is None else sample_rate
+        self.latency_threshold_ms = (MONITORING["tail_latency_threshold_ms"]
+                                     if latency_threshold_ms is None else latency_threshold_ms)
+        self.max_buffered_traces = max_buffered_traces or MONITORING["tail_max_buffered_traces"]
+        self.max_spans_per_trace = max_spans_per_trace or MONITORING["tail_max_spans_per_trace"]
+        self._random = random.Random(seed)
+        self._traces: "OrderedDict[str, _PendingTrace]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"kept_escalated": 0, "kept_error": 0, "kept_slow": 0, "kept_random": 0,
+                        "sampled_out": 0, "evicted": 0, "truncated": 0}
+
+    @property
+    def sink(self) -> LocalTraceSink:
+        if self._sink is None:
+            self._sink = get_sink()
+        return self._sink
+
+    def record(self, trace_id: str, record: Dict[str, Any], escalated: bool = False, errored: bool = False):
+        """Buffers one start or end record of a trace and notes escalations and errors."""
+        with self._lock:
+            trace = self._traces.get(trace_id)
+            if trace is None:
+                trace = self._traces[trace_id] = _PendingTrace()
+                if len(self._traces) > self.max_buffered_traces:
+                    self._traces.popitem(last=False)
+                    self._counts["evicted"] += 1
+            if len(trace.records) < self.max_spans_per_trace:
+                trace.records.append(record)
+            elif not trace.truncated:
+                trace.truncated = True
+                self._counts["truncated"] += 1
+            trace.escalated = trace.escalated or escalated
+            trace.errored = trace.errored or errored
+
+    def finish(self, trace_id: str, latency_ms: float) -> Optional[str]:
+        """
+        Decides on a completed trace. Returns the reason it was kept, or None
+        when it was sampled out.
+        """
+        with self._lock:
+            trace = self._traces.pop(trace_id, None)
+            if trace is None:
+                return None
+            if trace.errored:
+                reason = "error"
+            elif trace.escalated:
+                reason = "escalated"
+            elif latency_ms >= self.latency_threshold_ms:
+                reason = "slow"
+            elif self._random.random() < self.sample_rate:
+                reason = "random"
+            else:
+                self._counts["sampled_out"] += 1
+                return None
+            self._counts[f"kept_{reason}"] += 1
+
+        for record in trace.records:
+            record["sampling_reason"] = reason
+            self.sink.emit(record)
+        return reason
+
+    def stats(self) -> Dict[str, Any]:
+        return {"buffered_traces": len(self._traces), **self._counts}
+
+_sampler: Optional[TailSampler] = None
+_sampler_lock = threading.Lock()
+
+def get_sampler() -> TailSampler:
+    """Process-wide sampler shared by every TailSamplingTracer."""
+    global _sampler
+    if _sampler is None:
+        with _sampler_lock:
+            if _sampler is None:
+                _sampler = TailSampler()
+    return _sampler
+
+class TailSamplingTracer(LocalTracer):
+    """
+    LocalTracer variant that hands records to a TailSampler instead of writing
+    them straight to the sink.
+    """
+
+    def __init__(self, sampler: TailSampler = None, **kwargs):
+        self.sampler = sampler or get_sampler()
+        super().__init__(sink=self.sampler._sink, **kwargs)
+
+    def _on_run_create(self, run: Run):
+        self.sampler.record(str(run.trace_id), self._start_record(run))
+
+    def _on_run_update(self, run: Run):
+        outputs = run.outputs or {}
+        escalated = (outputs.get("resolution_status") in ESCALATED_STATUSES or
+                     (run.name == "should_escalate" and outputs.get("output") == "escalate"))
+        self.sampler.record(str(run.trace_id), self._end_record(run),
+                            escalated=escalated, errored=run.error is not None)
+        if run.parent_run_id is None:
+            latency_ms = (run.end_time - run.start_time).total_seconds() * 1000
+            self.sampler.finish(str(run.trace_id), latency_ms)
+
+_tail_tracer_var: ContextVar[Optional[TailSamplingTracer]] = ContextVar("ailab_tail_tracer", default=None)
+register_configure_hook(_tail_tracer_var, True, TailSamplingTracer, TAIL_SAMPLING_ENV)
+
+# Export sampling API
+__all__ = ["TailSampler", "TailSamplingTracer", "get_sampler"]
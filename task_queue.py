@@ -0,0 +1,226 @@
+"""
+Deferred Task Queue
+Background worker pool for work items specialists place on EnhancedAgentState.task_queue
+"""
+
+import asyncio
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, Any, List
+
+from prometheus_metrics import QUEUE_WAIT
+from thread_actors import ThreadActorExecutor
+
+# Registered task handlers, keyed by task kind
+TASK_HANDLERS: Dict[str, Callable[[dict], dict]] = {}
+
+def register_task(kind: str):
+    """
+    Decorator registering a handler for a deferred task kind.
+    Handlers receive the task dict and return a JSON-serializable result dict.
+    """
+    def decorator(func):
+        TASK_HANDLERS[kind] = func
+        return func
+    return decorator
+
+def make_task(kind: str, agent: str, payload: dict) -> dict:
+    """
+    Creates a pending task item for the state's task_queue.
+    """
+    return {
+        "task_id": uuid.uuid4().hex,
+        "kind": kind,
+        "agent": agent,
+        "payload": payload,
+        "status": "pending",
+        "enqueued_at": time.time()
+    }
+
+def enqueue_task(state: dict, kind: str, agent: str, payload: dict) -> List[dict]:
+    """
+    Returns the state's task_queue with a new task appended, unless a task of the
+    same kind for the same agent is still waiting to run.
+    """
+    task_queue = state.get("task_queue") or []
+    if any(task["kind"] == kind and task["agent"] == agent for task in task_queue):
+        return task_queue
+    return task_queue + [make_task(kind, agent, payload)]
+
+@register_task("follow_up_diagnostics")
+def follow_up_diagnostics(task: dict) -> dict:
+    """
+    Runs the follow-up diagnostic checklist for a reported technical issue.
+    """
+    issue = task["payload"].get("issue", "").lower()
+    checks = [
+        ("service_status", "operational"),
+        ("client_version", "latest"),
+        ("connectivity", "ok"),
+    ]
+    if "timeout" in issue or "database" in issue:
+        checks.append(("database_connections", "pool saturation detected"))
+    if "500" in issue or "api" in issue:
+        checks.append(("api_error_rate", "elevated"))
+    if "login" in issue or "password" in issue:
+        checks.append(("auth_service", "operational"))
+
+    findings = [name for name, result in checks if result not in ("ok", "operational", "latest")]
+    return {
+        "checks": dict(checks),
+        "findings": findings,
+        "recommendation": "Escalate to on-call engineering" if findings else "No platform issue found",
+        "completed_at": datetime.now().isoformat()
+    }
+
+@register_task("conversation_report")
+def conversation_report(task: dict) -> dict:
+    """
+    Builds the conversation report the data analyst promised the user.
+    """
+    payload = task["payload"]
+    message_count = payload.get("conversation_length", 0)
+    handoffs = payload.get("agent_handoffs", 0)
+    return {
+        "conversation_length": message_count,
+        "agent_handoffs": handoffs,
+        "handoff_rate": round(handoffs / message_count, 3) if message_count else 0.0,
+        "agents_involved": payload.get("agents_involved", []),
+        "completed_at": datetime.now().isoformat()
+    }
+
+class TaskWorkerPool:
+    """
+    Bounded async worker pool that drains task_queue items outside the request path.
+
+    After a turn completes, schedule() picks up the thread's pending tasks and
+    returns at once; workers run the handlers and merge each result into the
+    owning agent's entry in agent_outputs, removing the task from task_queue.
+
+    Each merge reads and rewrites the thread's state as a turn of its actor in
+    actors, so it never interleaves with a user turn on the same thread. Pass
+    the executor the thread's user turns go through (a new one is made
+    otherwise, and only invoke() is serialized with merges).
+    """
+
+    def __init__(self, graph, max_workers: int = 4, max_queue: int = 1000, as_node: str = "completion",
+                 actors: ThreadActorExecutor = None):
+        self.graph = graph
+        self.actors = actors or ThreadActorExecutor(graph)
+        self.max_workers = max_workers
+        self.as_node = as_node
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._workers = []
+        self._scheduled = set()
+        self._wait_ms = deque(maxlen=1000)
+        self._run_ms = deque(maxlen=1000)
+        self._counts = {"scheduled": 0, "completed": 0, "failed": 0, "rejected": 0}
+
+    def start(self):
+        """Starts the worker tasks on the running event loop."""
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_workers)]
+
+    async def stop(self, drain: bool = True):
+        """Stops the workers, optionally waiting for queued tasks to finish first."""
+        if drain:
+            await self._queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def drain(self):
+        """Waits until every scheduled task has been processed."""
+        await self._queue.join()
+
+    def schedule(self, state: dict, config: dict) -> int:
+        """
+        Queues the pending tasks found in a thread's state without waiting for them.
+        Returns the number of tasks scheduled; tasks that do not fit are left in
+        task_queue and picked up by a later turn.
+        """
+        self.start()
+        scheduled = 0
+        for task in state.get("task_queue") or []:
+            if task.get("status") != "pending" or task["task_id"] in self._scheduled:
+                continue
+            try:
+                self._queue.put_nowait((task, config, time.perf_counter()))
+            except asyncio.QueueFull:
+                self._counts["rejected"] += 1
+                break
+            self._scheduled.add(task["task_id"])
+            self._counts["scheduled"] += 1
+            scheduled += 1
+        return scheduled
+
+    async def invoke(self, payload: dict, config: dict):
+        """
+        Runs a turn and hands any tasks it enqueued to the pool, returning the turn result immediately.
+        """
+        result = await self.actors.submit(payload, config)
+        self.schedule(result, config)
+        return result
+
+    async def _worker(self):
+        while True:
+            task, config, queued_at = await self._queue.get()
+            started = time.perf_counter()
+            self._wait_ms.append((started - queued_at) * 1000)
+            QUEUE_WAIT.observe(started - queued_at, "task_queue")
+            try:
+                try:
+                    handler = TASK_HANDLERS[task["kind"]]
+                    result = {"status": "completed", **await asyncio.to_thread(handler, task)}
+                except Exception as e:
+                    result = {"status": "failed", "error": str(e)}
+                await self._merge(task, config, result)
+                self._counts[result["status"]] += 1
+            except Exception:
+                self._counts["failed"] += 1
+            finally:
+                self._run_ms.append((time.perf_counter() - started) * 1000)
+                self._scheduled.discard(task["task_id"])
+                self._queue.task_done()
+
+    async def _merge(self, task: dict, config: dict, result: dict):
+        thread_id = config["configurable"]["thread_id"]
+
+        async def merge():
+            snapshot = await self.graph.aget_state(config)
+            values = snapshot.values
+            agent_outputs = dict(values.get("agent_outputs") or {})
+            agent_entry = dict(agent_outputs.get(task["agent"]) or {})
+            agent_entry[task["kind"]] = result
+            agent_outputs[task["agent"]] = agent_entry
+            task_queue = [t for t in values.get("task_queue") or [] if t["task_id"] != task["task_id"]]
+            await self.graph.aupdate_state(
+                {"configurable": {"thread_id": thread_id}},
+                {"agent_outputs": agent_outputs, "task_queue": task_queue},
+                as_node=self.as_node
+            )
+
+        await self.actors.run(thread_id, merge)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, task counts and recent wait/run latency percentiles."""
+        def pct(values, p):
+            if not values:
+                return 0.0
+            ordered = sorted(values)
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))], 3)
+
+        return {
+            "queue_depth": self._queue.qsize(),
+            "in_flight": len(self._scheduled) - self._queue.qsize(),
+            "workers": len(self._workers),
+            **self._counts,
+            "wait_ms": {"p50": pct(self._wait_ms, 50), "p99": pct(self._wait_ms, 99)},
+            "run_ms": {"p50": pct(self._run_ms, 50), "p99": pct(self._run_ms, 99)}
+        }
+
+# Export task queue API
+__all__ = ["TaskWorkerPool", "register_task", "make_task", "enqueue_task", "TASK_HANDLERS"]
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for the priority-aware admission scheduler
+"""
+
+import asyncio
+from collections import Counter
+
+from admission_scheduler import AdmissionScheduler
+
+async def admission_order(scheduler, queued, grants):
+    """Queues queued[cls] waiters per class behind one held slot and records the classes of the next grants."""
+    await scheduler.acquire("high")
+    order = []
+
+    async def wait(cls):
+        await scheduler.acquire(cls)
+        order.append(cls)
+
+    waiters = [asyncio.create_task(wait(cls)) for cls, count in queued.items() for _ in range(count)]
+    await asyncio.sleep(0)
+    scheduler.release("high")
+    for _ in range(grants - 1):
+        await asyncio.sleep(0)
+        scheduler.release(order[-1])
+    await asyncio.sleep(0)
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    return order[:grants]
+
+def test_backlogged_classes_share_slots_by_weight():
+    scheduler = AdmissionScheduler(max_concurrent=1, class_limits={"high": 1, "medium": 1, "low": 1})
+    order = asyncio.run(admission_order(scheduler, {"low": 30, "medium": 30, "high": 30}, 36))
+    assert Counter(order) == {"high": 24, "medium": 9, "low": 3}
+    # Stride scheduling interleaves the classes rather than draining high first
+    assert "low" in order[:12] and "medium" in order[:12]
+
+def test_idle_class_banks_no_credit():
+    async def main():
+        scheduler = AdmissionScheduler(max_concurrent=1, class_limits={"high": 1, "medium": 1, "low": 1})
+        # Only high traffic for a while, then low shows up
+        await admission_order(scheduler, {"high": 20}, 20)
+        for _ in range(scheduler._total_running):
+            scheduler.release("high")
+        return await admission_order(scheduler, {"high": 20, "low": 20}, 18)
+    order = asyncio.run(main())
+    assert Counter(order) == {"high": 16, "low": 2}
+
+def test_class_limit_holds_back_low_priority():
+    async def main():
+        scheduler = AdmissionScheduler(max_concurrent=4, class_limits={"high": 4, "medium": 2, "low": 1})
+        await scheduler.acquire("low")
+        assert not scheduler.can_admit("low")
+        assert scheduler.can_admit("high")
+        waiter = asyncio.create_task(scheduler.acquire("low"))
+        await asyncio.sleep(0)
+        assert scheduler.queued_ahead("low") == 1 and scheduler.queued_ahead("high") == 0
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert scheduler.stats()["classes"]["low"]["queued"] == 0
+    asyncio.run(main())
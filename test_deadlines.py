@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Tests for request deadlines
+"""
+
+import time
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+import langgraph_cloud_config
+from deadlines import DeadlineExceeded, remaining_budget, with_deadline
+
+def test_deadline_is_not_persisted():
+    graph = langgraph_cloud_config.create_enhanced_multi_agent_graph()
+    thread = {"configurable": {"thread_id": "deadline-persist"}}
+    graph.invoke({"messages": [HumanMessage("the app shows an error")]}, with_deadline(thread, 30))
+    for snapshot in graph.get_state_history(thread):
+        assert not any("deadline" in key or "degrade" in key for key in snapshot.metadata)
+    # A later invocation without a deadline runs unbounded
+    graph.invoke({"messages": [HumanMessage("still broken")]}, thread)
+
+def test_expired_deadline_stops_the_graph():
+    graph = langgraph_cloud_config.create_enhanced_multi_agent_graph()
+    config = with_deadline({"configurable": {"thread_id": "deadline-expired"}}, 0.001)
+    time.sleep(0.01)
+    with pytest.raises(DeadlineExceeded):
+        graph.invoke({"messages": [HumanMessage("the app shows an error")]}, config)
+
+def test_earlier_deadline_is_kept():
+    config = with_deadline(None, 1)
+    assert remaining_budget(with_deadline(config, 60)) <= 1
+    assert remaining_budget(None) == float("inf")
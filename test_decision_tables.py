@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for decision tables and their hot reload
+"""
+
+import json
+import os
+
+import pytest
+
+from decision_tables import RULE_BOOKS, RuleBook, RuleError, RuleSet, TableSchema
+
+SCHEMAS = {"escalation": TableSchema({"priority": "str", "previous_tickets": "int"},
+                                     {"escalate": "bool", "reason": "str"})}
+
+def rules(threshold: int) -> dict:
+    return {"tables": {"escalation": {
+        "rules": [
+            {"when": {"priority": {"eq": "high"}}, "then": {"escalate": True, "reason": "high priority"}},
+            {"when": {"previous_tickets": {"gt": threshold}}, "then": {"escalate": True, "reason": "repeat customer"}},
+        ],
+        "default": {"escalate": False, "reason": ""}
+    }}}
+
+def write_atomically(path, spec):
+    with open(f"{path}.tmp", "w") as f:
+        f.write(spec if isinstance(spec, str) else json.dumps(spec))
+    os.replace(f"{path}.tmp", path)
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def book(tmp_path):
+    path = str(tmp_path / "rules.json")
+    write_atomically(path, rules(threshold=3))
+    clock = Clock()
+    book = RuleBook(path, SCHEMAS, check_interval=2.0, clock=clock)
+    yield book, path, clock
+    RULE_BOOKS.pop(path, None)
+
+def test_first_match_and_default(book):
+    book, _, _ = book
+    table = book.rules()["escalation"]
+    assert table.evaluate("high", 0) == (True, "high priority")
+    assert table.evaluate("low", 5) == (True, "repeat customer")
+    assert table.evaluate("low", 1) == (False, "")
+
+def test_batch_matches_single_evaluations(book):
+    book, _, _ = book
+    table = book.rules()["escalation"]
+    priorities, tickets = ["high", "low", "low", "medium"], [0, 5, 1, 4]
+    batch = table.evaluate_batch({"priority": priorities, "previous_tickets": tickets})
+    expected = [table.evaluate(priority, count) for priority, count in zip(priorities, tickets)]
+    assert list(zip(batch["escalate"].tolist(), batch["reason"].tolist())) == expected
+
+def test_changed_file_is_swapped_in_after_the_check_interval(book):
+    book, path, clock = book
+    before = book.rules()
+    write_atomically(path, rules(threshold=0))
+    # Not re-checked before the interval passes
+    assert book.rules() is before
+    clock.now += 2.0
+    after = book.rules()
+    assert after is not before
+    assert after["escalation"].evaluate("low", 1) == (True, "repeat customer")
+    # The old version is never modified, so callers holding it see one consistent set
+    assert before["escalation"].evaluate("low", 1) == (False, "")
+    assert book.stats()["reloads"] == 1
+
+def test_invalid_file_keeps_the_current_rules(book):
+    book, path, clock = book
+    before = book.rules()
+    write_atomically(path, "{not json")
+    clock.now += 2.0
+    assert book.rules() is before
+    write_atomically(path, {"tables": {"escalation": {"rules": [{"when": {"tier": {"eq": "VIP"}},
+                                                                 "then": {"escalate": True, "reason": ""}}]}}})
+    clock.now += 2.0
+    assert book.rules() is before
+    stats = book.stats()
+    assert stats["reload_errors"] == 2 and stats["reloads"] == 0 and stats["last_error"]
+
+def test_rule_set_rejects_unknown_tables():
+    with pytest.raises(RuleError):
+        RuleSet({"tables": {**rules(3)["tables"], "routing": {"rules": []}}}, SCHEMAS)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar event store
+"""
+
+import sys
+import threading
+
+import pytest
+
+from event_store import EventStore
+
+@pytest.fixture(autouse=True)
+def frequent_thread_switches():
+    # Switch threads as often as possible so the races these tests guard against happen
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+def test_string_codes_survive_concurrent_appends(tmp_path):
+    """Strings encoded while another thread flushes still decode to themselves after reopening."""
+    store = EventStore(str(tmp_path), segment_rows=64)
+    writers, events = 8, 2000
+
+    def write(writer):
+        for i in range(events):
+            store.append("node", "graph", thread=f"t{writer}-{i}", node=f"n{writer}-{i}")
+
+    threads = [threading.Thread(target=write, args=(writer,)) for writer in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    store.flush()
+
+    reopened = EventStore(str(tmp_path))
+    assert reopened.rows() == writers * events
+    thread_ids = reopened.pool.decode(reopened.column("thread"))
+    nodes = reopened.pool.decode(reopened.column("node"))
+    assert all(thread_id[1:] == node[1:] for thread_id, node in zip(thread_ids, nodes))
+    assert len(set(thread_ids)) == writers * events
+
+def test_append_columns_encodes_alongside_appends(tmp_path):
+    store = EventStore(str(tmp_path), segment_rows=16)
+    bulk = threading.Thread(target=lambda: [
+        store.append_columns({"ts": [0.0] * 100, "event_type": ["bulk"] * 100,
+                              "thread": [f"b{batch}-{i}" for i in range(100)]})
+        for batch in range(20)
+    ])
+    bulk.start()
+    for i in range(2000):
+        store.append("node", "graph", thread=f"a-{i}")
+    bulk.join()
+    store.flush()
+
+    reopened = EventStore(str(tmp_path))
+    counts = reopened.count_by("event_type")
+    assert counts == {"bulk": 2000, "node": 2000}
+    assert len(set(reopened.pool.decode(reopened.column("thread")))) == 4000
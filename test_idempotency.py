@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for request coalescing and idempotency
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from idempotency import IdempotencyLayer, request_key
+
+class CountingGraph:
+    """Stands in for a compiled graph: each turn takes a while and writes a new checkpoint."""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.calls = 0
+        self.checkpoints = {}
+        self.checkpointer = self
+
+    async def ainvoke(self, payload, config):
+        self.calls += 1
+        thread_id = config["configurable"]["thread_id"]
+        # Checkpoints are written as the turn goes, not only at its end
+        self.checkpoints[thread_id] = f"{thread_id}-{self.calls}-input"
+        await asyncio.sleep(self.delay)
+        self.checkpoints[thread_id] = f"{thread_id}-{self.calls}-done"
+        return {"answer": self.calls}
+
+    async def aget_tuple(self, config):
+        checkpoint_id = self.checkpoints.get(config["configurable"]["thread_id"])
+        if checkpoint_id is None:
+            return None
+        return SimpleNamespace(config={"configurable": {"checkpoint_id": checkpoint_id}})
+
+def turn(text, thread_id="t1", **configurable):
+    return {"messages": [{"role": "user", "content": text}]}, {"configurable": {"thread_id": thread_id, **configurable}}
+
+def test_concurrent_duplicates_coalesce():
+    async def main():
+        graph = CountingGraph()
+        layer = IdempotencyLayer(graph)
+        first = asyncio.create_task(layer.ainvoke(*turn("yes")))
+        await asyncio.sleep(0.01)
+        # Sent after the first turn wrote a checkpoint; still the same turn
+        second = await layer.ainvoke(*turn("yes"))
+        assert await first == second
+        assert graph.calls == 1
+        assert layer.stats()["coalesced"] == 1
+    asyncio.run(main())
+
+def test_repeated_message_after_the_turn_runs_again():
+    async def main():
+        graph = CountingGraph(delay=0)
+        layer = IdempotencyLayer(graph)
+        assert await layer.ainvoke(*turn("ok")) == {"answer": 1}
+        assert await layer.ainvoke(*turn("ok")) == {"answer": 2}
+        assert layer.stats()["replayed"] == 0
+    asyncio.run(main())
+
+def test_explicit_key_replays_within_its_thread():
+    async def main():
+        graph = CountingGraph(delay=0)
+        layer = IdempotencyLayer(graph)
+        assert await layer.ainvoke(*turn("ok", idempotency_key="k1")) == {"answer": 1}
+        assert await layer.ainvoke(*turn("ok", idempotency_key="k1")) == {"answer": 1}
+        # The same key on another thread is another request
+        assert await layer.ainvoke(*turn("ok", "t2", idempotency_key="k1")) == {"answer": 2}
+        assert layer.stats()["replayed"] == 1
+    asyncio.run(main())
+
+def test_duplicate_takes_over_a_cancelled_turn():
+    async def main():
+        graph = CountingGraph()
+        layer = IdempotencyLayer(graph)
+        leader = asyncio.create_task(layer.ainvoke(*turn("help")))
+        await asyncio.sleep(0.01)
+        duplicate = asyncio.create_task(layer.ainvoke(*turn("help")))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        assert await duplicate == {"answer": 2}
+        assert leader.cancelled()
+        assert layer.stats()["taken_over"] == 1
+    asyncio.run(main())
+
+def test_request_key_scopes():
+    payload, config = turn("hi")
+    assert request_key(payload, config, "c1") != request_key(payload, config, "c2")
+    assert request_key(*turn("hi", "t1", idempotency_key="k")) != request_key(*turn("hi", "t2", idempotency_key="k"))
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Tests for on-demand and sampled node profiling
+"""
+
+from langchain_core.messages import HumanMessage
+
+import profiling
+from node_metrics import NODE_START_OBSERVERS, NodeStart
+from profiling import NodeProfiler
+
+def turns(profiler, count, nodes=3):
+    """Runs every node of count invocations through the profiler's start check and collects the decisions."""
+    decisions = []
+    for turn in range(count):
+        state = {"messages": [HumanMessage("hi", id=f"m{turn}")]}
+        config = {"configurable": {"thread_id": "t1"}}
+        decisions.append({profiler._sampled(NodeStart("graph", f"node{node}", state, config),
+                                            config["configurable"]) for node in range(nodes)})
+    return decisions
+
+def test_profiler_installed_without_env():
+    assert profiling.get_profiler()._on_node_start in NODE_START_OBSERVERS
+
+def test_sampling_decided_once_per_invocation():
+    decisions = turns(NodeProfiler(sample_rate=0.5, seed=3), 200)
+    assert all(len(decision) == 1 for decision in decisions)
+    sampled = sum(True in decision for decision in decisions)
+    assert 60 < sampled < 140
+
+def test_requested_profile_records_every_node(tmp_path, monkeypatch):
+    # The installed profiler handles the request even though AILAB_PROFILING is unset
+    profiler = profiling.get_profiler()
+    monkeypatch.setattr(profiler, "directory", str(tmp_path))
+    before = profiler.profiled
+    import langgraph_cloud_config
+    graph = langgraph_cloud_config.create_enhanced_multi_agent_graph()
+    graph.invoke({"messages": [HumanMessage("the app shows an error")]},
+                 {"configurable": {"thread_id": "profiled", "profile": True}})
+    assert profiler.profiled - before == 3
+    assert (tmp_path / "enhanced_multi_agent.collapsed").exists()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Tests for how the sentiment model and the keyword rules combine
+"""
+
+import pytest
+
+from benchmarks.sentiment import REGRESSION_CASES
+from customer_service_agent import SENTIMENT_MODEL, combine_sentiment, detect_sentiment, detect_sentiments
+from sentiment_model import has_content
+
+@pytest.mark.parametrize("text, expected", REGRESSION_CASES)
+def test_regression_cases(text, expected):
+    assert detect_sentiment(text) == expected
+
+def test_batch_matches_single():
+    texts = [text for text, _ in REGRESSION_CASES] + ["I love this product", "my order is late"]
+    assert detect_sentiments(texts) == [detect_sentiment(text) for text in texts]
+
+def test_escalating_keyword_beats_model():
+    assert combine_sentiment("I am angry about my bill", "neutral") == "negative"
+    assert combine_sentiment("This is urgent, the system is down", "negative") == "urgent"
+
+def test_model_wins_over_other_keywords():
+    # A positive keyword does not override the model; "great, another outage" is not praise
+    assert combine_sentiment("great, another outage", "negative") == "negative"
+
+def test_keywords_when_model_has_no_prediction():
+    assert combine_sentiment("this is amazing", None) == "positive"
+    assert combine_sentiment("where is my parcel", None) == "neutral"
+
+def test_function_words_get_no_prediction():
+    assert not has_content("the the the")
+    assert has_content("not the one")
+    if SENTIMENT_MODEL is not None:
+        assert SENTIMENT_MODEL.predict("the the the") is None
+        assert SENTIMENT_MODEL.predict_batch(["the the the", "it"]) == [None, None]
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Tests for sticky-session routing of follow-up turns
+"""
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from langgraph_cloud_config import entry_router
+
+def route(current_agent, text, **configurable):
+    state = {"current_agent": current_agent, "messages": [AIMessage("How can I help?"), HumanMessage(text)]}
+    return entry_router(state, {"configurable": configurable})
+
+@pytest.mark.parametrize("current_agent, text", [
+    ("technical_expert", "I still need help with this issue"),
+    ("technical_expert", "that didn't fix the problem, any other support?"),
+    ("sales_advisor", "can you help me with the pricing"),
+    ("data_analyst", "thanks, that helps"),
+])
+def test_generic_follow_ups_stay(current_agent, text):
+    assert route(current_agent, text) == current_agent
+
+@pytest.mark.parametrize("current_agent, text", [
+    ("technical_expert", "actually I want to upgrade my plan"),
+    ("customer_service", "the export is broken and shows an error"),
+    ("sales_advisor", "can I get a report of last month's metrics"),
+])
+def test_specialist_keywords_reroute(current_agent, text):
+    assert route(current_agent, text) == "coordinator"
+
+def test_current_specialist_match_holds_ties():
+    # One technical and one sales keyword: not a clear change of intent
+    assert route("technical_expert", "the upgrade gives an error") == "technical_expert"
+    # More sales keywords than technical ones is
+    assert route("technical_expert", "the upgrade pricing page has an error") == "coordinator"
+
+def test_first_turn_and_disabled_go_to_coordinator():
+    assert route("coordinator", "my app is broken") == "coordinator"
+    assert route("technical_expert", "still broken", sticky_routing=False) == "coordinator"
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for the local trace sink
+"""
+
+import json
+import time
+from datetime import datetime, timezone
+
+from trace_sink import LocalTraceSink, upload_trace_files
+
+def test_writer_survives_failed_batches(tmp_path, monkeypatch):
+    sink = LocalTraceSink(directory=str(tmp_path), flush_interval=0.01)
+    write = sink._write
+    failures = iter([OSError(28, "No space left on device"), RuntimeError("broken file")])
+
+    def flaky(batch):
+        error = next(failures, None)
+        if error is not None:
+            raise error
+        write(batch)
+
+    monkeypatch.setattr(sink, "_write", flaky)
+    for i in range(3):
+        sink.emit({"event": "start", "id": str(i)})
+        time.sleep(0.1)
+    assert sink._writer.is_alive()
+    sink.close()
+
+    stats = sink.stats()
+    assert stats["write_errors"] == 2
+    assert stats["dropped"] == 2 and stats["written"] == 1
+    assert len(list(tmp_path.glob("traces-*.jsonl"))) == 1
+
+class RecordingClient:
+    def __init__(self):
+        self.created = []
+
+    def batch_ingest_runs(self, create):
+        self.created.extend(create)
+
+def trace_records(trace_id, start_time="2026-01-01T00:00:00+00:00"):
+    start = {"event": "start", "kind": "run", "id": trace_id, "trace_id": trace_id, "dotted_order": trace_id,
+             "parent_run_id": None, "name": "graph", "run_type": "chain", "start_time": start_time,
+             "inputs": {}, "tags": [], "metadata": {}}
+    end = {"event": "end", "id": trace_id, "end_time": start_time, "outputs": {}, "error": None}
+    return start, end
+
+def write_records(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+
+def test_upload_carries_unfinished_traces_over(tmp_path):
+    now = datetime.now(timezone.utc).isoformat()
+    done_start, done_end = trace_records("done", now)
+    open_start, open_end = trace_records("open", now)
+    write_records(tmp_path / "traces-1.jsonl", [done_start, open_start, done_end])
+    # The end record is still in the writer's active file
+    write_records(tmp_path / "traces-2.jsonl.part", [open_end])
+
+    client = RecordingClient()
+    result = upload_trace_files(str(tmp_path), "project", client=client)
+    assert result == {"files": 1, "runs": 1, "carried": 1}
+    assert [run["id"] for run in client.created] == ["done"]
+
+    (tmp_path / "traces-2.jsonl.part").rename(tmp_path / "traces-2.jsonl")
+    result = upload_trace_files(str(tmp_path), "project", client=client)
+    assert result == {"files": 2, "runs": 1, "carried": 0}
+    assert client.created[-1]["id"] == "open" and "end_time" in client.created[-1]
+    assert not list(tmp_path.glob("traces-*.jsonl"))
+
+def test_upload_sends_stale_unfinished_runs(tmp_path):
+    start, _ = trace_records("crashed")
+    write_records(tmp_path / "traces-1.jsonl", [start])
+    client = RecordingClient()
+    assert upload_trace_files(str(tmp_path), "project", client=client) == {"files": 1, "runs": 1, "carried": 0}
@@ -0,0 +1,168 @@
+"""
+Per-Thread Actor Executor
+Serializes turns on the same thread_id while different threads run in parallel
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict
+
+from deadlines import Overloaded
+
+DEFAULT_IDLE_TIMEOUT = 30.0
+DEFAULT_MAILBOX_SIZE = 100
+DEFAULT_STREAM_BUFFER = 16
+
+class ThreadActorExecutor:
+    """
+    Runs graph invocations through one lightweight actor per active thread.
+
+    Each actor owns a bounded mailbox and processes its turns one at a time,
+    so two turns on a thread never read the same parent checkpoint. There is
+    no lock shared between threads. An actor that has been idle for
+    idle_timeout seconds exits and is dropped from the registry; the next
+    turn on that thread starts a new one.
+
+    A turn whose caller gives up (its future is cancelled, e.g. by a deadline
+    or a disconnected stream) is cancelled too, so the actor does not keep
+    running work nobody is waiting for.
+    """
+
+    def __init__(self, graph, idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 mailbox_size: int = DEFAULT_MAILBOX_SIZE):
+        self.graph = graph
+        self.idle_timeout = idle_timeout
+        self.mailbox_size = mailbox_size
+        self._actors: Dict[str, asyncio.Queue] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._counts = {"processed": 0, "failed": 0, "abandoned": 0, "spawned": 0, "reclaimed": 0, "rejected": 0}
+
+    def _enqueue(self, thread_id: str, work: Callable[[], Awaitable]) -> asyncio.Future:
+        """Queues work on the thread's actor; the returned future resolves to its result."""
+        mailbox = self._actors.get(thread_id)
+        if mailbox is None:
+            mailbox = asyncio.Queue(maxsize=self.mailbox_size)
+            self._actors[thread_id] = mailbox
+            self._tasks[thread_id] = asyncio.create_task(self._run(thread_id, mailbox))
+            self._counts["spawned"] += 1
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            mailbox.put_nowait((work, future))
+        except asyncio.QueueFull:
+            self._counts["rejected"] += 1
+            raise Overloaded(f"mailbox for thread {thread_id} is full", retry_after=1.0)
+        return future
+
+    async def submit(self, payload: Dict[str, Any], config: Dict[str, Any]):
+        """
+        Queues a turn on its thread's actor and waits for the result.
+        """
+        return await self.run(config["configurable"]["thread_id"], lambda: self.graph.ainvoke(payload, config))
+
+    # Lets the executor stand in for the graph wherever ainvoke is expected
+    ainvoke = submit
+
+    async def run(self, thread_id: str, work: Callable[[], Awaitable]):
+        """
+        Runs work() as a turn of thread_id, after the thread's queued turns,
+        for other reads and writes of its checkpoints (e.g. merging a
+        deferred task's result).
+        """
+        return await self._enqueue(thread_id, work)
+
+    async def astream(self, payload: Dict[str, Any], config: Dict[str, Any], buffer: int = DEFAULT_STREAM_BUFFER,
+                      **kwargs) -> AsyncIterator[Any]:
+        """
+        graph.astream() as a turn of the thread's actor. Chunks are handed over
+        a queue of at most buffer, so a slow consumer holds the turn back;
+        closing the iterator early cancels the turn.
+        """
+        chunks: asyncio.Queue = asyncio.Queue(maxsize=buffer)
+
+        async def work():
+            async for chunk in self.graph.astream(payload, config, **kwargs):
+                await chunks.put(chunk)
+
+        future = self._enqueue(config["configurable"]["thread_id"], work)
+        getter = None
+        try:
+            while True:
+                if not chunks.empty():
+                    yield chunks.get_nowait()
+                    continue
+                getter = asyncio.ensure_future(chunks.get())
+                await asyncio.wait((getter, future), return_when=asyncio.FIRST_COMPLETED)
+                if getter.done():
+                    chunk, getter = getter.result(), None
+                    yield chunk
+                    continue
+                # The turn ended; a cancelled getter leaves any woken item in the queue
+                getter.cancel()
+                getter = None
+                while not chunks.empty():
+                    yield chunks.get_nowait()
+                future.result()
+                return
+        finally:
+            if getter is not None:
+                getter.cancel()
+            future.cancel()
+
+    async def _run(self, thread_id: str, mailbox: asyncio.Queue):
+        while True:
+            try:
+                work, future = await asyncio.wait_for(mailbox.get(), timeout=self.idle_timeout)
+            except asyncio.TimeoutError:
+                # No await between the emptiness check and removal, so no turn can slip in
+                if mailbox.empty():
+                    del self._actors[thread_id]
+                    del self._tasks[thread_id]
+                    self._counts["reclaimed"] += 1
+                    return
+                continue
+
+            if future.cancelled():
+                self._counts["abandoned"] += 1
+                continue
+            turn = asyncio.ensure_future(work())
+            future.add_done_callback(lambda done, turn=turn: turn.cancel() if done.cancelled() else None)
+            try:
+                result = await turn
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling():
+                    # The actor itself is being shut down
+                    future.cancel()
+                    raise
+                self._counts["abandoned"] += 1
+                continue
+            except Exception as e:
+                self._counts["failed"] += 1
+                if not future.cancelled():
+                    future.set_exception(e)
+            else:
+                self._counts["processed"] += 1
+                if not future.cancelled():
+                    future.set_result(result)
+
+    async def shutdown(self):
+        """Cancels every actor; turns still queued are cancelled too."""
+        for task in list(self._tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        for mailbox in self._actors.values():
+            while not mailbox.empty():
+                _, future = mailbox.get_nowait()
+                future.cancel()
+        self._actors.clear()
+        self._tasks.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Active actors, queued turns and lifetime counters."""
+        return {
+            "active_actors": len(self._actors),
+            "queued_turns": sum(mailbox.qsize() for mailbox in self._actors.values()),
+            **self._counts
+        }
+
+# Export actor executor API
+__all__ = ["ThreadActorExecutor"]
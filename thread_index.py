@@ -0,0 +1,204 @@
+"""
+Thread State Index
+Secondary index over selected state fields of every checkpointed thread,
+maintained on checkpoint write, so status queries never scan checkpoints
+"""
+
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from node_metrics import CheckpointWrite, CHECKPOINT_OBSERVERS
+
+# Set AILAB_THREAD_INDEX=true to index the threads of every instrumented graph
+THREAD_INDEX_ENV = "AILAB_THREAD_INDEX"
+
+# Indexed fields; customer_tier is read from the state's customer record or the run's configurable
+INDEXED_FIELDS = ("resolution_status", "ticket_priority", "issue_category", "current_agent", "customer_tier")
+
+def _field_values(values: Dict[str, Any], configurable: Dict[str, Any]) -> Tuple:
+    profile = values.get("customer_info") or values.get("user_profile") or {}
+    tier = profile.get("tier") if isinstance(profile, dict) else None
+    return (values.get("resolution_status"), values.get("ticket_priority"), values.get("issue_category"),
+            values.get("current_agent"), tier or configurable.get("customer_tier"))
+
+class ThreadRecord(NamedTuple):
+    graph_name: str
+    thread_id: str
+    updated_at: float
+    fields: Dict[str, Any]
+
+class Page(NamedTuple):
+    threads: List[ThreadRecord]
+    next_cursor: Optional[int]
+
+class _Posting:
+    """
+    Threads holding one field value, in order of their last index update.
+
+    Updates append and leave the thread's older position behind as a stale
+    entry, recognised by its sequence number; stale entries are dropped once
+    they outnumber live ones, so maintenance stays amortized O(1) and the
+    sequence and time arrays stay sorted for bisection.
+    """
+
+    __slots__ = ("seqs", "times", "keys", "live")
+
+    def __init__(self):
+        self.seqs = array("q")
+        self.times = array("d")
+        self.keys: List[tuple] = []
+        self.live = 0
+
+    def add(self, seq: int, updated_at: float, key: tuple):
+        self.seqs.append(seq)
+        self.times.append(updated_at)
+        self.keys.append(key)
+        self.live += 1
+
+    def compact(self, entries: Dict[tuple, list]):
+        keep = [i for i, key in enumerate(self.keys) if entries[key][0] == self.seqs[i]]
+        self.seqs = array("q", (self.seqs[i] for i in keep))
+        self.times = array("d", (self.times[i] for i in keep))
+        self.keys = [self.keys[i] for i in keep]
+
+class ThreadIndex:
+    """
+    Latest INDEXED_FIELDS values and update time of every (graph, thread_id).
+
+    Each checkpoint write re-indexes its thread when a field changed or the
+    thread's update time is more than touch_interval_s old, so the update time
+    is accurate to that interval while the several checkpoints of one turn
+    cost a tuple comparison each.
+
+    query() answers equality filters, a lower bound on update time and keyset
+    pagination, newest first, by walking the posting of the most selective
+    filter backwards from the cursor and checking the other filters per thread.
+    """
+
+    def __init__(self, touch_interval_s: float = 1.0, clock: Callable = time.time):
+        self.touch_interval_s = touch_interval_s
+        self._clock = clock
+        # key -> [seq, updated_at, field values]
+        self._entries: Dict[tuple, list] = {}
+        # (graph, field, value) -> posting; (None, graph) holds every thread of the graph
+        self._postings: Dict[tuple, _Posting] = {}
+        self._seq = 0
+        self._last_time = 0.0
+        self._lock = threading.Lock()
+
+    def install(self):
+        if self._on_checkpoint not in CHECKPOINT_OBSERVERS:
+            CHECKPOINT_OBSERVERS.append(self._on_checkpoint)
+
+    def uninstall(self):
+        if self._on_checkpoint in CHECKPOINT_OBSERVERS:
+            CHECKPOINT_OBSERVERS.remove(self._on_checkpoint)
+
+    def _on_checkpoint(self, write: CheckpointWrite):
+        if write.values is not None:
+            self.update(write.graph_name, write.thread_id, _field_values(write.values, write.configurable or {}))
+
+    def update(self, graph_name: str, thread_id: str, fields: Tuple):
+        """Indexes a thread's INDEXED_FIELDS values, given in that order."""
+        key = (graph_name, thread_id)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] == fields and now - entry[1] < self.touch_interval_s:
+                return
+            # Keep update times non-decreasing so postings stay sorted by time
+            now = self._last_time = max(now, self._last_time)
+            self._seq += 1
+            seq = self._seq
+            touched = []
+            if entry is None:
+                self._entries[key] = [seq, now, fields]
+            else:
+                for posting_key in self._posting_keys(graph_name, entry[2]):
+                    posting = self._postings[posting_key]
+                    posting.live -= 1
+                    touched.append(posting)
+                entry[0], entry[1], entry[2] = seq, now, fields
+            for posting_key in self._posting_keys(graph_name, fields):
+                posting = self._postings.get(posting_key)
+                if posting is None:
+                    posting = self._postings[posting_key] = _Posting()
+                posting.add(seq, now, key)
+            for posting in touched:
+                if len(posting.keys) > 64 and posting.live * 2 < len(posting.keys):
+                    posting.compact(self._entries)
+
+    @staticmethod
+    def _posting_keys(graph_name: str, fields: Tuple):
+        yield (None, graph_name)
+        for name, value in zip(INDEXED_FIELDS, fields):
+            if value is not None:
+                yield (graph_name, name, value)
+
+    def get(self, graph_name: str, thread_id: str) -> Optional[ThreadRecord]:
+        entry = self._entries.get((graph_name, thread_id))
+        if entry is None:
+            return None
+        return ThreadRecord(graph_name, thread_id, entry[1], dict(zip(INDEXED_FIELDS, entry[2])))
+
+    def query(self, graph_name: str, since: float = None, limit: int = 50, cursor: int = None,
+              **filters: Any) -> Page:
+        """
+        Threads of one graph whose fields equal every filter and that were
+        updated at or after since, newest first. Pass a page's next_cursor to
+        get the following page.
+        """
+        unknown = set(filters) - set(INDEXED_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown index fields: {sorted(unknown)}")
+        checks = [(INDEXED_FIELDS.index(name), value) for name, value in filters.items()]
+        threads: List[ThreadRecord] = []
+        with self._lock:
+            candidates = [self._postings.get((graph_name, name, value)) for name, value in filters.items()]
+            if not filters:
+                candidates = [self._postings.get((None, graph_name))]
+            if any(posting is None for posting in candidates):
+                return Page([], None)
+            posting = min(candidates, key=lambda p: p.live)
+            low = bisect_left(posting.times, since) if since is not None else 0
+            position = (bisect_left(posting.seqs, cursor) if cursor is not None else len(posting.seqs)) - 1
+            entries = self._entries
+            while position >= low and len(threads) < limit:
+                key = posting.keys[position]
+                seq, updated_at, fields = entries[key]
+                if seq == posting.seqs[position] and all(fields[i] == value for i, value in checks):
+                    threads.append(ThreadRecord(key[0], key[1], updated_at, dict(zip(INDEXED_FIELDS, fields))))
+                    cursor = seq
+                position -= 1
+            # A full page only has a successor if unscanned candidates remain
+            more = len(threads) == limit and position >= low
+        return Page(threads, cursor if more else None)
+
+    def count(self, graph_name: str, field: str) -> Dict[Any, int]:
+        """Number of threads per value of one field, without scanning."""
+        if field not in INDEXED_FIELDS:
+            raise ValueError(f"Unknown index field: {field}")
+        with self._lock:
+            return {key[2]: posting.live for key, posting in self._postings.items()
+                    if key[:2] == (graph_name, field) and posting.live}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+_index: Optional[ThreadIndex] = None
+
+def get_index() -> ThreadIndex:
+    global _index
+    if _index is None:
+        _index = ThreadIndex()
+    return _index
+
+if os.getenv(THREAD_INDEX_ENV, "false").lower() == "true":
+    get_index().install()
+
+# Export thread index API
+__all__ = ["ThreadIndex", "ThreadRecord", "Page", "INDEXED_FIELDS", "get_index"]
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Local Trace Sink
+Buffered, append-only JSONL tracing backend that replaces synchronous remote
+LangSmith tracing, with an offline uploader that replays the files later
+"""
+
+import argparse
+import atexit
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from langchain_core.load import dumpd
+from langchain_core.messages import BaseMessage
+from langchain_core.tracers.base import BaseTracer
+from langchain_core.tracers.context import register_configure_hook
+from langchain_core.tracers.schemas import Run
+
+from deployment_config import DEPLOYMENT_CONFIG
+
+MONITORING = DEPLOYMENT_CONFIG["monitoring"]
+
+# Set AILAB_LOCAL_TRACING=true to attach LocalTracer to every graph invocation
+LOCAL_TRACING_ENV = "AILAB_LOCAL_TRACING"
+
+def _json_default(value: Any):
+    if isinstance(value, BaseMessage):
+        # Compact form; the full dumpd() serialization costs several times more
+        return {"type": value.type, "content": value.content, "id": value.id}
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "to_json"):
+        return dumpd(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return str(value)
+
+class LocalTraceSink:
+    """
+    Append-only, size-rotated JSONL trace files written by a background thread.
+
+    emit() only places the record on a bounded in-memory buffer and never
+    waits: when the buffer is full the record is dropped and counted.
+    Records are serialized and written by the writer thread; a batch that
+    fails to write is dropped and counted, and the thread keeps running. The
+    active file carries a .part suffix and is renamed to .jsonl once rotated
+    or closed, so readers only ever see complete files.
+    """
+
+    def __init__(self, directory: str = None, max_file_bytes: int = None, max_files: int = None,
+                 buffer_records: int = None, flush_interval: float = 1.0):
+        self.directory = directory or os.getenv("AILAB_TRACE_DIR", MONITORING["trace_dir"])
+        self.max_file_bytes = max_file_bytes or MONITORING["trace_max_file_mb"] * 1024 * 1024
+        self.max_files = max_files or MONITORING["trace_max_files"]
+        self.flush_interval = flush_interval
+        self._buffer = queue.Queue(maxsize=buffer_records or MONITORING["trace_buffer_records"])
+        self._counts = {"emitted": 0, "dropped": 0, "written": 0, "write_errors": 0, "rotations": 0,
+                        "deleted_files": 0}
+        self._failing = False
+        self._file = None
+        self._path = None
+        self._file_bytes = 0
+        self._closed = threading.Event()
+        os.makedirs(self.directory, exist_ok=True)
+        self._writer = threading.Thread(target=self._run, name="trace-sink-writer", daemon=True)
+        self._writer.start()
+
+    def emit(self, record: Dict[str, Any]) -> bool:
+        """Buffers a record for writing; returns False if it had to be dropped."""
+        try:
+            self._buffer.put_nowait(record)
+        except queue.Full:
+            self._counts["dropped"] += 1
+            return False
+        self._counts["emitted"] += 1
+        return True
+
+    def close(self, timeout: float = 5.0):
+        """Flushes buffered records and closes the active file."""
+        if not self._closed.is_set():
+            self._closed.set()
+            self._writer.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"buffered": self._buffer.qsize(), "active_file": self._path, **self._counts}
+
+    def _run(self):
+        while True:
+            try:
+                batch = [self._buffer.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                if self._closed.is_set():
+                    break
+                continue
+            while len(batch) < 1000:
+                try:
+                    batch.append(self._buffer.get_nowait())
+                except queue.Empty:
+                    break
+            accounted = self._counts["written"] + self._counts["dropped"]
+            try:
+                self._write(batch)
+            except Exception as e:
+                # A full disk or a broken file must not stop tracing for the
+                # rest of the process; report once until a batch gets through
+                self._counts["write_errors"] += 1
+                handled = self._counts["written"] + self._counts["dropped"] - accounted
+                self._counts["dropped"] += len(batch) - handled
+                if not self._failing:
+                    print(f"⚠️  Dropping trace records: {type(e).__name__}: {e}")
+                self._failing = True
+            else:
+                self._failing = False
+        try:
+            self._finish_file()
+        except OSError as e:
+            print(f"⚠️  Could not finish trace file {self._path}: {e}")
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        lines = []
+        for record in batch:
+            try:
+                lines.append(json.dumps(record, default=_json_default, separators=(",", ":")))
+            except Exception:
+                pass
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+
+        if self._file is None:
+            self._open_file()
+        self._file.write(data)
+        self._file.flush()
+        self._file_bytes += len(data)
+        self._counts["written"] += len(lines)
+        self._counts["dropped"] += len(batch) - len(lines)
+
+        if self._file_bytes >= self.max_file_bytes:
+            self._finish_file()
+            self._counts["rotations"] += 1
+            self._enforce_retention()
+
+    def _open_file(self):
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        self._path = os.path.join(self.directory, f"traces-{stamp}.jsonl.part")
+        self._file = open(self._path, "ab")
+        self._file_bytes = 0
+
+    def _finish_file(self):
+        if self._file is not None:
+            self._file.close()
+            os.replace(self._path, self._path[:-len(".part")])
+            self._file = None
+            self._path = None
+
+    def _enforce_retention(self):
+        files = sorted(glob.glob(os.path.join(self.directory, "traces-*.jsonl")))
+        for path in files[:max(0, len(files) - self.max_files)]:
+            os.remove(path)
+            self._counts["deleted_files"] += 1
+
+_sink: Optional[LocalTraceSink] = None
+_sink_lock = threading.Lock()
+
+def get_sink() -> LocalTraceSink:
+    """Process-wide sink, created on first use and flushed at exit."""
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = LocalTraceSink()
+                atexit.register(_sink.close)
+    return _sink
+
+def shutdown():
+    """Closes this process's sink, for exits that skip atexit (os._exit in forked workers)."""
+    if _sink is not None:
+        _sink.close()
+
+def _reset_after_fork():
+    # A forked worker inherits the sink but not its writer thread; start afresh
+    global _sink, _sink_lock
+    _sink = None
+    _sink_lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+class LocalTracer(BaseTracer):
+    """
+    LangChain tracer that records each run as a start and an end record in the
+    local sink. The root graph invocation is the run; node and router calls
+    nested under it are its spans.
+    """
+
+    def __init__(self, sink: LocalTraceSink = None, **kwargs):
+        super().__init__(**kwargs)
+        self.sink = sink or get_sink()
+
+    def _persist_run(self, run: Run):
+        pass
+
+    def _on_run_create(self, run: Run):
+        self.sink.emit(self._start_record(run))
+
+    def _on_run_update(self, run: Run):
+        self.sink.emit(self._end_record(run))
+
+    @staticmethod
+    def _start_record(run: Run) -> Dict[str, Any]:
+        return {
+            "event": "start",
+            "kind": "run" if run.parent_run_id is None else "span",
+            "id": str(run.id),
+            "trace_id": str(run.trace_id),
+            "dotted_order": run.dotted_order,
+            "parent_run_id": str(run.parent_run_id) if run.parent_run_id else None,
+            "name": run.name,
+            "run_type": run.run_type,
+            "start_time": run.start_time,
+            "inputs": run.inputs,
+            "tags": run.tags,
+            "metadata": (run.extra or {}).get("metadata", {})
+        }
+
+    @staticmethod
+    def _end_record(run: Run) -> Dict[str, Any]:
+        return {
+            "event": "end",
+            "id": str(run.id),
+            "end_time": run.end_time,
+            "outputs": run.outputs,
+            "error": run.error
+        }
+
+_local_tracer_var: ContextVar[Optional[LocalTracer]] = ContextVar("ailab_local_tracer", default=None)
+register_configure_hook(_local_tracer_var, True, LocalTracer, LOCAL_TRACING_ENV)
+
+def read_runs(paths: List[str]) -> List[Dict[str, Any]]:
+    """
+    Folds start and end records from trace files into complete run dicts in the
+    shape LangSmith's batch ingestion expects.
+    """
+    runs: Dict[str, Dict[str, Any]] = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                run = runs.setdefault(record["id"], {"id": record["id"]})
+                if record["event"] == "start":
+                    run.update({
+                        "trace_id": record["trace_id"],
+                        "dotted_order": record["dotted_order"],
+                        "parent_run_id": record["parent_run_id"],
+                        "name": record["name"],
+                        "run_type": record["run_type"],
+                        "start_time": record["start_time"],
+                        "inputs": record["inputs"],
+                        "tags": record["tags"],
+                        "extra": {"metadata": record["metadata"]}
+                    })
+                else:
+                    run.update({
+                        "end_time": record["end_time"],
+                        "outputs": record["outputs"],
+                        "error": record["error"]
+                    })
+    # End records whose start was dropped cannot be replayed
+    return [run for run in runs.values() if "trace_id" in run]
+
+def _run_records(run: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The start record, and the end record once there is one, that read_runs() folded into run."""
+    records = [{
+        "event": "start",
+        "kind": "run" if run["parent_run_id"] is None else "span",
+        "id": run["id"],
+        "trace_id": run["trace_id"],
+        "dotted_order": run["dotted_order"],
+        "parent_run_id": run["parent_run_id"],
+        "name": run["name"],
+        "run_type": run["run_type"],
+        "start_time": run["start_time"],
+        "inputs": run["inputs"],
+        "tags": run["tags"],
+        "metadata": run["extra"]["metadata"]
+    }]
+    if "end_time" in run:
+        records.append({"event": "end", "id": run["id"], "end_time": run["end_time"],
+                        "outputs": run["outputs"], "error": run["error"]})
+    return records
+
+def _started_before(run: Dict[str, Any], cutoff: float) -> bool:
+    started = datetime.fromisoformat(run["start_time"])
+    if started.tzinfo is None:
+        started = started.replace(tzinfo=timezone.utc)
+    return started.timestamp() < cutoff
+
+def upload_trace_files(directory: str = None, project_name: str = None, client=None,
+                       batch_size: int = 100, dry_run: bool = False,
+                       carry_seconds: float = None) -> Dict[str, int]:
+    """
+    Replays completed trace files to LangSmith and marks each uploaded file
+    with an .uploaded suffix so it is not sent twice.
+
+    A trace with a run whose end record is not in a completed file yet (it is
+    still in the writer's active .part file) is not uploaded: its records are
+    carried over into a new trace file and sent by a later upload, together
+    with the end record. Runs started more than carry_seconds ago are sent as
+    they are, since their end record is not coming (the process died).
+    """
+    directory = directory or os.getenv("AILAB_TRACE_DIR", MONITORING["trace_dir"])
+    project_name = project_name or DEPLOYMENT_CONFIG["langsmith"]["project_name"]
+    if carry_seconds is None:
+        carry_seconds = MONITORING["trace_carry_max_seconds"]
+    paths = sorted(glob.glob(os.path.join(directory, "traces-*.jsonl")))
+    runs = read_runs(paths)
+
+    cutoff = time.time() - carry_seconds
+    unfinished = {run["trace_id"] for run in runs if "end_time" not in run and not _started_before(run, cutoff)}
+    carried = [run for run in runs if run["trace_id"] in unfinished]
+    runs = [run for run in runs if run["trace_id"] not in unfinished]
+
+    if not dry_run and paths:
+        if runs:
+            if client is None:
+                from langsmith import Client
+                client = Client()
+            for run in runs:
+                run["session_name"] = project_name
+            for start in range(0, len(runs), batch_size):
+                client.batch_ingest_runs(create=runs[start:start + batch_size])
+        if carried:
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+            carry_path = os.path.join(directory, f"traces-{stamp}-carried.jsonl")
+            with open(carry_path + ".part", "w", encoding="utf-8") as f:
+                for run in carried:
+                    for record in _run_records(run):
+                        f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            os.replace(carry_path + ".part", carry_path)
+        for path in paths:
+            os.replace(path, path + ".uploaded")
+
+    return {"files": len(paths), "runs": len(runs), "carried": len(carried)}
+
+# Export tracing API
+__all__ = ["LocalTraceSink", "LocalTracer", "get_sink", "shutdown", "read_runs", "upload_trace_files"]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay local trace files to LangSmith")
+    parser.add_argument("command", choices=["upload"])
+    parser.add_argument("--dir", default=None, help="trace directory (default: AILAB_TRACE_DIR or traces)")
+    parser.add_argument("--project", default=None, help="LangSmith project to upload into")
+    parser.add_argument("--dry-run", action="store_true", help="count runs without uploading")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    result = upload_trace_files(args.dir, args.project, dry_run=args.dry_run)
+    action = "Found" if args.dry_run else "Uploaded"
+    print(f"📤 {action} {result['runs']} runs from {result['files']} files in {time.perf_counter() - started:.1f}s"
+          f", {result['carried']} runs of unfinished traces {'to carry' if args.dry_run else 'carried'} over")
@@ -0,0 +1,79 @@
+"""
+Graph Warm-Up
+Synthetic invocations that take every graph through its routing, knowledge
+base and customer profile paths before a server reports ready, so first-call
+costs (lazy imports, LangGraph's per-run setup, first-use code paths) are
+not paid by real requests
+"""
+
+import time
+from typing import Any, Callable, Dict, List
+
+from customer_service_agent import ISSUE_CATEGORIES, SENTIMENT_KEYWORDS
+from langgraph_cloud_config import ROUTING_RULES
+from node_metrics import unobserved
+
+WARMUP_THREAD_PREFIX = "warmup-"
+
+# Initial state besides messages that each langgraph.json graph expects
+START_STATE = {
+    "my_agent": {"user_info": {}},
+    "customer_service": {"agent_notes": []},
+    "enhanced_multi_agent": {
+        "current_agent": "coordinator", "agent_handoffs": [], "conversation_context": {}, "user_profile": {},
+        "task_queue": [], "agent_outputs": {}, "coordination_notes": [], "performance_metrics": {}
+    },
+}
+
+def warmup_messages() -> List[str]:
+    """
+    One message per routing rule, issue category and sentiment, plus one that
+    matches nothing, so every branch of the keyword tables is exercised.
+    """
+    messages = [f"I need help, {keywords[0]} please" for _, keywords, _ in ROUTING_RULES]
+    messages += [f"My {keywords[0]} question" for _, keywords, _ in ISSUE_CATEGORIES]
+    messages += [f"I am {keywords[0]} about this" for _, keywords in SENTIMENT_KEYWORDS]
+    messages.append("hello")
+    return messages
+
+def warmup_payloads(graph_name: str) -> List[Dict[str, Any]]:
+    start = START_STATE.get(graph_name, {})
+    return [{"messages": [{"role": "user", "content": text}], **start} for text in warmup_messages()]
+
+async def warm_up(graphs: Dict[str, Any], serialize: Callable = None) -> Dict[str, float]:
+    """
+    Invokes and streams every graph with the warm-up payloads, then deletes
+    the warm-up threads from the checkpointer. Node metrics and observers
+    (analytics, thread index, Prometheus, event store) do not see warm-up
+    runs, so none of them keeps warm-up threads. serialize, if given, is applied
+    to each result so the response encoding path is warmed too. Returns the
+    warm-up time per graph in milliseconds.
+    """
+    with unobserved():
+        return await _warm_up(graphs, serialize)
+
+async def _warm_up(graphs: Dict[str, Any], serialize: Callable = None) -> Dict[str, float]:
+    timings = {}
+    for name, graph in graphs.items():
+        started = time.perf_counter()
+        thread_ids = []
+        for i, payload in enumerate(warmup_payloads(name)):
+            thread_id = f"{WARMUP_THREAD_PREFIX}{name}-{i}"
+            thread_ids.append(thread_id)
+            result = await graph.ainvoke(payload, {"configurable": {"thread_id": thread_id}})
+            if serialize is not None:
+                serialize(result)
+        thread_id = f"{WARMUP_THREAD_PREFIX}{name}-stream"
+        thread_ids.append(thread_id)
+        async for update in graph.astream(warmup_payloads(name)[0], {"configurable": {"thread_id": thread_id}},
+                                          stream_mode="updates"):
+            if serialize is not None:
+                serialize(update)
+        if graph.checkpointer is not None:
+            for thread_id in thread_ids:
+                graph.checkpointer.delete_thread(thread_id)
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+    return timings
+
+# Export warm-up API
+__all__ = ["warm_up", "warmup_payloads", "warmup_messages", "START_STATE"]